@@ -2,200 +2,74 @@
 # LIBRARIES
 # ==================================================================
 
-import pandas as pd
-import inflection
 import streamlit as st
 from PIL import Image
-import folium
-from folium.plugins import MarkerCluster
-from streamlit_folium import folium_static
+import streamlit.components.v1 as components
+
+from fome_zero.data import get_cluster_pyramid, get_dataset, get_export, get_filter_index, get_map_html
+from fome_zero.export import EXPORT_FORMATS
+from fome_zero.metrics import overview
+from fome_zero.maps import (DEFAULT_VIEW, MAP_CLIENT_MAX_POINTS, MAP_HEIGHT, MAP_WIDTH, build_viewport_map,
+                            query_bounds, view_changed, view_from_state)
+from fome_zero.profiling import begin_profile, end_profile
+from fome_zero.timing import begin_run, debug_requested, end_run, span, span_frame
 
 # WIDE CONFIG PAGE
 st.set_page_config(page_title='Main Page', page_icon='📊',layout='wide')
 
-# ==================================================================
-# AUXILIARY VARIABLES
-# ==================================================================
-
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America",
-}
-
-
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
+# TIMING - spans das etapas deste rerun (fome_zero.timing); ?debug=1 na URL mostra o painel de tempos na sidebar
+# PROFILING - ?profile=1 na URL grava o perfil de CPU deste rerun só desta sessão (fome_zero.profiling)
+parametros_url = st.experimental_get_query_params()
+painel_debug = debug_requested(parametros_url)
+begin_run('main', debug=painel_debug)
+perfil = begin_profile('main', parametros_url)
 
 # ==================================================================
 # FUNCTIONS
 # ==================================================================
 
-## COLUMN RENAME AND ADJUSTMENT FUNCTIONS
-
-def rename_columns(dataframe):
-    df = dataframe.copy()
-
-    title = lambda x: inflection.titleize(x)
-
-    snakecase = lambda x: inflection.underscore(x)
-
-    spaces = lambda x: x.replace(" ", "")
-
-    cols_old = list(df.columns)
-
-    cols_old = list(map(title, cols_old))
-
-    cols_old = list(map(spaces, cols_old))
-
-    cols_new = list(map(snakecase, cols_old))
-
-    df.columns = cols_new
-
-    return df
-
-def country_name(country_id):
-    return COUNTRIES[country_id]
-
-def color_name(color_code):
-    return COLORS[color_code]
-
-def create_price_tye(price_range):
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-    
-def adjust_columns_order(dataframe):
-    df = dataframe.copy()
-
-    new_cols_order = [
-        "restaurant_id",
-        "restaurant_name",
-        "country",
-        "city",
-        "address",
-        "locality",
-        "locality_verbose",
-        "longitude",
-        "latitude",
-        "cuisines",
-        "price_type",
-        "average_cost_for_two",
-        "currency",
-        "has_table_booking",
-        "has_online_delivery",
-        "is_delivering_now",
-        "aggregate_rating",
-        "rating_color",
-        "color_name",
-        "rating_text",
-        "votes",
-    ]
-
-    return df.loc[:, new_cols_order]
-
-## DATA PROCESSING AND CLEANING FUNCTION
-
-def process_data(file_path):
-    df = pd.read_csv(file_path)
-
-    df = df.dropna()
-
-    df = rename_columns(df)
-
-    df["price_type"] = df.loc[:, "price_range"].apply(lambda x: create_price_tye(x))
-
-    df["country"] = df.loc[:, "country_code"].apply(lambda x: country_name(x))
-
-    df["color_name"] = df.loc[:, "rating_color"].apply(lambda x: color_name(x))
-
-    df["cuisines"] = df.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
-
-    df = df.drop_duplicates()
-
-    df = adjust_columns_order(df)
-    
-    df = df.reset_index()
-    
-    df = df.drop(columns=['index'])
-
-    df.to_csv("dataset/processed/data.csv", index=False)
-
-    return df
-
-## LOAD DATA AND COPY
-RAW_DATA_PATH = f"dataset/raw/data.csv"
-df_raw = pd.read_csv(RAW_DATA_PATH)
-df1 = df_raw.copy()
-
-## REMANE COLUMNS
-df1 = rename_columns(df1)
-
-## TREAT NA
-df1 = df1.dropna()
-
-## PROCESS DATA
-df2 = process_data(RAW_DATA_PATH)
+## LOAD DATA
+df2 = get_dataset()
+filter_index = get_filter_index()
 
 ## MAP
-def create_map(dataframe):
-    f = folium.Figure(width=1920, height=1080)
+def create_map(countries):
+    # Seleções grandes usam o mapa por viewport; as demais, o mapa completo
+    with span('filter', 'map'):
+        n_restaurantes = filter_index.mask(country=countries).sum()
 
-    m = folium.Map(max_bounds=True).add_to(f)
+    if n_restaurantes > MAP_CLIENT_MAX_POINTS:
+        return create_viewport_map(countries)
 
-    marker_cluster = MarkerCluster().add_to(m)
+    # HTML pronto do cache por seleção de países e versão dos dados; o mapa só
+    # é montado (fome_zero.maps) quando a seleção ainda não foi renderizada.
+    html = get_map_html(countries)
 
-    for _, line in dataframe.iterrows():
+    with span('render', 'map'):
+        components.html(html, height=MAP_HEIGHT + 10, width=MAP_WIDTH)
 
-        name = line["restaurant_name"]
-        price_for_two = line["average_cost_for_two"]
-        cuisine = line["cuisines"]
-        currency = line["currency"]
-        rating = line["aggregate_rating"]
-        color = f'{line["color_name"]}'
+def create_viewport_map(countries):
+    # Só os clusters e pontos do viewport (com folga) saem da pirâmide do ETL.
+    # O st_folium devolve o novo viewport quando o mapa é movido, e o script
+    # roda de novo para consultar a área visível. O streamlit_folium só é
+    # importado aqui, quando a seleção passa do limite do mapa completo.
+    from streamlit_folium import st_folium
 
-        html = "<p><strong>{}</strong></p>"
-        html += "<p>Price: {},00 ({}) para dois"
-        html += "<br />Type: {}"
-        html += "<br />Aggragate Rating: {}/5.0"
-        html = html.format(name, price_for_two, currency, cuisine, rating)
+    view = st.session_state.get('map_view', DEFAULT_VIEW)
 
-        popup = folium.Popup(
-            folium.Html(html, script=True),
-            max_width=500,
-        )
+    with span('filter', 'map'):
+        clusters = get_cluster_pyramid().query(query_bounds(view['bounds']), view['zoom'], countries)
 
-        folium.Marker(
-            [line["latitude"], line["longitude"]],
-            popup=popup,
-            icon=folium.Icon(color=color, icon="home", prefix="fa"),
-        ).add_to(marker_cluster)
+    with span('figure', 'map'):
+        m = build_viewport_map(df2, clusters, view)
 
-    folium_static(m, width=800, height=600)
+    with span('render', 'map'):
+        state = st_folium(m, key='map', width=MAP_WIDTH, height=MAP_HEIGHT, returned_objects=['bounds', 'zoom'])
+
+    new_view = view_from_state(state)
+    if view_changed(view, new_view):
+        st.session_state['map_view'] = new_view
+        st.experimental_rerun()
 
 # ============================================================= INÍCIO DA ESTRUTURA LÓGICA CÓDIGO =============================================================    
     
@@ -212,27 +86,31 @@ st.sidebar.markdown('''---''')
 
 st.sidebar.markdown('## Filtros')
 
-# df2_copy criado para as métricas iniciais não variarem com a mudança dos filtros
-df2_metrics = df2.copy()
+# df2_metrics guarda o dataset completo para as métricas iniciais não variarem com a mudança dos filtros
+df2_metrics = df2
 
 # COUNTRY FILTER
 countries = st.sidebar.multiselect(
     'Escolha o(s) país(es) que deseja visualizar os restaurantes',
-    df2.loc[:,'country'].unique().tolist(),
+    filter_index.options('country'),
     default=['Brazil','United States of America','Canada', 'England', 'Australia', 'South Africa'])
 
-linhas_selecionadas = df2['country'].isin(countries)
-df2 = df2.loc[linhas_selecionadas,:]
-
-# PROCESSED DATA DOWNLOAD BUTTON
+# PROCESSED DATA DOWNLOAD BUTTON - o arquivo só é gerado e lido no rerun do clique e fica em disco por versão dos dados
 st.sidebar.markdown("### Dados Tratados")
-processed_data = pd.read_csv('dataset/processed/data.csv')
-st.sidebar.download_button(
-    label='Download',
-    data=processed_data.to_csv(index=False, sep=';'),
-    file_name='data.csv',
-    mime='text/csv',
-)
+formato = st.sidebar.selectbox('Formato do arquivo', list(EXPORT_FORMATS))
+suffix, mime = EXPORT_FORMATS[formato]
+
+apenas_filtros = st.sidebar.checkbox('Exportar apenas os dados dos filtros atuais', value=False)
+selection = {'country': countries} if apenas_filtros else None
+
+if st.sidebar.button('Preparar arquivo'):
+    with get_export(suffix, selection) as export_file:
+        st.sidebar.download_button(
+            label='Download',
+            data=export_file,
+            file_name=f'data.{suffix}',
+            mime=mime,
+        )
 
 # POWERED BY
 st.sidebar.markdown('''---''')
@@ -248,22 +126,26 @@ st.markdown('## O Melhor lugar para encontrar o seu mais novo restaurante Favori
 with st.container():
     
     st.markdown('### Temos as seguintes métricas dentro da nossa plataforma:')
+
+    # Contagens do dataset completo (as mesmas do modo batch, fome_zero.metrics)
+    with span('aggregate', 'overview'):
+        resumo = overview(df2_metrics)
     
     col1, col2, col3 = st.columns(3, gap='large')
     
     with col1:
         # Quantidade de restaurantes registrados
-        qnt_rest_reg = df2_metrics['restaurant_id'].nunique()
+        qnt_rest_reg = resumo['restaurants']
         col1.metric('Restaurantes Cadastrados:',qnt_rest_reg)
     
     with col2:
         # Quantidade de países únicos registrados
-        qnt_pai_reg = df2_metrics["country"].nunique()
+        qnt_pai_reg = resumo['countries']
         col2.metric('Países Cadastrados: ',qnt_pai_reg)
         
     with col3:
        # Quantidade de cidades únicas registradas
-        qnt_cid_reg = df2_metrics["city"].nunique() 
+        qnt_cid_reg = resumo['cities']
         col3.metric('Cidades Registradas: ',qnt_cid_reg)
 
 with st.container():
@@ -272,18 +154,34 @@ with st.container():
     
     with col1:
         # Total de avaliações feitas
-        tot_av = df2_metrics["votes"].sum()
+        tot_av = resumo['votes']
         tot_av_format = '{:,.0f}'.format(tot_av).replace(',','.')
         col1.metric('Avaliações cadastradas na plataforma: ', tot_av_format)
         
     with col2:
         # Total de tipos de culinária registrados
-        tot_culi = df2_metrics["cuisines"].nunique()
+        tot_culi = resumo['cuisines']
         col2.metric('Tipos de culinária cadastrados',tot_culi)
         
 with st.container():
     
     st.markdown('### Visualize no mapa os restaurantes cadastrados na plataforma:')
-    create_map(df2)
-    
-    
\ No newline at end of file
+    create_map(countries)
+
+# PROFILE - flamegraph deste rerun, marcado com a página, a seleção de filtros e a versão dos dados
+if perfil is not None:
+    arquivo_perfil = end_profile(perfil, {'country': countries})
+
+    st.sidebar.markdown('### Perfil deste rerun')
+    st.sidebar.caption(str(arquivo_perfil))
+    st.sidebar.download_button(label='Flamegraph (.folded)',
+                               data=arquivo_perfil.read_bytes(),
+                               file_name=arquivo_perfil.name,
+                               mime='text/plain')
+
+# DEBUG PANEL - tempos de cada etapa deste rerun
+execucao = end_run()
+
+if painel_debug:
+    st.sidebar.markdown('### Tempos deste rerun')
+    st.sidebar.dataframe(span_frame(execucao), use_container_width=True)
@@ -0,0 +1,65 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Páginas cujas métricas o modo batch reproduz
+PAGES = [
+    "01_Main_Page.py",
+    "pages/02_🌎_Countries.py",
+    "pages/03_🏙️_Cities.py",
+    "pages/04_🍽️_Cuisines.py",
+]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## TIMING
+
+def time_process(args, repeat=3):
+    # Melhor tempo de um processo novo (inclui imports e leitura dos artefatos)
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR))
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=BASE_DIR, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Métricas de todas as páginas: scripts do Streamlit (bare mode) vs modo batch")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Garante os artefatos prontos antes de medir
+    time_process(["-m", "fome_zero.etl"], repeat=1)
+
+    pages = sum(time_process([page], repeat=args.repeat) for page in PAGES)
+    batch = time_process(["-m", "fome_zero.batch"], repeat=args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        batch_parquet = time_process(["-m", "fome_zero.batch", "--format", "parquet", "--output", tmp_dir],
+                                     repeat=args.repeat)
+
+    print(f"{len(PAGES)} page scripts={pages:>6.2f} s  batch json={batch:>5.2f} s  "
+          f"batch parquet={batch_parquet:>5.2f} s  speedup={pages / batch:>4.1f}x")
+
+if __name__ == "__main__":
+    main()
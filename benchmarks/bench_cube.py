@@ -0,0 +1,137 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_process_data import write_scaled_raw
+from fome_zero.cube import city_rollup, country_rollup, select_cells
+from fome_zero.etl import CUBE_FILE, DATA_FILE, build_artifacts
+from fome_zero.schema import compact_frame, read_parquet
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Seleções padrão das páginas Países/Cidades e Culinárias, mais todos os países
+# (as médias por culinária saem do fome_zero.stats: bench_cuisine_stats.py)
+SELECTIONS = [
+    ["Brazil", "United States of America", "Canada", "England", "Australia", "South Africa"],
+    ["Brazil", "England", "Qatar", "South Africa", "Canada", "Australia"],
+    ["India"],
+    None,
+]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## CHART QUERIES
+
+# Mesmas consultas dos gráficos, sobre o dataset (antes) e sobre o cubo (depois),
+# até o frame que vai para o plotly (sem a coluna de cores aleatórias).
+
+def dataset_queries(df, countries):
+    df = df.loc[df["country"].isin(countries), :]
+
+    def top(df_aux, col, n=None, ascending=False):
+        df_aux = df_aux.sort_index().sort_values(col, ascending=ascending).reset_index()
+        return df_aux if n is None else df_aux.head(n)
+
+    by_country = df.groupby("country", observed=True)
+    by_city = ["city", "country"]
+
+    return {
+        "country_restaurants": top(by_country[["restaurant_id"]].nunique(), "restaurant_id"),
+        "country_cities": top(by_country[["city"]].nunique(), "city"),
+        "country_votes": round(top(by_country[["votes"]].mean(), "votes"), 1),
+        "country_cost": round(top(by_country[["average_cost_for_two"]].mean(), "average_cost_for_two"), 2),
+        "city_restaurants": top(df.groupby(by_city, observed=True)[["restaurant_id"]].count(), "restaurant_id", 10),
+        "city_rating_gt_4": top(df.loc[df["aggregate_rating"] > 4, :]
+                                  .groupby(by_city, observed=True)[["restaurant_id"]].count(), "restaurant_id", 7),
+        "city_rating_lt_2_5": top(df.loc[df["aggregate_rating"] < 2.5, :]
+                                    .groupby(by_city, observed=True)[["restaurant_id"]].count(), "restaurant_id", 7),
+        "city_cuisines": top(df.groupby(by_city, observed=True)[["cuisines"]].nunique(), "cuisines", 10),
+    }
+
+def cube_queries(cube, countries):
+    df_cube = select_cells(cube, countries=countries)
+    df_country = country_rollup(df_cube)
+    df_city = city_rollup(df_cube)
+
+    def top(df_aux, col, n=None, ascending=False, name=None):
+        df_aux = df_aux.loc[:, [col]].sort_values(col, ascending=ascending).reset_index()
+        df_aux = df_aux if n is None else df_aux.head(n)
+        return df_aux if name is None else df_aux.rename(columns={col: name})
+
+    return {
+        "country_restaurants": top(df_country, "restaurant_id"),
+        "country_cities": top(df_country, "city"),
+        "country_votes": round(top(df_country, "votes"), 1),
+        "country_cost": round(top(df_country, "average_cost_for_two"), 2),
+        "city_restaurants": top(df_city, "restaurant_id", 10),
+        "city_rating_gt_4": top(df_city.loc[df_city["rating_gt_4"] > 0, :], "rating_gt_4", 7, name="restaurant_id"),
+        "city_rating_lt_2_5": top(df_city.loc[df_city["rating_lt_2_5"] > 0, :], "rating_lt_2_5", 7, name="restaurant_id"),
+        "city_cuisines": top(df_city, "cuisines", 10),
+    }
+
+## PARITY AND TIMING
+
+def check_parity(df, cube, countries):
+    before = dataset_queries(df, countries)
+    after = cube_queries(cube, countries)
+
+    for name in before:
+        pd.testing.assert_frame_equal(before[name], after[name], check_dtype=False,
+                                      check_categorical=False, obj=name)
+
+def time_call(func, data, countries, repeat):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data, countries)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridade e latência dos gráficos: groupby no dataset vs roll-up do cubo")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scale:
+            file_path = Path(tmp_dir) / f"raw_x{scale}.csv"
+            out_dir = Path(tmp_dir) / f"out_x{scale}"
+            out_dir.mkdir()
+
+            write_scaled_raw(scale, file_path)
+            build_artifacts(file_path, out_dir)
+
+            df = compact_frame(read_parquet(out_dir / DATA_FILE))
+            cube = read_parquet(out_dir / CUBE_FILE)
+
+            for countries in SELECTIONS:
+                countries = countries or df["country"].unique().tolist()
+                check_parity(df, cube, countries)
+
+            countries = SELECTIONS[0]
+            dataset = time_call(dataset_queries, df, countries, args.repeat)
+            rollup = time_call(cube_queries, cube, countries, args.repeat)
+
+            print(f"rows={len(df):>10,}  cells={len(cube):>7,}  parity=ok  "
+                  f"dataset={dataset * 1000:>8.1f} ms  cube={rollup * 1000:>8.1f} ms  "
+                  f"speedup={dataset / rollup:.1f}x")
+
+if __name__ == "__main__":
+    main()
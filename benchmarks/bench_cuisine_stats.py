@@ -0,0 +1,122 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_process_data import write_scaled_raw
+from fome_zero.cuisines import CuisineBridge
+from fome_zero.etl import CUISINE_BRIDGE_FILE, DATA_FILE, build_artifacts
+from fome_zero.indexes import FilterIndex
+from fome_zero.schema import compact_frame, read_parquet
+from fome_zero.stats import CuisineStats
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+COUNTRIES = ["Brazil", "England", "Qatar", "South Africa", "Canada", "Australia"]
+CUISINES = ["Home-made", "BBQ", "Japanese", "Brazilian", "Arabian", "American", "Italian"]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## STRATEGIES
+
+def legacy_charts(df, filter_index):
+    # Dois groupby completos no frame filtrado, um para cada gráfico
+    df_filtered = filter_index.select(df, country=COUNTRIES, cuisines=CUISINES)
+
+    best = df_filtered.loc[:, ['cuisines', 'aggregate_rating']].groupby('cuisines', observed=True).mean()
+    worst = df_filtered.loc[:, ['cuisines', 'aggregate_rating']].groupby('cuisines', observed=True).mean()
+
+    return best.sort_values('aggregate_rating', ascending=False), worst.sort_values('aggregate_rating')
+
+def stats_fresh(stats):
+    return stats.selection().update(COUNTRIES).frame(CUISINES)
+
+def stats_toggle(selection):
+    # Um país a mais e depois de volta: duas atualizações incrementais
+    selection.update(COUNTRIES + ["India"]).frame(CUISINES)
+
+    return selection.update(COUNTRIES).frame(CUISINES)
+
+def bridge_legacy(df, filter_index, bridge):
+    mask = filter_index.mask(country=COUNTRIES) & bridge.serving_any(CUISINES)
+
+    return (bridge.explode(filter_index.select(df, mask=mask), ['aggregate_rating'], cuisines=CUISINES)
+                  .groupby('cuisines', observed=True)
+                  .mean())
+
+## TIMING
+
+def time_call(func, *args, repeat=5):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Estatísticas por culinária: groupby por gráfico vs somas parciais por país")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scale:
+            file_path = Path(tmp_dir) / f"raw_x{scale}.csv"
+            out_dir = Path(tmp_dir) / f"out_x{scale}"
+            out_dir.mkdir()
+
+            write_scaled_raw(scale, file_path)
+            build_artifacts(file_path, out_dir)
+
+            df = compact_frame(read_parquet(out_dir / DATA_FILE))
+            bridge = CuisineBridge.read(out_dir / CUISINE_BRIDGE_FILE, n_rows=len(df))
+            filter_index = FilterIndex(df)
+
+            stats, build = timed(CuisineStats.from_dataset, df)
+            stats_all, build_all = timed(CuisineStats.from_bridge, df, bridge)
+
+            # Mesmas médias, bit a bit, que o groupby nas duas visões (culinária
+            # principal e todas): um valor x.x5 arredonda conforme o último bit
+            best, _ = legacy_charts(df, filter_index)
+            np.testing.assert_array_equal(stats_fresh(stats)["aggregate_rating"].to_numpy(),
+                                          best.sort_index()["aggregate_rating"].to_numpy())
+            np.testing.assert_array_equal(stats_fresh(stats_all)["aggregate_rating"].to_numpy(),
+                                          bridge_legacy(df, filter_index, bridge).sort_index()["aggregate_rating"].to_numpy())
+
+            selection = stats.selection().update(COUNTRIES)
+
+            legacy = time_call(legacy_charts, df, filter_index, repeat=args.repeat)
+            fresh = time_call(stats_fresh, stats, repeat=args.repeat)
+            toggle = time_call(stats_toggle, selection, repeat=args.repeat) / 2
+            legacy_all = time_call(bridge_legacy, df, filter_index, bridge, repeat=args.repeat)
+            fresh_all = time_call(stats_fresh, stats_all, repeat=args.repeat)
+
+            print(f"rows={len(df):>9,}  parity=ok  build={build * 1000:>6.1f}/{build_all * 1000:>6.1f} ms  "
+                  f"primary: 2x groupby={legacy * 1000:>6.2f} ms  "
+                  f"stats={fresh * 1000:>5.2f} ms  incremental={toggle * 1000:>5.2f} ms  "
+                  f"all cuisines: groupby={legacy_all * 1000:>6.2f} ms  stats={fresh_all * 1000:>5.2f} ms")
+
+if __name__ == "__main__":
+    main()
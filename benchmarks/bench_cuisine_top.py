@@ -0,0 +1,98 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_process_data import write_scaled_raw
+from fome_zero.etl import DATA_FILE, build_artifacts
+from fome_zero.indexes import CuisineTopIndex
+from fome_zero.schema import compact_frame, read_parquet
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+HIGHLIGHTS = ["Italian", "American", "Arabian", "Japanese", "Brazilian"]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## LEGACY
+
+def legacy_best(df, cuisine):
+    # Um bloco de métrica da página antiga: filtro + groupby + ordenação completa
+    df_aux = (df.loc[df['cuisines'] == cuisine, ['restaurant_id', 'restaurant_name', 'aggregate_rating']]
+                .groupby('restaurant_name')
+                .mean()
+                .sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True])
+                .reset_index())
+
+    return df_aux.iloc[0, 0], df_aux.iloc[0, 2]
+
+def legacy_metrics(df, cuisines):
+    return [legacy_best(df, cuisine) for cuisine in cuisines]
+
+def index_metrics(index, cuisines):
+    best = index.best(cuisines)
+
+    return list(zip(best["restaurant_name"], best["aggregate_rating"]))
+
+## TIMING
+
+def time_call(func, *args, repeat=5):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Cards de destaque por culinária: 5 groupby+sort vs índice top-k")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scale:
+            file_path = Path(tmp_dir) / f"raw_x{scale}.csv"
+            out_dir = Path(tmp_dir) / f"out_x{scale}"
+            out_dir.mkdir()
+
+            write_scaled_raw(scale, file_path)
+            build_artifacts(file_path, out_dir)
+
+            df = compact_frame(read_parquet(out_dir / DATA_FILE))
+
+            start = time.perf_counter()
+            index = CuisineTopIndex(df)
+            build = time.perf_counter() - start
+
+            # Paridade com o cálculo antigo em todas as culinárias presentes
+            all_cuisines = df["cuisines"].unique().tolist()
+            for (name, rating), (expected_name, expected_rating) in zip(index_metrics(index, all_cuisines),
+                                                                        legacy_metrics(df, all_cuisines)):
+                assert name == expected_name and np.isclose(rating, expected_rating), (name, expected_name)
+
+            legacy = time_call(legacy_metrics, df, HIGHLIGHTS, repeat=args.repeat)
+            indexed = time_call(index_metrics, index, HIGHLIGHTS, repeat=args.repeat)
+            indexed_all = time_call(index_metrics, index, all_cuisines, repeat=args.repeat)
+
+            print(f"rows={len(df):>9,}  parity=ok ({len(all_cuisines)} cuisines)  build={build * 1000:>7.1f} ms  "
+                  f"5 cards: legacy={legacy * 1000:>7.1f} ms  index={indexed * 1000:>5.2f} ms  "
+                  f"all cards: index={indexed_all * 1000:>6.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_process_data import write_scaled_raw
+from fome_zero.etl import DATA_FILE, build_artifacts, process_data_legacy
+from fome_zero.export import EXPORT_DIR, EXPORT_FORMATS, ExportCache
+from fome_zero.schema import compact_frame, read_parquet
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## LEGACY
+
+def legacy_export(dataframe):
+    # O que toda página fazia a cada rerun, mesmo sem ninguém clicar em Download,
+    # sobre o frame do código original (process_data_legacy), não o novo
+    return dataframe.to_csv(index=False, sep=";")
+
+## PARITY
+
+def read_back(path, suffix):
+    if suffix == "parquet":
+        return pd.read_parquet(path)
+
+    with pa.input_stream(str(path), compression="detect") as source:
+        return source.read().decode("utf-8")
+
+## TIMING
+
+def page_download(cache, suffix, frame):
+    # O que a página faz no rerun do clique: abre o arquivo e o download_button
+    # lê todos os bytes e calcula o id deles (sha224, como o MediaFileManager
+    # do Streamlit 1.15) antes de guardá-los em memória
+    with cache.open(suffix, None, frame) as export_file:
+        data = export_file.read()
+
+    hashlib.sha224(data).hexdigest()
+
+    return len(data)
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+
+    return result, time.perf_counter() - start
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportação dos dados tratados: CSV a cada rerun vs arquivo em cache")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scale:
+            file_path = Path(tmp_dir) / f"raw_x{scale}.csv"
+            out_dir = Path(tmp_dir) / f"out_x{scale}"
+            out_dir.mkdir()
+
+            write_scaled_raw(scale, file_path)
+            build_artifacts(file_path, out_dir)
+
+            df = compact_frame(read_parquet(out_dir / DATA_FILE))
+            cache = ExportCache(f"x{scale}", out_dir / EXPORT_DIR)
+            # Cache separado para medir o pico de memória sem reaproveitar os arquivos
+            peak_cache = ExportCache(f"x{scale}-peak", out_dir / EXPORT_DIR)
+
+            legacy_df = process_data_legacy(file_path)
+            legacy, legacy_time = timed(legacy_export, legacy_df)
+            legacy_peak = peak_memory(legacy_export, legacy_df)
+            print(f"rows={len(df):>9,}  legacy rerun={legacy_time * 1000:>7.1f} ms  "
+                  f"peak={legacy_peak / 2**20:>6.1f} MB  csv={len(legacy) / 2**20:>6.1f} MB")
+
+            for label, (suffix, _) in EXPORT_FORMATS.items():
+                path, build_time = timed(cache.get, suffix, None, lambda: df)
+                build_peak = peak_memory(peak_cache.get, suffix, None, lambda: df)
+
+                # Antes, com o arquivo pronto, isso acontecia em todo rerun de toda sessão
+                _, click_time = timed(page_download, cache, suffix, lambda: df)
+                click_peak = peak_memory(page_download, cache, suffix, lambda: df)
+
+                # Mesmos bytes do CSV antigo; o parquet é igual ao dataset tratado
+                if suffix == "parquet":
+                    pd.testing.assert_frame_equal(read_back(path, suffix), pd.read_parquet(out_dir / DATA_FILE),
+                                                  check_categorical=False)
+                else:
+                    assert read_back(path, suffix) == legacy
+
+                print(f"    {label:<11} first build={build_time * 1000:>7.1f} ms  peak={build_peak / 2**20:>5.1f} MB  "
+                      f"file={path.stat().st_size / 2**20:>6.2f} MB  click={click_time * 1000:>6.1f} ms  "
+                      f"click peak={click_peak / 2**20:>5.1f} MB  parity=ok")
+
+            print(f"    cache: {cache.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import plotly.tools
+import plotly.utils
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fome_zero.cube import city_rollup, country_rollup, select_cells
+from fome_zero.data import get_cube, get_filter_index, get_fingerprint
+from fome_zero.figures import FigureCache
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## PAGES
+
+def load_graphs(page):
+    # Importa só as funções de gráfico da página, sem executar o layout do Streamlit
+    source = (ROOT / "pages" / page).read_text(encoding="utf-8")
+    header = source.split("## LOAD DATA")[0]
+
+    spec = importlib.util.spec_from_loader(page, loader=None)
+    module = importlib.util.module_from_spec(spec)
+    exec(compile(header.replace("st.set_page_config", "(lambda **kwargs: None)"), page, "exec"), module.__dict__)
+
+    return module
+
+def chart_specs(countries_page, cities_page):
+    return [
+        ("countries/restaurants", country_rollup, countries_page.bar_graph1),
+        ("countries/cities", country_rollup, countries_page.bar_graph2),
+        ("countries/votes", country_rollup, countries_page.bar_graph3),
+        ("countries/cost_for_two", country_rollup, countries_page.bar_graph4),
+        ("cities/top_restaurants", city_rollup, cities_page.bar_graph1),
+        ("cities/top_rating_gt_4", city_rollup, cities_page.bar_graph2),
+        ("cities/top_rating_lt_2_5", city_rollup, cities_page.bar_graph3),
+        ("cities/top_cuisines", city_rollup, cities_page.graph_bar4),
+    ]
+
+## RERUNS
+
+def marshall(fig):
+    # O que o st.plotly_chart faz com a figura antes de enviá-la ao navegador
+    return json.dumps(plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True),
+                      cls=plotly.utils.PlotlyJSONEncoder)
+
+def rerun(cube, countries, specs, cache=None):
+    # Um rerun das páginas Países e Cidades: roll-ups + 8 gráficos
+    rollups = {}
+
+    for chart_id, rollup, graph in specs:
+        if rollup not in rollups:
+            rollups[rollup] = rollup(select_cells(cube, countries=countries))
+
+        build = lambda: graph(rollups[rollup])
+        fig = build() if cache is None else cache.get(chart_id, {"country": countries}, build)
+
+        marshall(fig)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reruns dos gráficos de Países e Cidades: px.bar a cada rerun vs cache de figuras")
+    parser.add_argument("--reruns", type=int, default=200)
+    parser.add_argument("--selections", type=int, default=20)
+    args = parser.parse_args()
+
+    cube = get_cube()
+    all_countries = get_filter_index().options("country")
+    countries_page = load_graphs("02_🌎_Countries.py")
+    cities_page = load_graphs("03_🏙️_Cities.py")
+    specs = chart_specs(countries_page, cities_page)
+
+    # Mesma entrada -> mesma figura (antes as cores aleatórias mudavam a cada rerun)
+    for chart_id, rollup, graph in specs:
+        df = rollup(select_cells(cube, countries=all_countries))
+        assert graph(df).to_json() == graph(df).to_json(), chart_id
+
+    # Sessões escolhem entre `selections` seleções de países, as primeiras mais populares
+    rng = np.random.default_rng(0)
+    selections = [sorted(rng.choice(all_countries, size=rng.integers(1, len(all_countries) + 1), replace=False))
+                  for _ in range(args.selections)]
+    weights = 1 / np.arange(1, args.selections + 1)
+    workload = rng.choice(args.selections, size=args.reruns, p=weights / weights.sum())
+
+    cache = FigureCache(get_fingerprint())
+    times = {"uncached": [], "cached": []}
+
+    for i in workload:
+        start = time.perf_counter()
+        rerun(cube, selections[i], specs)
+        times["uncached"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        rerun(cube, selections[i], specs, cache)
+        times["cached"].append(time.perf_counter() - start)
+
+    stats = cache.stats()
+    print("deterministic=ok")
+    for name, samples in times.items():
+        p = np.percentile(np.array(samples) * 1000, [50, 95])
+        print(f"{name:<9} rerun p50/p95={p[0]:>7.1f}/{p[1]:>7.1f} ms  mean={np.mean(samples) * 1000:>7.1f} ms")
+
+    print(f"cache hit_rate={stats['hit_rate']}  items={stats['items']}  bytes={stats['bytes'] / 2**20:.2f} MB  "
+          f"evictions={stats['evictions']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_process_data import write_scaled_raw
+from fome_zero.etl import DATA_FILE, build_artifacts
+from fome_zero.indexes import FilterIndex
+from fome_zero.schema import compact_frame, read_parquet
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Seleção padrão da página Culinárias
+COUNTRIES = ["Brazil", "England", "Qatar", "South Africa", "Canada", "Australia"]
+CUISINES = ["Home-made", "BBQ", "Japanese", "Brazilian", "Arabian", "American", "Italian"]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## FILTER PATHS
+
+# Caminho de filtros da página Culinárias a cada rerun, antes e depois do índice
+
+def isin_path(df2, _):
+    country_options = df2.loc[:, "country"].unique().tolist()
+    cuisines_options = df2.loc[:, "cuisines"].unique().tolist()
+
+    df2_cuisines = df2.loc[df2["cuisines"].isin(CUISINES), :]
+
+    df2 = df2.loc[df2["country"].isin(COUNTRIES), :]
+    df_filtered = df2[df2["country"].isin(COUNTRIES) & df2["cuisines"].isin(CUISINES)].copy()
+
+    return country_options, cuisines_options, df_filtered
+
+def index_path(df2, filter_index):
+    country_options = filter_index.options("country")
+    cuisines_options = filter_index.options("cuisines")
+
+    df_filtered = filter_index.select(df2, country=COUNTRIES, cuisines=CUISINES)
+
+    return country_options, cuisines_options, df_filtered
+
+## PARITY AND TIMING
+
+def check_parity(df2, filter_index):
+    before = isin_path(df2, None)
+    after = index_path(df2, filter_index)
+
+    assert before[0] == after[0] and before[1] == after[1]
+    pd.testing.assert_frame_equal(before[2], after[2])
+
+def time_call(func, df2, filter_index, repeat):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df2, filter_index)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridade e latência dos filtros: isin vs índice de filtros")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scale:
+            file_path = Path(tmp_dir) / f"raw_x{scale}.csv"
+            out_dir = Path(tmp_dir) / f"out_x{scale}"
+            out_dir.mkdir()
+
+            write_scaled_raw(scale, file_path)
+            build_artifacts(file_path, out_dir)
+
+            df2 = compact_frame(read_parquet(out_dir / DATA_FILE))
+
+            start = time.perf_counter()
+            filter_index = FilterIndex(df2)
+            build = time.perf_counter() - start
+
+            check_parity(df2, filter_index)
+
+            isin = time_call(isin_path, df2, filter_index, args.repeat)
+            index = time_call(index_path, df2, filter_index, args.repeat)
+
+            print(f"rows={len(df2):>10,}  parity=ok  build={build * 1000:>7.1f} ms  "
+                  f"isin={isin * 1000:>7.2f} ms  index={index * 1000:>7.2f} ms  "
+                  f"speedup={isin / index:.1f}x")
+
+if __name__ == "__main__":
+    main()
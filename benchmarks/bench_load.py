@@ -0,0 +1,308 @@
+# Teste de carga com sessões simultâneas: sobe o app localmente (streamlit run)
+# e abre N sessões pelo mesmo websocket que o navegador usa (/stream, mensagens
+# protobuf do Streamlit). Cada sessão passa pelas quatro páginas e, em cada
+# uma, muda os filtros de países, de culinárias e a quantidade de restaurantes,
+# com tempos de reflexão entre as ações.
+#
+#   python benchmarks/bench_load.py                        # 1, 5, 10 e 20 sessões
+#   python benchmarks/bench_load.py --sessions 50 --duration 60 --think 2
+#
+# Para cada quantidade de sessões: latência p50/p95/p99 dos reruns (do envio
+# da ação até o script_finished), CPU e RSS do processo do servidor (/proc).
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+from tornado.websocket import websocket_connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MAIN_SCRIPT = "01_Main_Page.py"
+
+# Nome das páginas no app_pages do Streamlit
+PAGES = ["Main_Page", "Countries", "Cities", "Cuisines"]
+
+# Rótulos dos widgets que as sessões alteram
+COUNTRY_LABEL = "Escolha o(s) país(es) que deseja visualizar os restaurantes"
+CUISINE_LABEL = "Escolha o(s) tipo(s) culinário(s)"
+RESTAURANTS_LABEL = "Selecione a quantidade de restaurantes que deseja visualizar"
+
+DEFAULT_SESSIONS = [1, 5, 10, 20]
+
+# Tempo de reflexão log-normal: mediana --think segundos
+THINK_SIGMA = 0.5
+
+SAMPLE_SECONDS = 0.5
+STARTUP_TIMEOUT = 120
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## SERVER
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+
+        return sock.getsockname()[1]
+
+def start_server(port):
+    command = [sys.executable, "-m", "streamlit", "run", MAIN_SCRIPT,
+               "--server.headless", "true",
+               "--server.port", str(port),
+               "--server.address", "127.0.0.1",
+               "--server.fileWatcherType", "none",
+               "--browser.gatherUsageStats", "false"]
+
+    server = subprocess.Popen(command, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+
+    server.kill()
+    raise RuntimeError("o servidor do Streamlit não respondeu no /healthz")
+
+def process_usage(pid):
+    # (segundos de CPU, RSS em bytes) do processo
+    with open(f"/proc/{pid}/stat") as stat_file:
+        fields = stat_file.read().rsplit(")", 1)[1].split()
+
+    with open(f"/proc/{pid}/statm") as statm_file:
+        rss_pages = int(statm_file.read().split()[1])
+
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS, rss_pages * PAGE_SIZE
+
+async def sample_usage(pid, samples, stop):
+    while not stop.is_set():
+        samples.append(process_usage(pid))
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+## SESSION
+
+def widget_state(widget_id, value):
+    state = WidgetState(id=widget_id)
+
+    if isinstance(value, list):
+        state.int_array_value.data.extend(value)
+    else:
+        state.int_value = value
+
+    return state
+
+class LoadSession:
+    # Uma aba do navegador: guarda os hashes das páginas, os widgets da última
+    # execução e os valores que a sessão já alterou na página atual.
+    def __init__(self, url, rng, think):
+        self.url = url
+        self.rng = rng
+        self.think = think
+        self.connection = None
+        self.pages = {}
+        self.page_hash = ""
+        self.widgets = {}
+        self.states = {}
+        self.latencies = []
+        self.errors = 0
+
+    async def connect(self):
+        self.connection = await websocket_connect(self.url, subprotocols=["streamlit"], max_message_size=2**30)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    async def rerun(self):
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+
+        self.widgets = {}
+        start = time.perf_counter()
+        await self.connection.write_message(msg.SerializeToString(), binary=True)
+
+        while True:
+            payload = await self.connection.read_message()
+            if payload is None:
+                raise ConnectionError("websocket fechado pelo servidor")
+
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof("type")
+
+            if kind == "new_session":
+                self.pages = {page.page_name: page.page_script_hash for page in forward.new_session.app_pages}
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                widget = getattr(element, element.WhichOneof("type") or "empty")
+                if hasattr(widget, "id") and hasattr(widget, "label") and widget.id:
+                    self.widgets[widget.label] = widget
+            elif kind == "page_not_found":
+                self.errors += 1
+            elif kind == "script_finished":
+                self.latencies.append(time.perf_counter() - start)
+                if forward.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    self.errors += 1
+                return
+
+    async def pause(self):
+        await asyncio.sleep(self.rng.lognormvariate(np.log(self.think), THINK_SIGMA) if self.think > 0 else 0)
+
+    async def open_page(self, name):
+        self.page_hash = self.pages.get(name, "")
+        self.states = {}
+        await self.rerun()
+
+    async def change(self, label, value):
+        widget = self.widgets.get(label)
+        if widget is None:
+            return
+
+        self.states[widget.id] = widget_state(widget.id, value(widget))
+        await self.pause()
+        await self.rerun()
+
+    def pick_options(self, widget, low, high):
+        size = self.rng.randint(low, min(high, len(widget.options)))
+
+        return sorted(self.rng.sample(range(len(widget.options)), size))
+
+    async def browse(self, deadline):
+        # Primeira execução: página principal e lista de páginas do app
+        await self.rerun()
+
+        while time.monotonic() < deadline:
+            for name in PAGES:
+                if time.monotonic() >= deadline:
+                    break
+
+                await self.pause()
+                await self.open_page(name)
+
+                await self.change(COUNTRY_LABEL, lambda widget: self.pick_options(widget, 1, 8))
+                await self.change(CUISINE_LABEL, lambda widget: self.pick_options(widget, 1, 10))
+                await self.change(RESTAURANTS_LABEL, lambda widget: self.rng.randint(5, 100))
+
+## LOAD LEVELS
+
+async def run_level(url, pid, n_sessions, duration, think, seed):
+    sessions = [LoadSession(url, random.Random(seed + i), think) for i in range(n_sessions)]
+    await asyncio.gather(*(session.connect() for session in sessions))
+
+    samples, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(sample_usage(pid, samples, stop))
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(session.browse(start + duration) for session in sessions), return_exceptions=True)
+    wall = time.monotonic() - start
+
+    stop.set()
+    await sampler
+    samples.append(process_usage(pid))
+
+    for session in sessions:
+        session.close()
+
+    latencies = np.array([latency for session in sessions for latency in session.latencies]) * 1000
+    errors = sum(session.errors for session in sessions) + sum(isinstance(result, Exception) for result in results)
+    cpu = (samples[-1][0] - samples[0][0]) / wall
+    rss = max(rss for _, rss in samples)
+
+    return {
+        "sessions": n_sessions,
+        "reruns": len(latencies),
+        "errors": errors,
+        "reruns_per_s": round(len(latencies) / wall, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 1) if len(latencies) else None,
+        "p95_ms": round(float(np.percentile(latencies, 95)), 1) if len(latencies) else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 1) if len(latencies) else None,
+        "cpu_percent": round(cpu * 100, 1),
+        "rss_mb": round(rss / 2**20, 1),
+    }
+
+async def run_load(args):
+    port = free_port()
+    server = start_server(port)
+    url = f"ws://127.0.0.1:{port}/stream"
+
+    try:
+        # Aquecimento: ETL, índices e caches prontos antes das medições
+        warmup = LoadSession(url, random.Random(args.seed), 0)
+        await warmup.connect()
+        await warmup.browse(time.monotonic())
+        for name in PAGES:
+            await warmup.open_page(name)
+        warmup.close()
+
+        idle_rss = process_usage(server.pid)[1]
+        report = {"idle_rss_mb": round(idle_rss / 2**20, 1), "levels": []}
+
+        print(f"servidor em {url}  RSS ocioso={report['idle_rss_mb']} MB")
+
+        for n_sessions in args.sessions:
+            level = await run_level(url, server.pid, n_sessions, args.duration, args.think, args.seed)
+            level["rss_per_session_mb"] = round((level["rss_mb"] - report["idle_rss_mb"]) / n_sessions, 2)
+            report["levels"].append(level)
+
+            print(f"sessions={n_sessions:>4}  reruns={level['reruns']:>5} ({level['reruns_per_s']:>6.2f}/s)  "
+                  f"errors={level['errors']}  p50={level['p50_ms']} ms  p95={level['p95_ms']} ms  p99={level['p99_ms']} ms  "
+                  f"cpu={level['cpu_percent']:>5.1f}%  rss={level['rss_mb']:>7.1f} MB  "
+                  f"rss/session={level['rss_per_session_mb']:>6.2f} MB")
+
+            # Sessões fechadas liberam o estado antes do próximo nível
+            await asyncio.sleep(1)
+
+        return report
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do app Streamlit com N sessões simultâneas em um servidor local")
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS)
+    parser.add_argument("--duration", type=float, default=30, help="segundos de carga por quantidade de sessões")
+    parser.add_argument("--think", type=float, default=1.0, help="mediana do tempo de reflexão entre ações (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="grava o relatório em JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args))
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
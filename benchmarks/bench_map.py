@@ -0,0 +1,95 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import folium
+import numpy as np
+from folium.plugins import MarkerCluster
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fome_zero.data import get_dataset
+from fome_zero.maps import build_map
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## INPUT
+
+def scaled_points(dataframe, points, seed=0):
+    # Repete os restaurantes até `points` linhas, com um pequeno deslocamento
+    # nas coordenadas para que os marcadores não se sobreponham exatamente.
+    rng = np.random.default_rng(seed)
+    df = dataframe.iloc[np.arange(points) % len(dataframe)].reset_index(drop=True)
+
+    df["latitude"] = df["latitude"] + rng.normal(0, 0.01, points)
+    df["longitude"] = df["longitude"] + rng.normal(0, 0.01, points)
+
+    return df
+
+## MAP BUILDERS
+
+def legacy_map(dataframe):
+    # create_map antigo: um Marker, Popup e Icon do folium por restaurante
+    f = folium.Figure(width=1920, height=1080)
+
+    m = folium.Map(max_bounds=True).add_to(f)
+
+    marker_cluster = MarkerCluster().add_to(m)
+
+    for _, line in dataframe.iterrows():
+
+        html = "<p><strong>{}</strong></p>"
+        html += "<p>Price: {},00 ({}) para dois"
+        html += "<br />Type: {}"
+        html += "<br />Aggragate Rating: {}/5.0"
+        html = html.format(line["restaurant_name"], line["average_cost_for_two"], line["currency"],
+                           line["cuisines"], line["aggregate_rating"])
+
+        popup = folium.Popup(folium.Html(html, script=True), max_width=500)
+
+        folium.Marker(
+            [line["latitude"], line["longitude"]],
+            popup=popup,
+            icon=folium.Icon(color=f'{line["color_name"]}', icon="home", prefix="fa"),
+        ).add_to(marker_cluster)
+
+    return m
+
+def render(build, dataframe):
+    # Tempo até o HTML final, que é o que o folium_static entrega ao navegador
+    start = time.perf_counter()
+    html = build(dataframe).get_root().render()
+
+    return time.perf_counter() - start, len(html.encode("utf-8"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de montagem e tamanho do HTML do mapa: iterrows vs camada única")
+    parser.add_argument("--points", type=int, nargs="+", default=[7000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="acima desse número de pontos o mapa antigo não é medido")
+    args = parser.parse_args()
+
+    dataset = get_dataset()
+
+    for points in args.points:
+        df = scaled_points(dataset, points)
+
+        bulk_time, bulk_size = render(build_map, df)
+        line = f"points={points:>9,}  bulk={bulk_time:>7.2f} s {bulk_size / 2**20:>8.1f} MB"
+
+        if points <= args.legacy_max:
+            legacy_time, legacy_size = render(legacy_map, df)
+            line += (f"  legacy={legacy_time:>7.2f} s {legacy_size / 2**20:>8.1f} MB"
+                     f"  speedup={legacy_time / bulk_time:.0f}x  size={legacy_size / bulk_size:.1f}x")
+
+        print(line)
+
+if __name__ == "__main__":
+    main()
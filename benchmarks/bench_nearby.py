@@ -0,0 +1,110 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_map import scaled_points
+from fome_zero.data import get_dataset
+from fome_zero.nearby import NearbyIndex, haversine_km
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+K = 10
+RADIUS_KM = 2.0
+CUISINES = ["Japanese"]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## BRUTE FORCE
+
+def brute_nearest(latitude, longitude, lat, lon, k, keep=None):
+    distance = haversine_km(latitude, longitude, lat, lon)
+
+    if keep is not None:
+        distance = np.where(keep, distance, np.inf)
+
+    rows = np.argpartition(distance, k)[:k]
+
+    return np.sort(distance[rows])
+
+def brute_within(latitude, longitude, lat, lon, radius_km):
+    return np.flatnonzero(haversine_km(latitude, longitude, lat, lon) <= radius_km)
+
+## TIMING
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+
+    return result, time.perf_counter() - start
+
+def percentiles(samples):
+    return np.percentile(np.array(samples) * 1000, [50, 95])
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de kNN e busca por raio: KD-tree vs força bruta em NumPy")
+    parser.add_argument("--points", type=int, nargs="+", default=[7000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    dataset = get_dataset()
+    rng = np.random.default_rng(0)
+
+    for points in args.points:
+        df = scaled_points(dataset, points)
+
+        index, build = timed(NearbyIndex, df)
+
+        lat = df["latitude"].to_numpy(dtype=np.float64)
+        lon = df["longitude"].to_numpy(dtype=np.float64)
+        japanese = df["cuisines"].isin(CUISINES).to_numpy()
+
+        # Consultas perto de restaurantes existentes (como um usuário na cidade)
+        origins = rng.integers(0, points, args.queries)
+        query_lat = lat[origins] + rng.normal(0, 0.02, args.queries)
+        query_lon = lon[origins] + rng.normal(0, 0.02, args.queries)
+
+        times = {"knn": [], "knn_filtered": [], "radius": [], "brute_knn": [], "brute_radius": []}
+
+        for q_lat, q_lon in zip(query_lat, query_lon):
+            knn, elapsed = timed(index.nearest, q_lat, q_lon, k=K)
+            times["knn"].append(elapsed)
+
+            knn_filtered, elapsed = timed(index.nearest, q_lat, q_lon, k=K, cuisines=CUISINES)
+            times["knn_filtered"].append(elapsed)
+
+            radius, elapsed = timed(index.within, q_lat, q_lon, RADIUS_KM, None)
+            times["radius"].append(elapsed)
+
+            expected, elapsed = timed(brute_nearest, q_lat, q_lon, lat, lon, K)
+            times["brute_knn"].append(elapsed)
+
+            expected_radius, elapsed = timed(brute_within, q_lat, q_lon, lat, lon, RADIUS_KM)
+            times["brute_radius"].append(elapsed)
+
+            # Mesmas distâncias e mesmo conjunto de linhas que a força bruta
+            np.testing.assert_allclose(knn["distance_km"].to_numpy(), expected, rtol=1e-6, atol=1e-6)
+            np.testing.assert_allclose(knn_filtered["distance_km"].to_numpy(),
+                                       brute_nearest(q_lat, q_lon, lat, lon, K, keep=japanese),
+                                       rtol=1e-6, atol=1e-6)
+            assert set(radius["row"]) == set(expected_radius)
+
+        summary = "  ".join(f"{name} p50/p95={p[0]:.3f}/{p[1]:.3f} ms"
+                            for name, p in ((name, percentiles(t)) for name, t in times.items()))
+
+        print(f"points={points:>9,}  parity=ok  build={build:>6.2f} s  {summary}")
+
+if __name__ == "__main__":
+    main()
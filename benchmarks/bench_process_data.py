@@ -0,0 +1,77 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fome_zero.etl import RAW_DATA_PATH, process_data, process_data_legacy
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## SCALED INPUT
+
+def write_scaled_raw(scale, out_path):
+    # Replica o arquivo bruto `scale` vezes, deslocando o Restaurant ID para
+    # que a taxa de duplicatas se mantenha igual à do arquivo original.
+    df_raw = pd.read_csv(RAW_DATA_PATH)
+    offset = int(df_raw["Restaurant ID"].max()) + 1
+
+    copies = []
+    for i in range(scale):
+        df_aux = df_raw.copy()
+        df_aux["Restaurant ID"] = df_aux["Restaurant ID"] + i * offset
+        copies.append(df_aux)
+
+    df = pd.concat(copies, ignore_index=True)
+    df.to_csv(out_path, index=False)
+
+    return len(df)
+
+## PARITY AND TIMING
+
+def check_parity(file_path):
+    pd.testing.assert_frame_equal(process_data_legacy(file_path), process_data(file_path))
+
+def time_call(func, file_path, repeat):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(file_path)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridade e linhas/segundo do process_data antigo vs vetorizado")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scale:
+            file_path = Path(tmp_dir) / f"raw_x{scale}.csv"
+            rows = write_scaled_raw(scale, file_path)
+
+            check_parity(file_path)
+
+            legacy = time_call(process_data_legacy, file_path, args.repeat)
+            vectorized = time_call(process_data, file_path, args.repeat)
+
+            print(f"rows={rows:>10,}  parity=ok  "
+                  f"legacy={rows / legacy:>12,.0f} rows/s  "
+                  f"vectorized={rows / vectorized:>12,.0f} rows/s  "
+                  f"speedup={legacy / vectorized:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "startup_baseline.json"
+
+PAGES = ["01_Main_Page.py"] + sorted(path.relative_to(BASE_DIR).as_posix() for path in (BASE_DIR / "pages").glob("*.py"))
+
+# Bibliotecas pesadas que cada página só deve carregar quando desenha aquilo
+# que precisa delas (mapa, gráfico, busca por proximidade)
+HEAVY_MODULES = ["folium", "streamlit_folium", "plotly.express", "scipy.spatial", "inflection"]
+
+# Uma página regride quando passa do baseline por mais que a tolerância
+# relativa e a folga absoluta (ruído de processos curtos)
+TOLERANCE = 0.25
+SLACK_MS = 100
+
+# Roda num processo novo: primeiro só os imports do topo da página (ast) e
+# depois o script inteiro em bare mode, que já encontra os módulos carregados.
+DRIVER = """
+import ast, json, runpy, sys, time
+
+page = sys.argv[1]
+tree = ast.parse(open(page, encoding="utf-8").read())
+imports = ast.Module(body=[node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))], type_ignores=[])
+
+start = time.perf_counter()
+exec(compile(imports, page, "exec"), {"__name__": "__imports__"})
+imported = time.perf_counter()
+
+try:
+    runpy.run_path(page, run_name="__main__")
+except SystemExit:
+    pass
+rendered = time.perf_counter()
+
+print(json.dumps({"imports_ms": (imported - start) * 1000, "render_ms": (rendered - imported) * 1000,
+                  "modules": [name for name in HEAVY_MODULES if name in sys.modules]}))
+"""
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## MEASURE
+
+def measure_page(page):
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR))
+    driver = f"HEAVY_MODULES = {HEAVY_MODULES!r}\n{DRIVER}"
+
+    result = subprocess.run([sys.executable, "-c", driver, page], cwd=BASE_DIR, env=env, check=True,
+                            capture_output=True, text=True)
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def measure(pages, repeat=5):
+    # Mediana de `repeat` cold starts por página
+    report = {}
+
+    for page in pages:
+        runs = [measure_page(page) for _ in range(repeat)]
+
+        report[page] = {
+            "imports_ms": round(statistics.median(run["imports_ms"] for run in runs), 1),
+            "render_ms": round(statistics.median(run["render_ms"] for run in runs), 1),
+            "modules": runs[-1]["modules"],
+        }
+
+    return report
+
+## BASELINE
+
+def regressions(report, baseline):
+    found = []
+
+    for page, current in report.items():
+        previous = baseline.get(page)
+        if previous is None:
+            continue
+
+        for key in ("imports_ms", "render_ms"):
+            limit = previous[key] * (1 + TOLERANCE) + SLACK_MS
+            if current[key] > limit:
+                found.append(f"{page}: {key} {current[key]:.0f} ms > {limit:.0f} ms (baseline {previous[key]:.0f} ms)")
+
+        new_modules = sorted(set(current["modules"]) - set(previous["modules"]))
+        if new_modules:
+            found.append(f"{page}: passou a importar {', '.join(new_modules)} no cold start")
+
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start por página: tempo de import e primeira renderização vs baseline")
+    parser.add_argument("pages", nargs="*", default=PAGES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--update-baseline", action="store_true", help="grava as medições atuais como baseline")
+    args = parser.parse_args()
+
+    # Artefatos prontos antes de medir: o cold start não inclui o ETL
+    subprocess.run([sys.executable, "-m", "fome_zero.etl"], cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL)
+
+    report = measure(args.pages, repeat=args.repeat)
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+
+    for page, current in report.items():
+        previous = baseline.get(page, {})
+        print(f"{page:<32} imports={current['imports_ms']:>7.1f} ms (baseline {previous.get('imports_ms', float('nan')):>7.1f})  "
+              f"render={current['render_ms']:>7.1f} ms (baseline {previous.get('render_ms', float('nan')):>7.1f})  "
+              f"heavy={','.join(current['modules']) or '-'}")
+
+    if args.update_baseline:
+        BASELINE_PATH.write_text(json.dumps({**baseline, **report}, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        return
+
+    found = regressions(report, baseline)
+    for line in found:
+        print(f"REGRESSÃO {line}")
+
+    sys.exit(1 if found else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Pico de memória do ETL streaming por tamanho do arquivo bruto: com o
+# orçamento fixo, o pico não deve crescer com o número de linhas além dos
+# conjuntos de chaves da deduplicação (SeenKeys).
+#
+#   python benchmarks/bench_streaming_memory.py                 # 250k e 1M
+#   python benchmarks/bench_streaming_memory.py --sizes 250k 1M 4M --memory-mb 32
+#
+# Cada tamanho roda num processo novo (pico de RSS do processo, que inclui os
+# buffers do pyarrow). Sai com código 1 quando o crescimento passa do limite.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fome_zero.synthetic import format_size, parse_size, write_synthetic_raw
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_SIZES = ["250k", "1M"]
+DEFAULT_MEMORY_MB = 32
+
+# O que pode crescer com a entrada: os dois SeenKeys (IDs e hashes de linha,
+# 8 bytes por linha distinta cada) e as cópias da fusão das execuções deles.
+# Acima disso, algo voltou a guardar o arquivo inteiro em memória.
+MAX_BYTES_PER_ROW = 64
+
+# VmHWM e não ru_maxrss: o ru_maxrss sobrevive ao exec e traria o pico do
+# processo pai, que acabou de gerar o arquivo sintético
+DRIVER = """
+import json, sys
+from pathlib import Path
+from fome_zero.etl import build_artifacts
+
+stats = build_artifacts(Path(sys.argv[1]), Path(sys.argv[2]), memory_mb=float(sys.argv[3]))
+peak_kb = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmHWM:"))
+print(json.dumps({"rows": stats["rows"], "peak_mb": peak_kb / 1024}))
+"""
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+def measure_size(rows, memory_mb, tmp_dir, seed=0):
+    raw_path = Path(tmp_dir) / f"raw_{rows}.csv"
+    out_dir = Path(tmp_dir) / f"out_{rows}"
+    out_dir.mkdir()
+
+    written = write_synthetic_raw(rows, raw_path, seed=seed)
+
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR))
+    result = subprocess.run([sys.executable, "-c", DRIVER, str(raw_path), str(out_dir), str(memory_mb)],
+                            cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True)
+
+    raw_path.unlink()
+
+    return {"raw_rows": written, **json.loads(result.stdout.strip().splitlines()[-1])}
+
+def growth_per_row(results):
+    first, last = results[0], results[-1]
+
+    return (last["peak_mb"] - first["peak_mb"]) * 2**20 / max(last["raw_rows"] - first["raw_rows"], 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pico de RSS do ETL streaming por tamanho do arquivo bruto sintético")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="tamanhos do arquivo bruto (ex.: 250k 1M)")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sorted(args.sizes, key=parse_size):
+            result = measure_size(parse_size(size), args.memory_mb, tmp_dir, args.seed)
+            results.append(result)
+
+            print(f"{format_size(result['raw_rows']):>6}: {result['rows']:>10,} linhas  peak={result['peak_mb']:>7.1f} MB")
+
+    growth = growth_per_row(results)
+    print(f"crescimento: {growth:.1f} bytes por linha bruta (limite {MAX_BYTES_PER_ROW})")
+
+    sys.exit(1 if growth > MAX_BYTES_PER_ROW else 0)
+
+if __name__ == "__main__":
+    main()
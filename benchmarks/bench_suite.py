@@ -0,0 +1,254 @@
+# Suíte de benchmarks por tamanho de dataset: ETL, filtros, agregações de todos
+# os gráficos e montagem do mapa, com tempo e pico de memória de cada etapa.
+#
+#   python benchmarks/bench_suite.py                          # 10k, 100k e 1M
+#   python benchmarks/bench_suite.py --sizes 10M 50M --repeat 1
+#   python benchmarks/bench_suite.py --compare benchmarks/results/<label>.json
+#
+# Os resultados ficam em benchmarks/results/<label>.json (label padrão: commit
+# atual) para comparar versões.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fome_zero.clusters import ClusterPyramid
+from fome_zero.cube import city_rollup, country_rollup, select_cells
+from fome_zero.etl import CLUSTER_PYRAMID_FILE, CUBE_FILE, DATA_FILE, build_artifacts
+from fome_zero.indexes import TOP_TABLE_COLUMNS, CuisineTopIndex, FilterIndex, TopRestaurantIndex
+from fome_zero.maps import DEFAULT_VIEW, MAP_CLIENT_MAX_POINTS, build_viewport_map, map_html, query_bounds, render_map_html
+from fome_zero.metrics import (city_top_cuisines, city_top_rating_gt_4, city_top_rating_lt_2_5, city_top_restaurants,
+                               country_cities, country_cost_for_two, country_restaurants, country_votes, cuisine_best,
+                               cuisine_worst)
+from fome_zero.schema import compact_frame, read_parquet
+from fome_zero.stats import CuisineStats
+from fome_zero.synthetic import format_size, parse_size, write_synthetic_raw
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_SIZES = ["10k", "100k", "1M"]
+
+# Seleções padrão das páginas
+MAIN_COUNTRIES = ["Brazil", "United States of America", "Canada", "England", "Australia", "South Africa"]
+CUISINE_COUNTRIES = ["Brazil", "England", "Qatar", "South Africa", "Canada", "Australia"]
+CUISINES = ["Home-made", "BBQ", "Japanese", "Brazilian", "Arabian", "American", "Italian"]
+HIGHLIGHTS = ["Italian", "American", "Arabian", "Japanese", "Brazilian"]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## STAGES
+
+def load_stage(out_dir):
+    return compact_frame(read_parquet(out_dir / DATA_FILE))
+
+def filter_stage(ctx):
+    return ctx["filter_index"].select(ctx["df"], country=CUISINE_COUNTRIES, cuisines=CUISINES)
+
+def countries_stage(ctx):
+    df_country = country_rollup(select_cells(ctx["cube"], countries=MAIN_COUNTRIES))
+
+    return [func(df_country) for func in (country_restaurants, country_cities, country_votes, country_cost_for_two)]
+
+def cities_stage(ctx):
+    df_city = city_rollup(select_cells(ctx["cube"], countries=MAIN_COUNTRIES))
+
+    return [func(df_city) for func in (city_top_restaurants, city_top_rating_gt_4, city_top_rating_lt_2_5, city_top_cuisines)]
+
+def cuisines_stage(ctx):
+    df_cuisine_ratings = ctx["cuisine_stats"].selection().update(CUISINE_COUNTRIES).frame(CUISINES)
+
+    return cuisine_best(df_cuisine_ratings), cuisine_worst(df_cuisine_ratings)
+
+def highlights_stage(ctx):
+    return ctx["cuisine_top_index"].best(HIGHLIGHTS)
+
+def top_restaurants_stage(ctx):
+    mask = ctx["filter_index"].mask(country=CUISINE_COUNTRIES, cuisines=CUISINES)
+    rows, _ = ctx["top_restaurant_index"].top(mask, 10)
+
+    return ctx["df"].take(rows).loc[:, TOP_TABLE_COLUMNS]
+
+def map_stage(ctx):
+    # Mesma decisão da página principal: mapa completo até MAP_CLIENT_MAX_POINTS
+    # restaurantes, acima disso o mapa por viewport a partir da pirâmide
+    mask = ctx["filter_index"].mask(country=MAIN_COUNTRIES)
+
+    if mask.sum() <= MAP_CLIENT_MAX_POINTS:
+        return render_map_html(ctx["filter_index"].select(ctx["df"], mask=mask))
+
+    clusters = ctx["pyramid"].query(query_bounds(DEFAULT_VIEW["bounds"]), DEFAULT_VIEW["zoom"], MAIN_COUNTRIES)
+
+    return map_html(build_viewport_map(ctx["df"], clusters, DEFAULT_VIEW))
+
+# Índices construídos uma vez por versão dos dados (get_* do fome_zero.data)
+BUILD_STAGES = {
+    "filter_index_build": ("filter_index", lambda ctx: FilterIndex(ctx["df"])),
+    "cuisine_stats_build": ("cuisine_stats", lambda ctx: CuisineStats.from_dataset(ctx["df"])),
+    "cuisine_top_build": ("cuisine_top_index", lambda ctx: CuisineTopIndex(ctx["df"])),
+    "top_restaurants_build": ("top_restaurant_index", lambda ctx: TopRestaurantIndex(ctx["df"])),
+}
+
+# Trabalho de cada rerun das páginas
+QUERY_STAGES = {
+    "filter": filter_stage,
+    "charts_countries": countries_stage,
+    "charts_cities": cities_stage,
+    "charts_cuisines": cuisines_stage,
+    "cuisine_highlights": highlights_stage,
+    "top_restaurants": top_restaurants_stage,
+    "map": map_stage,
+}
+
+## MEASURE
+
+def time_call(func, *args, repeat=3):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def peak_memory(func, *args):
+    # Pico de alocação (numpy/pandas/python) em uma execução separada, já que o
+    # tracemalloc deixa a execução mais lenta. Buffers do pyarrow não entram.
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, peak / 2**20
+
+def measure(func, *args, repeat=3, memory=True):
+    # Devolve (resultado, {"seconds", "peak_mb"})
+    if memory:
+        result, peak_mb = peak_memory(func, *args)
+    else:
+        result, peak_mb = func(*args), None
+
+    return result, {"seconds": round(time_call(func, *args, repeat=repeat), 5),
+                    "peak_mb": None if peak_mb is None else round(peak_mb, 2)}
+
+def run_size(rows, tmp_dir, repeat, memory, seed):
+    tmp_dir = Path(tmp_dir)
+    file_path = tmp_dir / "raw.csv"
+    results = {}
+
+    start = time.perf_counter()
+    written = write_synthetic_raw(rows, file_path, seed=seed)
+    generate = time.perf_counter() - start
+
+    # ETL sempre num diretório novo, então cada execução refaz todos os artefatos;
+    # a primeira (medição de memória ou resultado) fornece os artefatos das etapas
+    runs = iter(range(repeat + 1))
+
+    def etl():
+        out_dir = tmp_dir / f"out_{next(runs)}"
+        out_dir.mkdir()
+        build_artifacts(file_path, out_dir)
+
+        return out_dir
+
+    out_dir, results["etl"] = measure(etl, repeat=repeat, memory=memory)
+
+    ctx = {"cube": read_parquet(out_dir / CUBE_FILE), "pyramid": ClusterPyramid.read(out_dir / CLUSTER_PYRAMID_FILE)}
+    ctx["df"], results["load"] = measure(load_stage, out_dir, repeat=repeat, memory=memory)
+
+    for name, (key, build) in BUILD_STAGES.items():
+        ctx[key], results[name] = measure(build, ctx, repeat=repeat, memory=memory)
+
+    for name, stage in QUERY_STAGES.items():
+        _, results[name] = measure(stage, ctx, repeat=repeat, memory=memory)
+
+    return {"rows": written, "dataset_rows": len(ctx["df"]), "generate_seconds": round(generate, 3), "stages": results}
+
+## RESULTS
+
+def git_label():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+def print_size(size, result, previous=None):
+    print(f"{size}: {result['rows']:,} linhas brutas, {result['dataset_rows']:,} após o ETL")
+
+    for name, current in result["stages"].items():
+        line = f"    {name:<24} {current['seconds'] * 1000:>10.2f} ms"
+        if current["peak_mb"] is not None:
+            line += f"  peak={current['peak_mb']:>9.1f} MB"
+
+        old = (previous or {}).get("stages", {}).get(name)
+        if old:
+            line += f"  vs {old['seconds'] * 1000:>10.2f} ms ({current['seconds'] / max(old['seconds'], 1e-9):>5.2f}x)"
+
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo e memória do ETL, filtros, gráficos e mapa por tamanho de dataset sintético")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="tamanhos do arquivo bruto (ex.: 10k 1M 50M)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="não mede o pico de memória (mais rápido)")
+    parser.add_argument("--label", default=None, help="nome do arquivo de resultados (padrão: commit atual)")
+    parser.add_argument("--compare", type=Path, default=None, help="resultados de outra versão para comparar")
+    args = parser.parse_args()
+
+    previous = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else {"sizes": {}}
+    label = args.label or git_label()
+
+    report = {
+        "label": label,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+
+    for size in args.sizes:
+        rows = parse_size(size)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = run_size(rows, tmp_dir, args.repeat, not args.no_memory, args.seed)
+
+        report["sizes"][format_size(rows)] = result
+        print_size(format_size(rows), result, previous["sizes"].get(format_size(rows)))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / f"{label}.json"
+    out_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"resultados em {out_path.relative_to(BASE_DIR)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_process_data import write_scaled_raw
+from fome_zero.etl import DATA_FILE, build_artifacts
+from fome_zero.indexes import TOP_TABLE_COLUMNS, FilterIndex, TopRestaurantIndex
+from fome_zero.schema import compact_frame, read_parquet
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Seleção padrão da página de culinárias e o pior caso (dataset inteiro)
+SELECTIONS = {
+    "default": {
+        "country": ["Brazil", "England", "Qatar", "South Africa", "Canada", "Australia"],
+        "cuisines": ["Home-made", "BBQ", "Japanese", "Brazilian", "Arabian", "American", "Italian"],
+    },
+    "all": {},
+}
+
+PAGE_SIZE = 25
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## LEGACY
+
+def legacy_table(df, filter_index, selection, n):
+    return (filter_index.select(df, **selection)
+                        .loc[:, TOP_TABLE_COLUMNS]
+                        .drop_duplicates(subset=['restaurant_name'])
+                        .sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True])
+                        .head(n))
+
+def index_table(df, index, mask, n, sort_by="aggregate_rating", ascending=False):
+    rows, _ = index.top(mask, n, sort_by=sort_by, ascending=ascending, page=0, page_size=PAGE_SIZE)
+
+    return df.take(rows).loc[:, TOP_TABLE_COLUMNS]
+
+## TIMING
+
+def time_call(func, *args, repeat=5):
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabela Top Restaurantes: drop_duplicates + sort completo vs índice top-N paginado")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--n", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scale:
+            file_path = Path(tmp_dir) / f"raw_x{scale}.csv"
+            out_dir = Path(tmp_dir) / f"out_x{scale}"
+            out_dir.mkdir()
+
+            write_scaled_raw(scale, file_path)
+            build_artifacts(file_path, out_dir)
+
+            df = compact_frame(read_parquet(out_dir / DATA_FILE))
+            filter_index = FilterIndex(df)
+
+            start = time.perf_counter()
+            index = TopRestaurantIndex(df)
+            build = time.perf_counter() - start
+
+            print(f"rows={len(df):>9,}  build={build * 1000:.1f} ms")
+
+            for name, selection in SELECTIONS.items():
+                mask = filter_index.mask(**selection)
+
+                for n in args.n:
+                    # Mesmas linhas, na mesma ordem, da primeira página da tabela antiga
+                    legacy = legacy_table(df, filter_index, selection, n)
+                    assert index_table(df, index, mask, n).index.tolist() == legacy.index[:PAGE_SIZE].tolist()
+
+                    old = time_call(legacy_table, df, filter_index, selection, n, repeat=args.repeat)
+                    new = time_call(index_table, df, index, mask, n, repeat=args.repeat)
+                    by_cost = time_call(index_table, df, index, mask, n, "average_cost_for_two", True, repeat=args.repeat)
+
+                    print(f"    {name:<8} N={n:>5}  parity=ok  legacy={old * 1000:>7.1f} ms  "
+                          f"index page={new * 1000:>6.2f} ms  sorted by cost={by_cost * 1000:>6.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_map import scaled_points
+from fome_zero.clusters import CLUSTER_PX, TILE_PX, ClusterPyramid, build_pyramid, mercator
+from fome_zero.data import get_dataset
+from fome_zero.maps import MAP_HEIGHT, MAP_WIDTH, query_bounds
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## VIEWPORTS
+
+def viewport(latitude, longitude, zoom):
+    # Bounds de um mapa MAP_WIDTH x MAP_HEIGHT centrado no ponto
+    x, y = mercator(latitude, longitude)
+    world = TILE_PX * 2**zoom
+
+    xs = np.clip([x - MAP_WIDTH / 2 / world, x + MAP_WIDTH / 2 / world], 0, 1)
+    ys = np.clip([y + MAP_HEIGHT / 2 / world, y - MAP_HEIGHT / 2 / world], 0, 1)
+
+    lons = xs * 360 - 180
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * ys))))
+
+    return ((float(lats[0]), float(lons[0])), (float(lats[1]), float(lons[1])))
+
+def random_viewports(dataframe, n, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(dataframe), n)
+    zooms = rng.integers(2, 15, n)
+
+    return [(viewport(dataframe["latitude"].iat[r], dataframe["longitude"].iat[r], z), int(z))
+            for r, z in zip(rows, zooms)]
+
+## BRUTE FORCE
+
+def brute_force(latitude, longitude, bounds, zoom):
+    # Sem pirâmide: filtra todos os pontos do viewport e agrupa na hora
+    (south, west), (north, east) = bounds
+    inside = (latitude >= south) & (latitude <= north) & (longitude >= west) & (longitude <= east)
+
+    x, y = mercator(latitude[inside], longitude[inside])
+    scale = TILE_PX * 2**zoom / CLUSTER_PX
+
+    return len(np.unique(((x * scale).astype(np.int64) << 24) | (y * scale).astype(np.int64)))
+
+## TIMING
+
+def percentiles(samples):
+    return np.percentile(np.array(samples) * 1000, [50, 95])
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de consulta por viewport: pirâmide de clusters vs força bruta")
+    parser.add_argument("--points", type=int, nargs="+", default=[7000, 100000, 1000000])
+    parser.add_argument("--viewports", type=int, default=200)
+    args = parser.parse_args()
+
+    dataset = get_dataset()
+
+    for points in args.points:
+        df = scaled_points(dataset, points)
+
+        start = time.perf_counter()
+        pyramid = ClusterPyramid(build_pyramid(df))
+        build = time.perf_counter() - start
+
+        latitude = df["latitude"].to_numpy(dtype=np.float64)
+        longitude = df["longitude"].to_numpy(dtype=np.float64)
+
+        indexed, brute, payload = [], [], []
+        for bounds, zoom in random_viewports(df, args.viewports):
+            start = time.perf_counter()
+            clusters = pyramid.query(query_bounds(bounds), zoom)
+            indexed.append(time.perf_counter() - start)
+            payload.append(len(clusters))
+
+            start = time.perf_counter()
+            brute_force(latitude, longitude, query_bounds(bounds), zoom)
+            brute.append(time.perf_counter() - start)
+
+        p_index, p_brute = percentiles(indexed), percentiles(brute)
+
+        print(f"points={points:>9,}  build={build:>6.2f} s  entries={len(pyramid):>10,}  "
+              f"payload max={max(payload):>5} p50={int(np.median(payload)):>4}  "
+              f"index p50/p95={p_index[0]:>6.2f}/{p_index[1]:>6.2f} ms  "
+              f"brute p50/p95={p_brute[0]:>7.2f}/{p_brute[1]:>7.2f} ms")
+
+if __name__ == "__main__":
+    main()
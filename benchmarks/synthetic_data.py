@@ -0,0 +1,30 @@
+# Gera um arquivo bruto sintético (fome_zero.synthetic) no esquema do
+# dataset/raw/data.csv, de 10k a 50M linhas:
+#
+#   python benchmarks/synthetic_data.py 1M /tmp/raw_1M.csv
+#   python benchmarks/synthetic_data.py 50M /tmp/raw_50M.csv --duplicate-rate 0.1
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fome_zero.synthetic import parse_size, write_synthetic_raw
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um arquivo bruto sintético no esquema do dataset do Fome Zero")
+    parser.add_argument("rows", type=parse_size, help="quantidade de linhas (ex.: 10k, 1M, 50M)")
+    parser.add_argument("out_path", type=Path)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicate-rate", type=float, default=None, help="fração de linhas repetidas (padrão: a do arquivo real)")
+    parser.add_argument("--conflict-rate", type=float, default=0.0, help="fração das repetidas com conteúdo divergente")
+    args = parser.parse_args()
+
+    rows = write_synthetic_raw(args.rows, args.out_path, args.seed, args.duplicate_rate, args.conflict_rate)
+
+    print(f"{rows:,} linhas em {args.out_path}")
@@ -0,0 +1,160 @@
+# Modo batch: calcula todas as métricas das páginas sem o Streamlit, para o
+# cron e para comparações de regressão entre versões dos dados.
+#
+#   python -m fome_zero.batch                           # JSON no stdout
+#   python -m fome_zero.batch --countries Brazil India --output metricas.json
+#   python -m fome_zero.batch --format parquet --output saida/
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from fome_zero.cube import city_rollup, country_rollup, select_cells
+from fome_zero.data import (get_cube, get_cuisine_bridge, get_cuisine_stats, get_cuisine_top_index, get_dataset,
+                            get_filter_index, get_fingerprint, get_top_restaurant_index)
+from fome_zero.etl import RAW_DATA_PATH
+from fome_zero.indexes import TOP_TABLE_COLUMNS
+from fome_zero.metrics import (city_top_cuisines, city_top_rating_gt_4, city_top_rating_lt_2_5, city_top_restaurants,
+                               country_cities, country_cost_for_two, country_restaurants, country_votes, cuisine_best,
+                               cuisine_worst, overview)
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Culinárias dos cards de destaque da página de culinárias
+HIGHLIGHTS = ["Italian", "American", "Arabian", "Japanese", "Brazilian"]
+
+BATCH_FORMATS = ("json", "parquet")
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## METRICS
+
+def compute_metrics(countries=None, cuisines=None, all_cuisines=False, min_restaurants=1, top=10,
+                    highlights=HIGHLIGHTS, file_path=RAW_DATA_PATH):
+    # Tabelas de todas as páginas para a seleção de filtros; countries/cuisines
+    # None = todos. Devolve (seleção, {nome: DataFrame}); o overview é um
+    # frame de uma linha.
+    df = get_dataset(file_path)
+    filter_index = get_filter_index(file_path)
+
+    if countries is None:
+        countries = filter_index.options("country")
+
+    cube = select_cells(get_cube(file_path), countries=countries)
+    df_country = country_rollup(cube)
+    df_city = city_rollup(cube)
+
+    df_cuisine_ratings = (get_cuisine_stats(all_cuisines, file_path)
+                             .selection()
+                             .update(countries)
+                             .frame(cuisines, min_count=min_restaurants))
+
+    # Mesmo bitmap da tabela Top Restaurantes da página de culinárias
+    if all_cuisines and cuisines is not None:
+        mask = filter_index.mask(country=countries) & get_cuisine_bridge(file_path).serving_any(cuisines)
+    else:
+        mask = filter_index.mask(country=countries, cuisines=None if all_cuisines else cuisines)
+
+    rows, _ = get_top_restaurant_index(file_path).top(mask, top)
+
+    selection = {
+        "countries": list(countries),
+        "cuisines": None if cuisines is None else list(cuisines),
+        "all_cuisines": all_cuisines,
+        "min_restaurants": min_restaurants,
+        "top": top,
+        "highlights": list(highlights),
+    }
+
+    tables = {
+        "overview": pd.DataFrame([overview(df)]),
+        "countries/restaurants": country_restaurants(df_country),
+        "countries/cities": country_cities(df_country),
+        "countries/votes": country_votes(df_country),
+        "countries/cost_for_two": country_cost_for_two(df_country),
+        "cities/top_restaurants": city_top_restaurants(df_city),
+        "cities/top_rating_gt_4": city_top_rating_gt_4(df_city),
+        "cities/top_rating_lt_2_5": city_top_rating_lt_2_5(df_city),
+        "cities/top_cuisines": city_top_cuisines(df_city),
+        "cuisines/highlights": get_cuisine_top_index(file_path).best(list(highlights)),
+        "cuisines/top_restaurants": df.take(rows).loc[:, TOP_TABLE_COLUMNS].reset_index(drop=True),
+        "cuisines/best": cuisine_best(df_cuisine_ratings),
+        "cuisines/worst": cuisine_worst(df_cuisine_ratings),
+    }
+
+    return selection, tables
+
+## OUTPUT
+
+def plain_records(dataframe):
+    # Categorias e inteiros compactos viram tipos simples do JSON
+    return json.loads(dataframe.to_json(orient="records", force_ascii=False))
+
+def write_json(fingerprint, selection, tables, output=None):
+    payload = {
+        "fingerprint": fingerprint,
+        "selection": selection,
+        "metrics": {name: plain_records(table) for name, table in tables.items()},
+    }
+
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+
+    if output is None:
+        sys.stdout.write(text + "\n")
+    else:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+
+def write_parquet_tables(fingerprint, selection, tables, output):
+    # Um parquet por tabela (countries/votes -> countries__votes.parquet) e um
+    # selection.json com a seleção e o fingerprint dos dados
+    out_dir = Path(output)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    for name, table in tables.items():
+        table.to_parquet(out_dir / f"{name.replace('/', '__')}.parquet", index=False)
+
+    (out_dir / "selection.json").write_text(json.dumps({"fingerprint": fingerprint, "selection": selection},
+                                                       ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+def run_batch(countries=None, cuisines=None, all_cuisines=False, min_restaurants=1, top=10, highlights=HIGHLIGHTS,
+              output_format="json", output=None, file_path=RAW_DATA_PATH):
+    fingerprint = get_fingerprint(file_path)
+    selection, tables = compute_metrics(countries, cuisines, all_cuisines, min_restaurants, top, highlights, file_path)
+
+    if output_format == "parquet":
+        write_parquet_tables(fingerprint, selection, tables, output)
+    else:
+        write_json(fingerprint, selection, tables, output)
+
+    return tables
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calcula as métricas do dashboard Fome Zero sem o Streamlit")
+    parser.add_argument("file_path", nargs="?", default=RAW_DATA_PATH)
+    parser.add_argument("--countries", nargs="+", help="países selecionados (padrão: todos)")
+    parser.add_argument("--cuisines", nargs="+", help="culinárias dos rankings e da tabela top (padrão: todas)")
+    parser.add_argument("--all-cuisines", action="store_true", help="considera todas as culinárias de cada restaurante")
+    parser.add_argument("--min-restaurants", type=int, default=1, help="mínimo de restaurantes por culinária nos rankings")
+    parser.add_argument("--top", type=int, default=10, help="quantidade de restaurantes na tabela top")
+    parser.add_argument("--highlights", nargs="+", default=HIGHLIGHTS, help="culinárias dos cards de destaque")
+    parser.add_argument("--format", choices=BATCH_FORMATS, default="json", dest="output_format")
+    parser.add_argument("--output", help="arquivo JSON (padrão: stdout) ou diretório dos parquets")
+    args = parser.parse_args()
+
+    if args.output_format == "parquet" and args.output is None:
+        parser.error("--format parquet precisa de --output")
+
+    run_batch(args.countries, args.cuisines, args.all_cuisines, args.min_restaurants, args.top, args.highlights,
+              args.output_format, args.output, args.file_path)
@@ -0,0 +1,128 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## PER-KEY LOCKS
+
+class KeyLocks:
+    # Um lock por chave só enquanto há alguém usando: a entrada sai do
+    # dicionário quando a última thread que a segurava (ou esperava) termina,
+    # então o número de locks acompanha as requisições em andamento e não o
+    # número de chaves já vistas.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locks)
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+## DISK TIER
+
+class DiskLRU:
+    # Arquivos de cache em `cache_dir` limitados a `max_bytes`. A ordem de uso
+    # fica no mtime dos arquivos (um hit chama touch), então sobrevive a
+    # reinícios do servidor; ao passar do limite, os arquivos usados há mais
+    # tempo são apagados. Outro processo pode apagar os mesmos arquivos, por
+    # isso um arquivo que sumiu é só esquecido.
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        self.entries = None
+        self.bytes = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+
+    def load(self):
+        # Chamado com o lock: lê o diretório uma vez, do uso mais antigo ao mais recente
+        if self.entries is not None:
+            return
+
+        self.entries = OrderedDict()
+        files = []
+
+        if self.cache_dir.is_dir():
+            for path in self.cache_dir.iterdir():
+                # .<nome>.*.tmp são escritas do atomic_write em andamento
+                if path.name.startswith("."):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime_ns, path.name, stat.st_size))
+
+        for _, name, size in sorted(files):
+            self.entries[name] = size
+            self.bytes += size
+
+    def touch(self, path):
+        try:
+            os.utime(path)
+            size = path.stat().st_size
+        except FileNotFoundError:
+            self.forget(path)
+            return
+
+        self.put(path.name, size)
+
+    def added(self, path):
+        self.put(path.name, path.stat().st_size)
+
+    def put(self, name, size):
+        with self._lock:
+            self.load()
+
+            self.bytes -= self.entries.pop(name, 0)
+            self.entries[name] = size
+            self.bytes += size
+
+            # O arquivo recém-usado fica, mesmo sozinho acima do limite
+            evicted = []
+            while self.bytes > self.max_bytes and len(self.entries) > 1:
+                old_name, old_size = self.entries.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+                evicted.append(old_name)
+
+        for old_name in evicted:
+            try:
+                os.remove(self.cache_dir / old_name)
+            except FileNotFoundError:
+                pass
+
+    def forget(self, path):
+        with self._lock:
+            self.load()
+            self.bytes -= self.entries.pop(path.name, 0)
+
+    def stats(self):
+        with self._lock:
+            self.load()
+            return {"disk_items": len(self.entries), "disk_bytes": self.bytes, "disk_evictions": self.evictions}
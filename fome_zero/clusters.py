@@ -0,0 +1,427 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fome_zero.runs import SortedRuns
+from fome_zero.schema import CATEGORY_TYPE
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Pirâmide de clusters por nível de zoom, no espaço de pixels Web Mercator do
+# Leaflet (tiles de 256 px). Em cada nível os pontos de um mesmo país que caem
+# na mesma célula de CLUSTER_PX viram um cluster, como no MarkerCluster do
+# navegador (raio padrão de 80 px).
+TILE_PX = 256
+CLUSTER_PX = 80
+MAX_CLUSTER_ZOOM = 16
+
+# Bits de cada parte da chave (zoom, tile x, tile y) do índice espacial
+TILE_BITS = 24
+
+# Grade fina: células de CLUSTER_PX no zoom máximo. A célula de um ponto em um
+# zoom menor é a célula fina deslocada pela diferença de zoom, então as células
+# de todos os níveis são aninhadas. Cada eixo da grade fina cabe em CELL_BITS.
+FINE_SCALE = TILE_PX * 2**MAX_CLUSTER_ZOOM / CLUSTER_PX
+CELL_BITS = 18
+
+MAX_LATITUDE = 85.05112878
+
+PYRAMID_SCHEMA = pa.schema([
+    ("zoom", pa.int8()),
+    ("tile_key", pa.int64()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("count", pa.int64()),
+    ("row", pa.int64()),
+    ("country", CATEGORY_TYPE),
+])
+
+# Execuções do ETL streaming: pontos pela chave de Morton da célula fina e
+# clusters já fechados pela ordem final do arquivo (tile_key, célula)
+POINT_RUN_SCHEMA = pa.schema([
+    ("cell", pa.int64()),
+    ("x", pa.float64()),
+    ("y", pa.float64()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("row", pa.int64()),
+])
+
+CLUSTER_RUN_SCHEMA = pa.schema([
+    ("tile_key", pa.int64()),
+    ("cluster", pa.int64()),
+    ("zoom", pa.int8()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("count", pa.int64()),
+    ("row", pa.int64()),
+    ("country", pa.int32()),
+])
+
+# Máscaras do entrelaçamento de bits (Morton) de inteiros de até 32 bits
+MORTON_MASKS = [
+    (16, 0x0000FFFF0000FFFF),
+    (8, 0x00FF00FF00FF00FF),
+    (4, 0x0F0F0F0F0F0F0F0F),
+    (2, 0x3333333333333333),
+    (1, 0x5555555555555555),
+]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## PROJECTION
+
+def mercator(latitude, longitude):
+    # Coordenadas normalizadas em [0, 1) do mundo inteiro em Web Mercator
+    lat = np.radians(np.clip(np.asarray(latitude, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    lon = np.asarray(longitude, dtype=np.float64)
+
+    x = (lon + 180) / 360
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2
+
+    return np.clip(x, 0, 1 - 1e-12), np.clip(y, 0, 1 - 1e-12)
+
+def tile_key(zoom, tx, ty):
+    return (np.int64(zoom) << (2 * TILE_BITS)) | (np.asarray(tx, dtype=np.int64) << TILE_BITS) | np.asarray(ty, dtype=np.int64)
+
+## CELLS
+
+def fine_cells(x, y):
+    # Multiplicar por potências de 2 é exato em ponto flutuante, então
+    # fine >> (MAX_CLUSTER_ZOOM - zoom) é a mesma célula que x * escala do zoom
+    return (x * FINE_SCALE).astype(np.int64), (y * FINE_SCALE).astype(np.int64)
+
+def cell_key(country_codes, cx, cy):
+    # Chave de célula por (país, cx, cy); a ordem das chaves é a ordem dos clusters
+    return (np.asarray(country_codes, dtype=np.int64) << (2 * TILE_BITS)) | (cx << TILE_BITS) | cy
+
+def spread_bits(values):
+    v = np.asarray(values, dtype=np.uint64)
+
+    for shift, mask in MORTON_MASKS:
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+
+    return v
+
+def compact_bits(values):
+    # Inverso do spread_bits: junta os bits das posições pares
+    v = np.asarray(values, dtype=np.uint64) & np.uint64(MORTON_MASKS[-1][1])
+
+    # Cada passo usa a máscara do passo anterior do spread_bits
+    masks = [mask for _, mask in reversed(MORTON_MASKS[:-1])] + [0xFFFFFFFF]
+
+    for (shift, _), mask in zip(reversed(MORTON_MASKS), masks):
+        v = (v | (v >> np.uint64(shift))) & np.uint64(mask)
+
+    return v.astype(np.int64)
+
+def morton_key(country_codes, cx, cy):
+    # País nos bits altos e a célula fina entrelaçada (Morton) nos baixos: os
+    # pontos de uma célula de qualquer zoom têm o mesmo prefixo, então ficam
+    # contínuos quando ordenados por essa chave
+    cells = spread_bits(cx) | (spread_bits(cy) << np.uint64(1))
+
+    return (np.asarray(country_codes, dtype=np.int64) << (2 * CELL_BITS)) | cells.astype(np.int64)
+
+## BUILD (ETL)
+
+def cluster_level(cx, cy, country_codes, zoom):
+    # Um cluster por célula (país, cx, cy) distinta do zoom
+    shift = MAX_CLUSTER_ZOOM - zoom
+
+    _, inverse = np.unique(cell_key(country_codes, cx >> shift, cy >> shift), return_inverse=True)
+
+    return inverse
+
+def build_pyramid(dataframe, max_zoom=MAX_CLUSTER_ZOOM):
+    country = pd.Categorical(dataframe["country"])
+    codes = country.codes
+
+    latitude = dataframe["latitude"].to_numpy(dtype=np.float64)
+    longitude = dataframe["longitude"].to_numpy(dtype=np.float64)
+    rows = np.arange(len(dataframe), dtype=np.int64)
+
+    x, y = mercator(latitude, longitude)
+    cx, cy = fine_cells(x, y)
+
+    # Pontos distintos: a partir do nível em que cada cluster é um ponto, os
+    # níveis seguintes seriam iguais e a pirâmide para de crescer.
+    n_points = len(pd.DataFrame({"c": codes, "x": x, "y": y}).drop_duplicates())
+
+    levels = []
+    for zoom in range(max_zoom + 1):
+        inverse = cluster_level(cx, cy, codes, zoom)
+
+        count = np.bincount(inverse)
+        lat = np.bincount(inverse, weights=latitude) / count
+        lon = np.bincount(inverse, weights=longitude) / count
+
+        # Clusters de um único restaurante guardam a linha para o popup
+        row = np.full(len(count), -1, dtype=np.int64)
+        single = count[inverse] == 1
+        row[inverse[single]] = rows[single]
+
+        cluster_country = np.zeros(len(count), dtype=codes.dtype)
+        cluster_country[inverse] = codes
+
+        center_x, center_y = mercator(lat, lon)
+        levels.append(pd.DataFrame({
+            "zoom": np.full(len(count), zoom, dtype=np.int8),
+            "tile_key": tile_key(zoom, (center_x * 2**zoom).astype(np.int64), (center_y * 2**zoom).astype(np.int64)),
+            "latitude": lat,
+            "longitude": lon,
+            "count": count.astype(np.int64),
+            "row": row,
+            "country": pd.Categorical.from_codes(cluster_country, categories=country.categories),
+        }))
+
+        if len(count) == n_points:
+            break
+
+    pyramid = pd.concat(levels, ignore_index=True)
+
+    return pyramid.sort_values("tile_key", kind="stable", ignore_index=True)
+
+def write_pyramid(pyramid, path):
+    table = pa.Table.from_pandas(pyramid, schema=PYRAMID_SCHEMA, preserve_index=False)
+
+    pq.write_table(table, path, compression="zstd")
+
+class PyramidBuilder:
+    # A mesma pirâmide do build_pyramid no ETL streaming, sem todos os pontos em
+    # memória. Os pontos de cada bloco vão para execuções em disco ordenadas pela
+    # chave de Morton (país, célula fina), e nessa ordem cada cluster de qualquer
+    # zoom é uma faixa contínua. Uma passada pela intercalação fecha os clusters
+    # de todos os níveis, mantendo aberto só o último de cada nível; os clusters
+    # fechados passam por uma segunda ordenação externa, pela ordem do arquivo.
+    # `countries` é a lista de todos os países possíveis (os códigos são fixos
+    # entre blocos); o arquivo final só tem como categorias os que aparecem.
+    def __init__(self, parent, countries, max_zoom=MAX_CLUSTER_ZOOM):
+        self.countries = pd.Index(sorted(countries))
+        self.max_zoom = max_zoom
+
+        self.points = SortedRuns(parent, POINT_RUN_SCHEMA, ["cell", "x", "y"])
+        self.clusters = SortedRuns(parent, CLUSTER_RUN_SCHEMA, ["tile_key", "cluster"])
+
+        self.present = np.zeros(len(self.countries), dtype=bool)
+        self.level_sizes = np.zeros(max_zoom + 1, dtype=np.int64)
+        self.n_points = 0
+
+        # zoom -> (chave, count, soma lat, soma lon, linha) do cluster em aberto
+        self.open = {}
+        self.closed = []
+        self.closed_rows = 0
+
+    def add(self, dataframe, first_row):
+        codes = self.countries.get_indexer(dataframe["country"])
+        if (codes < 0).any():
+            raise ValueError(f"país fora da lista da pirâmide: {dataframe['country'][codes < 0].iloc[0]!r}")
+
+        latitude = dataframe["latitude"].to_numpy(dtype=np.float64)
+        longitude = dataframe["longitude"].to_numpy(dtype=np.float64)
+
+        x, y = mercator(latitude, longitude)
+        cx, cy = fine_cells(x, y)
+
+        self.present[codes] = True
+        self.points.add(pd.DataFrame({
+            "cell": morton_key(codes, cx, cy),
+            "x": x,
+            "y": y,
+            "latitude": latitude,
+            "longitude": longitude,
+            "row": np.arange(first_row, first_row + len(dataframe), dtype=np.int64),
+        }))
+
+    def scan(self, block, flush_rows):
+        # `block` traz células finas completas, ordenadas por (célula, x, y)
+        cell = block["cell"].to_numpy()
+        x = block["x"].to_numpy()
+        y = block["y"].to_numpy()
+        latitude = block["latitude"].to_numpy()
+        longitude = block["longitude"].to_numpy()
+        rows = block["row"].to_numpy()
+
+        repeated = (cell[1:] == cell[:-1]) & (x[1:] == x[:-1]) & (y[1:] == y[:-1])
+        self.n_points += len(cell) - int(repeated.sum())
+
+        for zoom in range(self.max_zoom + 1):
+            group = cell >> (2 * (MAX_CLUSTER_ZOOM - zoom))
+            starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+
+            keys = group[starts]
+            count = np.diff(np.r_[starts, len(cell)])
+            lat_sum = np.add.reduceat(latitude, starts)
+            lon_sum = np.add.reduceat(longitude, starts)
+            row = rows[starts]
+
+            carried = self.open.get(zoom)
+            if carried is not None:
+                if carried[0] == keys[0]:
+                    count[0] += carried[1]
+                    lat_sum[0] += carried[2]
+                    lon_sum[0] += carried[3]
+                else:
+                    self.emit(zoom, *(np.array([value]) for value in carried))
+
+            # O último cluster do bloco pode continuar no próximo
+            self.open[zoom] = (keys[-1], count[-1], lat_sum[-1], lon_sum[-1], row[-1])
+            self.emit(zoom, keys[:-1], count[:-1], lat_sum[:-1], lon_sum[:-1], row[:-1])
+
+        if self.closed_rows >= flush_rows:
+            self.flush()
+
+    def emit(self, zoom, keys, count, lat_sum, lon_sum, row):
+        if len(keys) == 0:
+            return
+
+        shift = 2 * (MAX_CLUSTER_ZOOM - zoom)
+        cells = keys & ((1 << (2 * CELL_BITS - shift)) - 1)
+        codes = keys >> (2 * CELL_BITS - shift)
+
+        lat = lat_sum / count
+        lon = lon_sum / count
+        center_x, center_y = mercator(lat, lon)
+
+        self.level_sizes[zoom] += len(keys)
+        self.closed_rows += len(keys)
+        self.closed.append(pd.DataFrame({
+            "tile_key": tile_key(zoom, (center_x * 2**zoom).astype(np.int64), (center_y * 2**zoom).astype(np.int64)),
+            "cluster": cell_key(codes, compact_bits(cells), compact_bits(cells >> 1)),
+            "zoom": np.full(len(keys), zoom, dtype=np.int8),
+            "latitude": lat,
+            "longitude": lon,
+            "count": count.astype(np.int64),
+            # Clusters de um único restaurante guardam a linha para o popup
+            "row": np.where(count == 1, row, -1).astype(np.int64),
+            "country": codes.astype(np.int32),
+        }))
+
+    def flush(self):
+        if self.closed:
+            self.clusters.add(pd.concat(self.closed, ignore_index=True))
+            self.closed = []
+            self.closed_rows = 0
+
+    def write(self, path, buffer_rows):
+        # buffer_rows: linhas em memória em cada etapa (intercalação dos pontos,
+        # clusters fechados e intercalação dos clusters)
+        for block in self.points.merge(buffer_rows):
+            self.scan(block, buffer_rows)
+
+        for zoom, carried in self.open.items():
+            self.emit(zoom, *(np.array([value]) for value in carried))
+        self.open = {}
+        self.flush()
+
+        # Mesmo corte do build_pyramid: o primeiro nível em que cada cluster é um ponto
+        last_zoom = next((zoom for zoom, size in enumerate(self.level_sizes) if size == self.n_points), self.max_zoom)
+
+        categories = self.countries[self.present]
+        codes = np.cumsum(self.present) - 1
+
+        with pq.ParquetWriter(path, PYRAMID_SCHEMA, compression="zstd") as writer:
+            for block in self.clusters.merge(buffer_rows):
+                block = block.loc[block["zoom"].to_numpy() <= last_zoom, :]
+
+                pyramid = block.loc[:, ["zoom", "tile_key", "latitude", "longitude", "count", "row"]]
+                pyramid["country"] = pd.Categorical.from_codes(codes[block["country"].to_numpy()], categories=categories)
+
+                writer.write_table(pa.Table.from_pandas(pyramid, schema=PYRAMID_SCHEMA, preserve_index=False))
+
+    def close(self):
+        self.points.close()
+        self.clusters.close()
+
+## QUERY
+
+class ClusterPyramid:
+    # Índice espacial: as entradas estão ordenadas por (zoom, tile x, tile y),
+    # então os clusters de uma coluna de tiles do viewport formam uma fatia
+    # contínua, encontrada por busca binária. Uma consulta custa uma fatia por
+    # coluna de tiles visível, independente do total de restaurantes.
+    def __init__(self, pyramid):
+        self.tile_keys = pyramid["tile_key"].to_numpy()
+        self.latitude = pyramid["latitude"].to_numpy()
+        self.longitude = pyramid["longitude"].to_numpy()
+        self.count = pyramid["count"].to_numpy()
+        self.row = pyramid["row"].to_numpy()
+
+        country = pd.Categorical(pyramid["country"])
+        self.countries = pd.Index(country.categories)
+        self.country_codes = country.codes
+
+        self.max_zoom = int(pyramid["zoom"].max()) if len(pyramid) > 0 else 0
+
+    @classmethod
+    def read(cls, path):
+        return cls(pd.read_parquet(path))
+
+    def __len__(self):
+        return len(self.tile_keys)
+
+    def viewport_slices(self, bounds, zoom):
+        (south, west), (north, east) = bounds
+        west, east = max(west, -180.0), min(east, 180.0)
+
+        x, y = mercator([north, south], [west, east])
+        n_tiles = 2**zoom
+        tx0, tx1 = (x * n_tiles).astype(np.int64)
+        ty0, ty1 = (y * n_tiles).astype(np.int64)
+
+        for tx in range(tx0, tx1 + 1):
+            left = np.searchsorted(self.tile_keys, tile_key(zoom, tx, ty0), side="left")
+            right = np.searchsorted(self.tile_keys, tile_key(zoom, tx, ty1), side="right")
+
+            yield slice(left, right)
+
+    def query(self, bounds, zoom, countries=None):
+        # bounds = ((sul, oeste), (norte, leste)) do mapa; devolve os clusters e
+        # pontos visíveis no zoom, somando clusters de países diferentes que
+        # caem na mesma célula. `row` >= 0 indica um único restaurante.
+        zoom = int(min(max(zoom, 0), self.max_zoom))
+
+        index = np.concatenate([np.arange(s.start, s.stop) for s in self.viewport_slices(bounds, zoom)]
+                               or [np.empty(0, dtype=np.int64)])
+
+        (south, west), (north, east) = bounds
+        keep = ((self.latitude[index] >= south) & (self.latitude[index] <= north)
+                & (self.longitude[index] >= west) & (self.longitude[index] <= east))
+
+        if countries is not None:
+            codes = self.countries.get_indexer(list(countries))
+            keep &= np.isin(self.country_codes[index], codes[codes >= 0])
+
+        index = index[keep]
+
+        return self.merge_cells(index, zoom)
+
+    def merge_cells(self, index, zoom):
+        latitude = self.latitude[index]
+        longitude = self.longitude[index]
+        count = self.count[index]
+
+        x, y = mercator(latitude, longitude)
+        scale = TILE_PX * 2**zoom / CLUSTER_PX
+        keys = ((x * scale).astype(np.int64) << TILE_BITS) | (y * scale).astype(np.int64)
+
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        total = np.bincount(inverse, weights=count).astype(np.int64)
+        row = np.where(total == 1, self.row[index][first], -1)
+
+        return pd.DataFrame({
+            "latitude": np.bincount(inverse, weights=latitude * count) / total,
+            "longitude": np.bincount(inverse, weights=longitude * count) / total,
+            "count": total,
+            "row": row,
+        })
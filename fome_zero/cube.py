@@ -0,0 +1,133 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fome_zero.schema import CATEGORY_TYPE
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+CUBE_DIMENSIONS = ["country", "city", "cuisines", "price_type"]
+
+# Medidas somáveis: qualquer recorte do cubo é respondido somando células.
+# A média de nota por culinária não está aqui: a do groupby original é uma
+# soma em float que depende da ordem das linhas e não sai de somas por
+# célula (fome_zero.stats).
+CUBE_MEASURES = [
+    "rows",
+    "restaurants",
+    "votes_sum",
+    "cost_sum",
+    "rating_gt_4",
+    "rating_lt_2_5",
+]
+
+CUBE_SCHEMA = pa.schema(
+    [(dim, CATEGORY_TYPE) for dim in CUBE_DIMENSIONS]
+    + [(measure, pa.int64()) for measure in CUBE_MEASURES]
+)
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## BUILD (ETL)
+
+def first_in_country(dataframe):
+    return ~dataframe.duplicated(subset=["country", "restaurant_id"]).to_numpy()
+
+def build_cube(dataframe, new_restaurants=None):
+    # "restaurants" conta cada restaurant_id uma vez por país, na primeira
+    # célula em que ele aparece: a soma das células de um país é o número de
+    # restaurantes distintos, mesmo com a política "distinct", em que um ID
+    # pode ter várias linhas e cair em mais de uma célula. No ETL streaming,
+    # `new_restaurants` também descarta os IDs já vistos em blocos anteriores.
+    if new_restaurants is None:
+        new_restaurants = first_in_country(dataframe)
+
+    df = pd.DataFrame({dim: dataframe[dim] for dim in CUBE_DIMENSIONS})
+
+    rating = dataframe["aggregate_rating"]
+
+    df["rows"] = 1
+    df["restaurants"] = np.asarray(new_restaurants, dtype="int64")
+    df["votes_sum"] = dataframe["votes"].astype("int64")
+    df["cost_sum"] = dataframe["average_cost_for_two"].astype("int64")
+    df["rating_gt_4"] = (rating > 4).astype("int64")
+    df["rating_lt_2_5"] = (rating < 2.5).astype("int64")
+
+    cube = df.groupby(CUBE_DIMENSIONS, observed=True, sort=False)[CUBE_MEASURES].sum()
+
+    return cube.reset_index().loc[:, CUBE_DIMENSIONS + CUBE_MEASURES]
+
+def empty_cube():
+    cube = pd.DataFrame({dim: pd.Series(dtype=object) for dim in CUBE_DIMENSIONS})
+
+    for measure in CUBE_MEASURES:
+        cube[measure] = pd.Series(dtype="int64")
+
+    return cube
+
+def merge_cubes(cubes):
+    # Todas as medidas são somáveis; "restaurants" também, desde que cada bloco
+    # tenha sido construído com os IDs já vistos descontados (build_cube).
+    cube = pd.concat(cubes, ignore_index=True)
+
+    return (cube.groupby(CUBE_DIMENSIONS, observed=True, sort=False)[CUBE_MEASURES]
+                .sum()
+                .reset_index())
+
+def write_cube(cube, path):
+    df = cube.copy()
+
+    for dim in CUBE_DIMENSIONS:
+        df[dim] = df[dim].astype("category")
+
+    table = pa.Table.from_pandas(df, schema=CUBE_SCHEMA, preserve_index=False)
+
+    pq.write_table(table, path, compression="zstd")
+
+## ROLL-UPS
+
+# Cada roll-up devolve um frame com os mesmos nomes de colunas que o groupby
+# original das páginas produzia, ordenado pelas chaves, para que os gráficos
+# mantenham o mesmo sort_values e a mesma ordem de empates.
+
+def select_cells(cube, countries=None, cuisines=None):
+    mask = np.ones(len(cube), dtype=bool)
+
+    if countries is not None:
+        mask &= cube["country"].isin(countries).to_numpy()
+
+    if cuisines is not None:
+        mask &= cube["cuisines"].isin(cuisines).to_numpy()
+
+    return cube.loc[mask, :]
+
+def country_rollup(cube):
+    grouped = cube.groupby("country", observed=True)
+    sums = grouped[CUBE_MEASURES].sum().sort_index()
+
+    return pd.DataFrame({
+        "restaurant_id": sums["restaurants"],
+        "city": grouped["city"].nunique().sort_index(),
+        "votes": sums["votes_sum"] / sums["rows"],
+        "average_cost_for_two": sums["cost_sum"] / sums["rows"],
+    })
+
+def city_rollup(cube):
+    grouped = cube.groupby(["city", "country"], observed=True)
+    sums = grouped[CUBE_MEASURES].sum().sort_index()
+
+    return pd.DataFrame({
+        "restaurant_id": sums["rows"],
+        "rating_gt_4": sums["rating_gt_4"],
+        "rating_lt_2_5": sums["rating_lt_2_5"],
+        "cuisines": grouped["cuisines"].nunique().sort_index(),
+    })
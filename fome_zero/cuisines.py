@@ -0,0 +1,129 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Tabela ponte restaurante -> culinária, uma linha por par, com `row` sendo a
+# posição do restaurante no dataset tratado.
+BRIDGE_SCHEMA = pa.schema([
+    ("row", pa.int64()),
+    ("cuisine", pa.dictionary(pa.int32(), pa.string())),
+])
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## BUILD (ETL)
+
+def split_cuisine_list(cuisines):
+    # "Italian, Pizza, Italian" -> ["Italian", "Pizza"]
+    names = (name.strip() for name in cuisines.split(","))
+
+    return list(dict.fromkeys(name for name in names if name))
+
+def explode_cuisines(all_cuisines, row_offset=0):
+    # Quebra as listas apenas uma vez por string distinta e expande os pares
+    # com np.repeat, sem laço em Python por linha.
+    codes, uniques = pd.factorize(all_cuisines)
+
+    parts = [split_cuisine_list(value) for value in uniques]
+    lens = np.array([len(p) for p in parts], dtype=np.int64)
+    flat = np.array([name for p in parts for name in p], dtype=object)
+    unique_starts = np.concatenate([[0], np.cumsum(lens)[:-1]])
+
+    row_lens = lens[codes]
+    rows = np.repeat(np.arange(len(codes), dtype=np.int64), row_lens)
+    row_starts = np.repeat(np.cumsum(row_lens) - row_lens, row_lens)
+    within = np.arange(len(rows), dtype=np.int64) - row_starts
+
+    names = flat[np.repeat(unique_starts[codes], row_lens) + within]
+
+    return pd.DataFrame({"row": rows + row_offset, "cuisine": pd.Categorical(names)})
+
+def write_bridge(bridge, path):
+    pq.write_table(to_bridge_arrow(bridge), path, compression="zstd")
+
+def bridge_writer(path):
+    return pq.ParquetWriter(path, BRIDGE_SCHEMA, compression="zstd")
+
+def to_bridge_arrow(bridge):
+    return pa.Table.from_pandas(bridge, schema=BRIDGE_SCHEMA, preserve_index=False)
+
+## QUERY
+
+class CuisineBridge:
+    # Mapeamento restaurante <-> culinária codificado em inteiros, nos dois
+    # sentidos em formato CSR: `row_indptr/row_cuisines` lista as culinárias de
+    # cada restaurante e `cuisine_indptr/cuisine_rows` os restaurantes de cada
+    # culinária. Todas as consultas são fatias e gathers em arrays numpy.
+    def __init__(self, rows, codes, cuisines, n_rows):
+        self.cuisines = pd.Index(cuisines)
+        self.n_rows = n_rows
+
+        order = np.lexsort((codes, rows))
+        self.row_indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_rows))])
+        self.row_cuisines = codes[order]
+
+        order = np.lexsort((rows, codes))
+        self.cuisine_indptr = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(cuisines)))])
+        self.cuisine_rows = rows[order]
+
+    @classmethod
+    def read(cls, path, n_rows):
+        bridge = pd.read_parquet(path)
+        cuisine = bridge["cuisine"].cat.reorder_categories(sorted(bridge["cuisine"].cat.categories))
+
+        return cls(bridge["row"].to_numpy(),
+                   cuisine.cat.codes.to_numpy().astype(np.int64),
+                   cuisine.cat.categories,
+                   n_rows)
+
+    def restaurants_serving(self, cuisine):
+        code = self.cuisines.get_loc(cuisine)
+
+        return self.cuisine_rows[self.cuisine_indptr[code]:self.cuisine_indptr[code + 1]]
+
+    def cuisines_of(self, row):
+        codes = self.row_cuisines[self.row_indptr[row]:self.row_indptr[row + 1]]
+
+        return self.cuisines[codes].tolist()
+
+    def serving_any(self, cuisines):
+        # Máscara booleana sobre todas as linhas do dataset
+        mask = np.zeros(self.n_rows, dtype=bool)
+
+        for cuisine in cuisines:
+            if cuisine in self.cuisines:
+                mask[self.restaurants_serving(cuisine)] = True
+
+        return mask
+
+    def explode(self, dataframe, columns, cuisines=None):
+        # Um registro por par (restaurante, culinária) para as linhas do frame,
+        # que precisa manter o índice posicional do dataset completo.
+        rows = dataframe.index.to_numpy()
+
+        starts = self.row_indptr[rows]
+        lens = self.row_indptr[rows + 1] - starts
+
+        local = np.repeat(np.arange(len(rows)), lens)
+        offsets = np.arange(len(local)) - np.repeat(np.cumsum(lens) - lens, lens)
+        codes = self.row_cuisines[np.repeat(starts, lens) + offsets]
+
+        df = pd.DataFrame({"cuisines": pd.Categorical.from_codes(codes, categories=self.cuisines)})
+        for col in columns:
+            df[col] = dataframe[col].to_numpy()[local]
+
+        if cuisines is not None:
+            df = df.loc[df["cuisines"].isin(cuisines), :]
+
+        return df
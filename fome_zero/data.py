@@ -0,0 +1,228 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import os
+import threading
+
+import pandas as pd
+
+from fome_zero.clusters import ClusterPyramid
+from fome_zero.cuisines import CuisineBridge
+from fome_zero.etl import CLUSTER_PYRAMID_FILE, CUBE_FILE, CUISINE_BRIDGE_FILE, DATA_FILE, RAW_DATA_PATH, RESTAURANT_INDEX_FILE, artifact_path, run_etl
+from fome_zero.export import EXPORT_DIR, ExportCache
+from fome_zero.indexes import CuisineTopIndex, FilterIndex, RestaurantIndex, TopRestaurantIndex
+from fome_zero.schema import compact_frame, memory_report, plain_frame, read_parquet
+from fome_zero.stats import CuisineStats
+from fome_zero.timing import span
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Representação compacta em memória (categorias, inteiros reduzidos e flags
+# booleanas). As coordenadas ficam em float64: o mesmo frame alimenta a
+# exportação, que precisa da precisão do arquivo bruto. FOME_ZERO_COMPACT=0
+# mantém os tipos do parquet.
+COMPACT_MODE = os.environ.get("FOME_ZERO_COMPACT", "1") != "0"
+
+# Cache do processo do servidor: o Streamlit atende todas as sessões no mesmo
+# processo, então cada objeto é construído uma única vez por versão dos dados.
+# RLock porque um objeto derivado pode depender de outro (ex.: do dataset).
+_lock = threading.RLock()
+_cache = {}
+
+# Mapas (folium), busca por proximidade (scipy) e figuras (plotly) são importados
+# dentro dos acessores: cada página só carrega as bibliotecas do que desenha, e o
+# cold start de uma página não paga os imports das outras (bench_startup.py).
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+def cached(name, build, file_path=RAW_DATA_PATH):
+    # build(fingerprint) só roda quando o objeto ainda não existe para a
+    # versão atual; uma nova versão dos dados descarta o cache inteiro.
+    # Spans (fome_zero.timing): "clean" é a verificação/reconstrução do ETL e
+    # "load" a construção de um objeto que ainda não estava no cache.
+    with span("clean"):
+        fingerprint = run_etl(file_path)
+
+    with _lock:
+        if _cache.get("fingerprint") != fingerprint:
+            _cache.clear()
+            _cache["fingerprint"] = fingerprint
+
+        if name not in _cache:
+            with span("load", name):
+                _cache[name] = build(fingerprint)
+
+        return _cache[name]
+
+def get_fingerprint(file_path=RAW_DATA_PATH):
+    return run_etl(file_path)
+
+def load_dataset(fingerprint):
+    df = read_parquet(artifact_path(fingerprint, DATA_FILE))
+
+    if COMPACT_MODE:
+        df = compact_frame(df)
+
+    return df
+
+def get_dataset(file_path=RAW_DATA_PATH):
+    # Todas as sessões recebem a mesma referência: as páginas só filtram
+    # (gerando novos frames) e nunca devem modificar esse frame in place.
+    return cached("dataset", load_dataset, file_path)
+
+def get_cuisine_bridge(file_path=RAW_DATA_PATH):
+    def build(fingerprint):
+        return CuisineBridge.read(artifact_path(fingerprint, CUISINE_BRIDGE_FILE),
+                                  n_rows=len(get_dataset(file_path)))
+
+    return cached("cuisine_bridge", build, file_path)
+
+def get_restaurant_index(file_path=RAW_DATA_PATH):
+    def build(fingerprint):
+        return RestaurantIndex.read(artifact_path(fingerprint, RESTAURANT_INDEX_FILE))
+
+    return cached("restaurant_index", build, file_path)
+
+def get_filter_index(file_path=RAW_DATA_PATH):
+    # Listas de linhas por país, culinária, cidade e faixa de preço dos filtros
+    def build(fingerprint):
+        return FilterIndex(get_dataset(file_path))
+
+    return cached("filter_index", build, file_path)
+
+def get_cuisine_top_index(file_path=RAW_DATA_PATH):
+    # Melhores restaurantes por culinária dos destaques da página de culinárias
+    def build(fingerprint):
+        return CuisineTopIndex(get_dataset(file_path))
+
+    return cached("cuisine_top_index", build, file_path)
+
+def get_top_restaurant_index(file_path=RAW_DATA_PATH):
+    # Tabela "Top Restaurantes" da página de culinárias, paginada no servidor
+    def build(fingerprint):
+        return TopRestaurantIndex(get_dataset(file_path))
+
+    return cached("top_restaurant_index", build, file_path)
+
+def get_cuisine_stats(all_cuisines=False, file_path=RAW_DATA_PATH):
+    # Somas parciais por (país, culinária) das notas, pela culinária principal
+    # ou por todas as culinárias de cada restaurante (tabela ponte)
+    def build(fingerprint):
+        df = get_dataset(file_path)
+
+        if all_cuisines:
+            return CuisineStats.from_bridge(df, get_cuisine_bridge(file_path))
+
+        return CuisineStats.from_dataset(df)
+
+    return cached("cuisine_stats_all" if all_cuisines else "cuisine_stats", build, file_path)
+
+def get_cube(file_path=RAW_DATA_PATH):
+    # Agregados país x cidade x culinária x faixa de preço usados pelos gráficos
+    def build(fingerprint):
+        return read_parquet(artifact_path(fingerprint, CUBE_FILE))
+
+    return cached("cube", build, file_path)
+
+def get_cluster_pyramid(file_path=RAW_DATA_PATH):
+    # Clusters por zoom e índice espacial do mapa por viewport
+    def build(fingerprint):
+        return ClusterPyramid.read(artifact_path(fingerprint, CLUSTER_PYRAMID_FILE))
+
+    return cached("cluster_pyramid", build, file_path)
+
+def get_nearby_index(file_path=RAW_DATA_PATH):
+    # Busca dos mais próximos e por raio (fome_zero.nearby)
+    from fome_zero.nearby import NearbyIndex
+
+    def build(fingerprint):
+        return NearbyIndex(get_dataset(file_path))
+
+    return cached("nearby_index", build, file_path)
+
+def get_map_cache(file_path=RAW_DATA_PATH):
+    # Contadores em get_map_cache().stats()
+    from fome_zero.maps import MAP_CACHE_DIR, MapCache
+
+    def build(fingerprint):
+        return MapCache(fingerprint, cache_dir=artifact_path(fingerprint, MAP_CACHE_DIR))
+
+    return cached("map_cache", build, file_path)
+
+def get_map_html(countries, file_path=RAW_DATA_PATH):
+    # HTML do mapa da página principal para a seleção de países; só é
+    # renderizado quando a seleção ainda não está no cache (memória ou disco).
+    from fome_zero.maps import render_map_html
+
+    def render():
+        df = get_filter_index(file_path).select(get_dataset(file_path), country=countries)
+
+        with span("figure", "map"):
+            return render_map_html(df)
+
+    return get_map_cache(file_path).get(countries, render)
+
+def get_export_cache(file_path=RAW_DATA_PATH):
+    def build(fingerprint):
+        return ExportCache(fingerprint, artifact_path(fingerprint, EXPORT_DIR))
+
+    return cached("export_cache", build, file_path)
+
+def get_export(suffix, selection=None, file_path=RAW_DATA_PATH):
+    # Arquivo exportado no formato `suffix` (fome_zero.export), já aberto para
+    # leitura em modo binário. A seleção usa as colunas do índice de filtros e,
+    # opcionalmente, "serving_any" (restaurantes que servem alguma das
+    # culinárias, pela tabela ponte).
+    def frame():
+        df = get_dataset(file_path)
+
+        if not selection:
+            return df
+
+        selection_aux = dict(selection)
+        serving = selection_aux.pop("serving_any", None)
+        mask = None if serving is None else get_cuisine_bridge(file_path).serving_any(serving)
+
+        return get_filter_index(file_path).select(df, mask=mask, **selection_aux)
+
+    return get_export_cache(file_path).open(suffix, selection, frame)
+
+def get_figure_cache(file_path=RAW_DATA_PATH):
+    # Contadores e ocupação em get_figure_cache().stats()
+    from fome_zero.figures import FigureCache
+
+    def build(fingerprint):
+        return FigureCache(fingerprint)
+
+    return cached("figure_cache", build, file_path)
+
+def get_figure(chart_id, selection, build, file_path=RAW_DATA_PATH):
+    # Figura do gráfico `chart_id` para a seleção de filtros; build() só roda
+    # quando a figura não está no cache.
+    def build_figure():
+        with span("figure", chart_id):
+            return build()
+
+    return get_figure_cache(file_path).get(chart_id, selection, build_figure)
+
+def get_memory_report(file_path=RAW_DATA_PATH):
+    # Compara, coluna a coluna, o frame em memória com a representação antiga
+    # (object/int64/float64); o relatório é calculado uma vez por versão.
+    def build(fingerprint):
+        df = get_dataset(file_path)
+
+        before = memory_report(plain_frame(df))
+        after = memory_report(df)
+
+        return pd.concat({"before": before, "after": after}, axis=1)
+
+    return cached("memory_report", build, file_path)
+
+if __name__ == "__main__":
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(get_memory_report())
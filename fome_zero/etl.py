@@ -0,0 +1,606 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.clusters import PyramidBuilder, build_pyramid, write_pyramid
+from fome_zero.cube import build_cube, empty_cube, first_in_country, merge_cubes, write_cube
+from fome_zero.cuisines import bridge_writer, explode_cuisines, to_bridge_arrow, write_bridge
+from fome_zero.indexes import RESTAURANT_INDEX_SCHEMA, write_restaurant_index, write_restaurant_index_blocks
+from fome_zero.runs import SortedRuns
+from fome_zero.schema import parquet_writer, to_arrow, write_parquet
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, o lock vira no-op
+    fcntl = None
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+logger = logging.getLogger("fome_zero.etl")
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+RAW_DATA_PATH = BASE_DIR / "dataset" / "raw" / "data.csv"
+PROCESSED_DIR = BASE_DIR / "dataset" / "processed"
+MANIFEST_PATH = PROCESSED_DIR / "manifest.json"
+LOCK_PATH = PROCESSED_DIR / ".etl.lock"
+
+# Cada versão dos artefatos fica em versions/<fingerprint>/ e só é publicada
+# (renomeada e registrada no manifest) depois de completa, então um leitor
+# sempre enxerga dataset e tabelas auxiliares da mesma versão.
+VERSIONS_DIR = PROCESSED_DIR / "versions"
+DATA_FILE = "data.parquet"
+CUISINE_BRIDGE_FILE = "cuisine_bridge.parquet"
+RESTAURANT_INDEX_FILE = "restaurant_index.parquet"
+CUBE_FILE = "cube.parquet"
+CLUSTER_PYRAMID_FILE = "cluster_pyramid.parquet"
+
+# Orçamento de memória do ETL em MB. Quando definido, o arquivo bruto é lido em
+# blocos dimensionados para esse orçamento em vez de ser carregado inteiro.
+ETL_MEMORY_MB = os.environ.get("FOME_ZERO_ETL_MEMORY_MB")
+
+# Política para linhas com o mesmo restaurant_id e conteúdo diferente: "first" e
+# "last" mantêm a primeira/última, "distinct" mantém todas as versões distintas
+# (o antigo drop_duplicates de todas as colunas) e "error" interrompe o ETL.
+DEDUP_POLICIES = ("first", "last", "distinct", "error")
+DEDUP_POLICY = os.environ.get("FOME_ZERO_DEDUP_POLICY", "first")
+
+# Quantas cópias de um bloco coexistem durante a limpeza (leitura, dropna,
+# colunas derivadas e tabela arrow); usado para converter MB em linhas.
+CHUNK_COPY_FACTOR = 4
+
+# Versão das regras de limpeza e do formato dos artefatos. Deve ser incrementada
+# sempre que uma mudança no process_data ou no schema alterar o resultado, para
+# forçar a reconstrução dos artefatos.
+SCHEMA_VERSION = 9
+
+COUNTRIES = {
+    1: "India",
+    14: "Australia",
+    30: "Brazil",
+    37: "Canada",
+    94: "Indonesia",
+    148: "New Zeland",
+    162: "Philippines",
+    166: "Qatar",
+    184: "Singapure",
+    189: "South Africa",
+    191: "Sri Lanka",
+    208: "Turkey",
+    214: "United Arab Emirates",
+    215: "England",
+    216: "United States of America",
+}
+
+
+COLORS = {
+    "3F7E00": "darkgreen",
+    "5BA829": "green",
+    "9ACD32": "lightgreen",
+    "CDD614": "orange",
+    "FFBA00": "red",
+    "CBCBC8": "darkred",
+    "FF7800": "darkred",
+}
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## COLUMN RENAME AND ADJUSTMENT FUNCTIONS
+
+def snakecase_columns(columns):
+    # Só roda quando os artefatos são reconstruídos
+    import inflection
+
+    title = lambda x: inflection.titleize(x)
+
+    snakecase = lambda x: inflection.underscore(x)
+
+    spaces = lambda x: x.replace(" ", "")
+
+    cols_old = list(columns)
+
+    cols_old = list(map(title, cols_old))
+
+    cols_old = list(map(spaces, cols_old))
+
+    return list(map(snakecase, cols_old))
+
+def rename_columns(dataframe):
+    df = dataframe.copy()
+
+    df.columns = snakecase_columns(df.columns)
+
+    return df
+
+def country_name(country_id):
+    return COUNTRIES[country_id]
+
+def color_name(color_code):
+    return COLORS[color_code]
+
+def create_price_tye(price_range):
+    if price_range == 1:
+        return "cheap"
+    elif price_range == 2:
+        return "normal"
+    elif price_range == 3:
+        return "expensive"
+    else:
+        return "gourmet"
+
+def adjust_columns_order(dataframe):
+    new_cols_order = [
+        "restaurant_id",
+        "restaurant_name",
+        "country",
+        "city",
+        "address",
+        "locality",
+        "locality_verbose",
+        "longitude",
+        "latitude",
+        "cuisines",
+        "price_type",
+        "average_cost_for_two",
+        "currency",
+        "has_table_booking",
+        "has_online_delivery",
+        "is_delivering_now",
+        "aggregate_rating",
+        "rating_color",
+        "color_name",
+        "rating_text",
+        "votes",
+    ]
+
+    return dataframe.loc[:, new_cols_order]
+
+## DATA PROCESSING AND CLEANING FUNCTION
+
+def map_unique(series, mapper):
+    # Aplica a função escalar apenas aos valores distintos e espalha o
+    # resultado pelos códigos do factorize: o trabalho em Python passa a
+    # depender da cardinalidade da coluna, não do número de linhas.
+    codes, uniques = pd.factorize(series)
+
+    values = np.array([mapper(x) for x in uniques], dtype=object)
+
+    return pd.Series(values[codes], index=series.index)
+
+def deduplicate(dataframe, policy=DEDUP_POLICY):
+    # A deduplicação é feita pela chave restaurant_id; só as linhas com ID
+    # repetido são comparadas pelo conteúdo para contar os conflitos.
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"política de deduplicação inválida: {policy!r} (use {', '.join(DEDUP_POLICIES)})")
+
+    shared = dataframe.duplicated(subset=["restaurant_id"], keep=False)
+    candidates = dataframe.loc[shared, :]
+
+    exact = candidates.duplicated()
+    conflicts = int((candidates["restaurant_id"].duplicated() & ~exact).sum())
+
+    if policy == "error" and conflicts:
+        raise ValueError(f"{conflicts} linha(s) com restaurant_id repetido e conteúdo divergente")
+
+    if policy == "distinct":
+        df = dataframe.drop(index=candidates.index[exact])
+    else:
+        df = dataframe.drop_duplicates(subset=["restaurant_id"], keep="last" if policy == "last" else "first")
+
+    return df, conflicts
+
+def derive_columns(dataframe):
+    # Limpeza de clean_data até antes da deduplicação; devolve também a lista
+    # completa de culinárias de cada linha.
+    # dropna já devolve um novo frame, então renomeia sem uma segunda cópia
+    df = dataframe.dropna()
+
+    df = df.rename(columns=dict(zip(df.columns, snakecase_columns(df.columns))), copy=False)
+
+    # A lista completa de culinárias alimenta a tabela ponte; ela fica fora da
+    # deduplicação para que as linhas resultantes sejam as mesmas de sempre.
+    all_cuisines = df["cuisines"]
+
+    df["price_type"] = map_unique(df["price_range"], create_price_tye)
+
+    df["country"] = map_unique(df["country_code"], country_name)
+
+    df["color_name"] = map_unique(df["rating_color"], color_name)
+
+    df["cuisines"] = map_unique(df["cuisines"], lambda x: x.split(",")[0])
+
+    return df, all_cuisines
+
+def finish_data(df, all_cuisines, conflicts, keep_all_cuisines=False):
+    df = adjust_columns_order(df)
+
+    if keep_all_cuisines:
+        df["all_cuisines"] = all_cuisines.loc[df.index]
+
+    df = df.reset_index(drop=True)
+    df.attrs["dedup_conflicts"] = conflicts
+
+    return df
+
+def clean_data(dataframe, keep_all_cuisines=False, dedup_policy=DEDUP_POLICY):
+    df, all_cuisines = derive_columns(dataframe)
+
+    df, conflicts = deduplicate(df, dedup_policy)
+
+    return finish_data(df, all_cuisines, conflicts, keep_all_cuisines)
+
+def process_data(file_path):
+    return clean_data(pd.read_csv(file_path))
+
+# Versão linha a linha original, mantida apenas como referência de paridade
+# e de desempenho para benchmarks/bench_process_data.py
+def process_data_legacy(file_path):
+    df = pd.read_csv(file_path)
+
+    df = df.dropna()
+
+    df = rename_columns(df)
+
+    df["price_type"] = df.loc[:, "price_range"].apply(lambda x: create_price_tye(x))
+
+    df["country"] = df.loc[:, "country_code"].apply(lambda x: country_name(x))
+
+    df["color_name"] = df.loc[:, "rating_color"].apply(lambda x: color_name(x))
+
+    df["cuisines"] = df.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
+
+    df = df.drop_duplicates()
+
+    df = adjust_columns_order(df)
+
+    df = df.reset_index()
+
+    df = df.drop(columns=['index'])
+
+    return df
+
+## FINGERPRINT AND MANIFEST
+
+def file_hash(file_path, block_size=1 << 20):
+    digest = hashlib.sha256()
+
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+def read_manifest(manifest_path=MANIFEST_PATH):
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def raw_fingerprint(file_path, manifest=None):
+    # O hash do conteúdo só é recalculado quando tamanho ou mtime do arquivo
+    # bruto mudam; caso contrário reaproveita o hash gravado no manifest.
+    manifest = manifest or {}
+    stat = os.stat(file_path)
+
+    if (manifest.get("raw_size") == stat.st_size
+            and manifest.get("raw_mtime_ns") == stat.st_mtime_ns
+            and manifest.get("raw_sha256")):
+        raw_sha256 = manifest["raw_sha256"]
+    else:
+        raw_sha256 = file_hash(file_path)
+
+    fingerprint = f"{SCHEMA_VERSION}-{DEDUP_POLICY}-{raw_sha256}"
+
+    return fingerprint, raw_sha256, stat
+
+def artifact_path(fingerprint, name):
+    return VERSIONS_DIR / fingerprint / name
+
+def is_current(manifest, fingerprint):
+    return (manifest.get("fingerprint") == fingerprint
+            and (VERSIONS_DIR / fingerprint).is_dir())
+
+## SINGLE WRITER AND ATOMIC RENAME
+
+@contextmanager
+def etl_lock(lock_path=LOCK_PATH):
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(lock_path, "a+") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def atomic_write(path, write):
+    # Escreve em um arquivo temporário no mesmo diretório e troca com
+    # os.replace, assim leitores nunca enxergam um arquivo pela metade.
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+
+    try:
+        result = write(tmp_path)
+        # mkstemp cria o arquivo com permissão 0600
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return result
+
+def write_manifest(manifest, manifest_path=MANIFEST_PATH):
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    atomic_write(manifest_path, write)
+
+def publish_version(fingerprint, build):
+    # Constrói todos os artefatos num diretório temporário e o renomeia para
+    # versions/<fingerprint>; o manifest gravado depois é o ponto de commit.
+    VERSIONS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=VERSIONS_DIR, prefix=".tmp-"))
+
+    try:
+        result = build(tmp_dir)
+        # mkdtemp cria o diretório com permissão 0700
+        os.chmod(tmp_dir, 0o755)
+
+        final_dir = VERSIONS_DIR / fingerprint
+        if final_dir.exists():
+            # reconstrução forçada da mesma versão
+            old_dir = Path(tempfile.mkdtemp(dir=VERSIONS_DIR, prefix=".old-"))
+            os.replace(final_dir, old_dir / fingerprint)
+            os.replace(tmp_dir, final_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            os.replace(tmp_dir, final_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return result
+
+def prune_versions(keep):
+    # Mantém a versão atual e a anterior, que ainda pode estar sendo lida por
+    # sessões que carregaram o manifest antigo.
+    for path in VERSIONS_DIR.iterdir():
+        if path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+## STREAMING INGESTION
+
+class SeenKeys:
+    # Conjunto compacto de hashes de linha (uint64, 8 bytes por linha distinta)
+    # guardado em execuções ordenadas que são fundidas por tamanho, como numa
+    # LSM tree: inserir custa O(n log n) amortizado e consultar é busca binária.
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, keys):
+        found = np.zeros(len(keys), dtype=bool)
+
+        for run in self.runs:
+            idx = np.searchsorted(run, keys)
+            idx[idx == len(run)] = 0
+            found |= run[idx] == keys
+
+        return found
+
+    def add(self, keys):
+        # Uma execução vazia quebraria a busca do contains
+        if len(keys) == 0:
+            return
+
+        self.runs.append(np.unique(keys))
+
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            last = self.runs.pop()
+            self.runs[-1] = merge_sorted(self.runs[-1], last)
+
+def merge_sorted(a, b):
+    # União de duas execuções ordenadas com uma cópia só (o np.union1d faz
+    # três): o sort estável reconhece as duas metades já ordenadas.
+    merged = np.concatenate([a, b])
+    merged.sort(kind="stable")
+
+    distinct = merged[1:] != merged[:-1]
+    if not distinct.all():
+        merged = merged[np.r_[True, distinct]]
+
+    return merged
+
+def row_keys(dataframe):
+    return pd.util.hash_pandas_object(dataframe, index=False).to_numpy()
+
+def chunk_rows_for_budget(file_path, memory_mb, sample_rows=1000):
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+    bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+
+    return max(sample_rows, int(memory_mb * 2**20 / (bytes_per_row * CHUNK_COPY_FACTOR)))
+
+def iter_clean_chunks(file_path, chunk_rows, stats, dedup_policy=DEDUP_POLICY):
+    # Mesma limpeza do process_data aplicada bloco a bloco. A deduplicação
+    # compara cada linha com as anteriores do bloco e com os blocos já lidos
+    # (chave restaurant_id e hash da linha inteira): ID visto com conteúdo
+    # novo é um conflito, contado uma vez só, como no deduplicate.
+    if dedup_policy not in DEDUP_POLICIES:
+        raise ValueError(f"política de deduplicação inválida: {dedup_policy!r} (use {', '.join(DEDUP_POLICIES)})")
+    if dedup_policy == "last":
+        raise ValueError("a política 'last' não é suportada no modo streaming")
+
+    seen_ids = SeenKeys()
+    seen_rows = SeenKeys()
+
+    for chunk in pd.read_csv(file_path, chunksize=chunk_rows):
+        df, all_cuisines = derive_columns(chunk)
+
+        ids = df["restaurant_id"].to_numpy().astype(np.uint64)
+        keys = row_keys(df)
+
+        id_seen = seen_ids.contains(ids) | df["restaurant_id"].duplicated().to_numpy()
+        row_seen = seen_rows.contains(keys) | pd.Series(keys).duplicated().to_numpy()
+
+        conflicts = int((id_seen & ~row_seen).sum())
+        if dedup_policy == "error" and conflicts:
+            raise ValueError(f"{conflicts} linha(s) com restaurant_id repetido e conteúdo divergente")
+        stats["dedup_conflicts"] += conflicts
+
+        # Entram também as linhas descartadas: uma cópia exata delas em outro
+        # bloco não é um conflito novo
+        seen_ids.add(ids[~id_seen])
+        seen_rows.add(keys[~row_seen])
+
+        new_rows = ~row_seen if dedup_policy == "distinct" else ~id_seen
+
+        yield finish_data(df.loc[new_rows, :], all_cuisines, conflicts, keep_all_cuisines=True)
+
+def new_restaurants(dataframe, seen):
+    # Linhas com um (país, restaurant_id) que nenhum bloco anterior trouxe. Só
+    # a política "distinct" mantém IDs repetidos entre blocos (seen != None).
+    first = first_in_country(dataframe)
+
+    if seen is not None:
+        keys = row_keys(dataframe.loc[:, ["country", "restaurant_id"]])
+        first &= ~seen.contains(keys)
+        seen.add(keys[first])
+
+    return first
+
+def write_streaming(file_path, out_dir, memory_mb):
+    chunk_rows = chunk_rows_for_budget(file_path, memory_mb)
+    stats = {"rows": 0, "dedup_conflicts": 0}
+    # O índice de IDs é ordenado fora da memória: uma execução ordenada por bloco
+    id_runs = SortedRuns(out_dir, RESTAURANT_INDEX_SCHEMA, ["restaurant_id", "row"])
+    pyramid = PyramidBuilder(out_dir, COUNTRIES.values())
+    cube = None
+    country_ids = SeenKeys() if DEDUP_POLICY == "distinct" else None
+
+    writer = parquet_writer(out_dir / DATA_FILE)
+    cuisine_writer = bridge_writer(out_dir / CUISINE_BRIDGE_FILE)
+    try:
+        try:
+            for df in iter_clean_chunks(file_path, chunk_rows, stats, DEDUP_POLICY):
+                if len(df) > 0:
+                    cuisine_writer.write_table(to_bridge_arrow(explode_cuisines(df.pop("all_cuisines"), row_offset=stats["rows"])))
+                    writer.write_table(to_arrow(df))
+                    id_runs.add(pd.DataFrame({"restaurant_id": df["restaurant_id"].to_numpy(dtype=np.int64),
+                                              "row": np.arange(stats["rows"], stats["rows"] + len(df), dtype=np.int64)}))
+                    pyramid.add(df, first_row=stats["rows"])
+                    # O cubo é pequeno (limitado pelas cardinalidades), então é
+                    # consolidado a cada bloco em vez de acumular cubos parciais.
+                    chunk_cube = build_cube(df, new_restaurants(df, country_ids))
+                    cube = chunk_cube if cube is None else merge_cubes([cube, chunk_cube])
+                    stats["rows"] += len(df)
+        finally:
+            writer.close()
+            cuisine_writer.close()
+
+        # As intercalações usam buffers do tamanho de um bloco do ETL
+        write_restaurant_index_blocks(id_runs.merge(chunk_rows), out_dir / RESTAURANT_INDEX_FILE)
+
+        pyramid.write(out_dir / CLUSTER_PYRAMID_FILE, chunk_rows)
+    finally:
+        id_runs.close()
+        pyramid.close()
+
+    write_cube(cube if cube is not None else empty_cube(), out_dir / CUBE_FILE)
+
+    return stats
+
+## ETL STAGE
+
+def build_artifacts(file_path, out_dir, memory_mb=None):
+    # Devolve as estatísticas do build que vão para o manifest.
+    # A política "last" só decide a linha mantida depois de ver o arquivo
+    # inteiro, então não tem modo em blocos: o build volta para o modo em
+    # memória (um aviso por build, e não um erro em cada carregamento de página).
+    if memory_mb and DEDUP_POLICY == "last":
+        logger.warning("FOME_ZERO_DEDUP_POLICY=last não suporta o ETL em blocos; "
+                       "orçamento de %s MB ignorado, o arquivo bruto é lido inteiro", memory_mb)
+        memory_mb = None
+
+    if memory_mb:
+        return write_streaming(file_path, out_dir, float(memory_mb))
+
+    df = clean_data(pd.read_csv(file_path), keep_all_cuisines=True, dedup_policy=DEDUP_POLICY)
+
+    write_bridge(explode_cuisines(df.pop("all_cuisines")), out_dir / CUISINE_BRIDGE_FILE)
+
+    write_restaurant_index(df["restaurant_id"].to_numpy(), out_dir / RESTAURANT_INDEX_FILE)
+
+    write_cube(build_cube(df), out_dir / CUBE_FILE)
+
+    write_pyramid(build_pyramid(df), out_dir / CLUSTER_PYRAMID_FILE)
+
+    write_parquet(df, out_dir / DATA_FILE)
+
+    return {"rows": len(df), "dedup_conflicts": df.attrs["dedup_conflicts"]}
+
+def run_etl(file_path=RAW_DATA_PATH, force=False, memory_mb=ETL_MEMORY_MB):
+    manifest = read_manifest()
+    fingerprint, raw_sha256, stat = raw_fingerprint(file_path, manifest)
+
+    if not force and is_current(manifest, fingerprint):
+        return fingerprint
+
+    with etl_lock():
+        # Outra sessão pode ter reconstruído os artefatos enquanto esperávamos o lock
+        if not force and is_current(read_manifest(), fingerprint):
+            return fingerprint
+
+        stats = publish_version(fingerprint, lambda out_dir: build_artifacts(file_path, out_dir, memory_mb))
+
+        previous = read_manifest().get("fingerprint")
+
+        write_manifest({
+            "fingerprint": fingerprint,
+            "schema_version": SCHEMA_VERSION,
+            "dedup_policy": DEDUP_POLICY,
+            "raw_sha256": raw_sha256,
+            "raw_size": stat.st_size,
+            "raw_mtime_ns": stat.st_mtime_ns,
+            **stats,
+            "built_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+        prune_versions(keep={fingerprint, previous})
+
+    return fingerprint
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reconstrói os artefatos tratados do Fome Zero")
+    parser.add_argument("file_path", nargs="?", default=RAW_DATA_PATH)
+    parser.add_argument("--force", action="store_true", help="reconstrói mesmo com o fingerprint atual")
+    parser.add_argument("--memory-mb", type=float, default=ETL_MEMORY_MB, help="lê o arquivo bruto em blocos dentro desse orçamento")
+    args = parser.parse_args()
+
+    print(run_etl(args.file_path, force=args.force, memory_mb=args.memory_mb))
@@ -0,0 +1,140 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import hashlib
+import json
+import os
+import threading
+
+import pyarrow as pa
+
+from fome_zero.cache import DiskLRU, KeyLocks
+from fome_zero.etl import atomic_write
+from fome_zero.schema import export_frame, parquet_writer, to_arrow
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Formatos do botão "Dados Tratados": rótulo -> (extensão do arquivo, mime)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "CSV (zstd)": ("csv.zst", "application/zstd"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+CSV_COMPRESSION = {
+    "csv": None,
+    "csv.gz": "gzip",
+    "csv.zst": "zstd",
+}
+
+# O arquivo é escrito em blocos de linhas: nem o CSV inteiro nem uma cópia do
+# dataset ficam em memória, só um bloco por vez.
+EXPORT_CHUNK_ROWS = 50000
+
+EXPORT_DIR = "exports"
+
+# Teto do diretório de exportações; cada seleção de filtros gera um arquivo
+EXPORT_CACHE_MB = float(os.environ.get("FOME_ZERO_EXPORT_CACHE_MB", "512"))
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## WRITE
+
+def iter_chunks(dataframe, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Sempre devolve ao menos um bloco, para que um recorte vazio ainda gere o cabeçalho
+    for start in range(0, max(len(dataframe), 1), chunk_rows):
+        yield dataframe.iloc[start:start + chunk_rows]
+
+def write_csv(dataframe, sink):
+    for i, chunk in enumerate(iter_chunks(dataframe)):
+        sink.write(export_frame(chunk).to_csv(index=False, sep=";", header=(i == 0)).encode("utf-8"))
+
+def write_export(dataframe, path, suffix):
+    if suffix == "parquet":
+        # Mesmo schema tipado do dataset processado, um row group por bloco
+        writer = parquet_writer(path)
+        try:
+            for chunk in iter_chunks(dataframe):
+                writer.write_table(to_arrow(chunk))
+        finally:
+            writer.close()
+
+        return
+
+    with pa.output_stream(str(path), compression=CSV_COMPRESSION[suffix]) as sink:
+        write_csv(dataframe, sink)
+
+## CACHE
+
+class ExportCache:
+    # Arquivos exportados por (versão dos dados, formato, seleção de filtros) em
+    # `cache_dir`. Nada é gerado até alguém pedir o arquivo; depois disso ele é
+    # servido do disco, e sessões que pedem a mesma exportação ao mesmo tempo
+    # esperam a primeira terminar. O diretório é um LRU limitado a `max_bytes`.
+    def __init__(self, fingerprint, cache_dir, max_bytes=EXPORT_CACHE_MB * 2**20):
+        self.fingerprint = fingerprint
+        self.cache_dir = cache_dir
+        self.disk = DiskLRU(cache_dir, max_bytes)
+
+        self.counters = {"hits": 0, "misses": 0}
+
+        self._lock = threading.Lock()
+        self._key_locks = KeyLocks()
+
+    def key(self, suffix, selection=None):
+        # selection = {coluna: valores}; None em uma coluna não restringe nada
+        selection = {col: sorted(set(map(str, values)))
+                     for col, values in (selection or {}).items() if values is not None}
+
+        return json.dumps([self.fingerprint, suffix, selection], sort_keys=True)
+
+    def path(self, suffix, selection=None):
+        digest = hashlib.sha256(self.key(suffix, selection).encode("utf-8")).hexdigest()[:32]
+
+        return self.cache_dir / f"{digest}.{suffix}"
+
+    def get(self, suffix, selection, frame):
+        # frame() monta o recorte do dataset; só é chamado quando o arquivo não existe
+        path = self.path(suffix, selection)
+
+        if path.exists():
+            self.disk.touch(path)
+
+            with self._lock:
+                self.counters["hits"] += 1
+
+            return path
+
+        with self._key_locks.hold(path.name):
+            if not path.exists():
+                dataframe = frame()
+
+                self.cache_dir.mkdir(exist_ok=True)
+                atomic_write(path, lambda tmp_path: write_export(dataframe, tmp_path, suffix))
+                self.disk.added(path)
+
+                with self._lock:
+                    self.counters["misses"] += 1
+
+        return path
+
+    def open(self, suffix, selection, frame):
+        # O arquivo pode sair do LRU entre get() e a leitura (outra sessão
+        # exportou depois); aberto, ele continua legível até ser fechado
+        while True:
+            path = self.get(suffix, selection, frame)
+
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                self.disk.forget(path)
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, **self.disk.stats()}
@@ -0,0 +1,109 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from plotly.colors import qualitative
+
+from fome_zero.etl import COUNTRIES
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Cor fixa por país em todos os gráficos: a posição do país no dicionário de
+# códigos do ETL escolhe a cor da paleta, então a cor não depende da seleção.
+COUNTRY_PALETTE = qualitative.Dark24
+
+COUNTRY_COLORS = {name: COUNTRY_PALETTE[i % len(COUNTRY_PALETTE)]
+                  for i, name in enumerate(COUNTRIES[code] for code in sorted(COUNTRIES))}
+
+# Orçamento em memória do cache de gráficos, medido pelo JSON das figuras
+FIGURE_CACHE_MB = int(os.environ.get("FOME_ZERO_FIGURE_CACHE_MB", "32"))
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## COLORS
+
+def country_color(country):
+    # Países fora do dicionário (ex.: outro arquivo bruto) também têm cor estável
+    if country not in COUNTRY_COLORS:
+        digest = hashlib.sha256(str(country).encode("utf-8")).digest()
+        return COUNTRY_PALETTE[digest[0] % len(COUNTRY_PALETTE)]
+
+    return COUNTRY_COLORS[country]
+
+def country_color_map(countries):
+    return {country: country_color(country) for country in countries}
+
+## CACHE
+
+class FigureCache:
+    # Figuras Plotly por (versão dos dados, gráfico, seleção de filtros), em um
+    # LRU limitado por `max_bytes`. O tamanho de cada figura é o do JSON que o
+    # Streamlit envia ao navegador. As figuras são compartilhadas entre sessões:
+    # as páginas só as passam para st.plotly_chart, nunca as modificam.
+    def __init__(self, fingerprint, max_bytes=FIGURE_CACHE_MB * 2**20):
+        self.fingerprint = fingerprint
+        self.max_bytes = max_bytes
+
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+        self._lock = threading.Lock()
+
+    def key(self, chart_id, selection=None):
+        # Listas viram listas ordenadas: a ordem do multiselect não muda o gráfico
+        selection = {name: sorted(map(str, value)) if isinstance(value, (list, tuple, set)) else value
+                     for name, value in (selection or {}).items()}
+
+        return json.dumps([self.fingerprint, chart_id, selection], sort_keys=True)
+
+    def get(self, chart_id, selection, build):
+        key = self.key(chart_id, selection)
+
+        with self._lock:
+            fig = self.entries.get(key)
+
+            if fig is not None:
+                self.entries.move_to_end(key)
+                self.counters["hits"] += 1
+
+                return fig
+
+            self.counters["misses"] += 1
+
+        fig = build()
+        self._put(key, fig, len(fig.to_json()))
+
+        return fig
+
+    def _put(self, key, fig, size):
+        with self._lock:
+            if key in self.entries or size > self.max_bytes:
+                return
+
+            self.entries[key] = fig
+            self.sizes[key] = size
+            self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                evicted, _ = self.entries.popitem(last=False)
+                self.bytes -= self.sizes.pop(evicted)
+                self.counters["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            hit_rate = self.counters["hits"] / lookups if lookups else 0.0
+
+            return dict(self.counters, hit_rate=round(hit_rate, 3), items=len(self.entries), bytes=self.bytes)
@@ -0,0 +1,308 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# restaurant_id ordenado -> posição da linha no dataset tratado
+RESTAURANT_INDEX_SCHEMA = pa.schema([
+    ("restaurant_id", pa.int64()),
+    ("row", pa.int64()),
+])
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## RESTAURANT ID INDEX
+
+def write_restaurant_index(restaurant_ids, path):
+    ids = np.asarray(restaurant_ids, dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+
+    table = pa.Table.from_arrays([pa.array(ids[order]), pa.array(order.astype(np.int64))],
+                                 schema=RESTAURANT_INDEX_SCHEMA)
+
+    pq.write_table(table, path, compression="zstd")
+
+def write_restaurant_index_blocks(blocks, path):
+    # Mesmo arquivo a partir de blocos já ordenados por (restaurant_id, row),
+    # como os que SortedRuns.merge() devolve no ETL streaming
+    with pq.ParquetWriter(path, RESTAURANT_INDEX_SCHEMA, compression="zstd") as writer:
+        for block in blocks:
+            writer.write_table(pa.Table.from_pandas(block, schema=RESTAURANT_INDEX_SCHEMA, preserve_index=False))
+
+class RestaurantIndex:
+    # Busca binária sobre os IDs ordenados: O(log n) por consulta, sem hash
+    # das colunas de texto.
+    def __init__(self, restaurant_ids, rows):
+        self.restaurant_ids = restaurant_ids
+        self.rows = rows
+
+    @classmethod
+    def read(cls, path):
+        index = pd.read_parquet(path)
+
+        return cls(index["restaurant_id"].to_numpy(), index["row"].to_numpy())
+
+    def __len__(self):
+        return len(self.restaurant_ids)
+
+    def rows_for(self, restaurant_id):
+        # Mais de uma linha só acontece com a política de deduplicação "distinct"
+        left = np.searchsorted(self.restaurant_ids, restaurant_id, side="left")
+        right = np.searchsorted(self.restaurant_ids, restaurant_id, side="right")
+
+        return self.rows[left:right]
+
+    def lookup(self, restaurant_ids):
+        # Primeira linha de cada ID consultado, -1 quando o ID não existe
+        ids = np.asarray(restaurant_ids, dtype=np.int64)
+        pos = np.searchsorted(self.restaurant_ids, ids)
+        pos_safe = np.minimum(pos, len(self.restaurant_ids) - 1)
+
+        found = (pos < len(self.restaurant_ids)) & (self.restaurant_ids[pos_safe] == ids)
+
+        return np.where(found, self.rows[pos_safe], -1)
+
+    def contains(self, restaurant_ids):
+        return self.lookup(restaurant_ids) >= 0
+
+## FILTER INDEX
+
+# Colunas dos filtros das páginas (multiselects)
+FILTER_COLUMNS = [
+    "country",
+    "cuisines",
+    "city",
+    "price_type",
+]
+
+# Quantos restaurantes o índice de destaques guarda por culinária
+CUISINE_TOP_K = 20
+
+# Colunas da tabela "Top Restaurantes", todas ordenáveis
+TOP_TABLE_COLUMNS = [
+    "restaurant_id",
+    "restaurant_name",
+    "country",
+    "city",
+    "cuisines",
+    "average_cost_for_two",
+    "aggregate_rating",
+    "votes",
+]
+
+class FilterIndex:
+    # Uma lista ordenada de posições de linha por valor de cada coluna de filtro,
+    # em formato CSR (`indptr[col]` e `rows[col]`). Uma seleção vira bitmap pela
+    # união das listas dos valores escolhidos, e colunas diferentes se combinam
+    # por interseção dos bitmaps, sem varrer nem copiar o dataset.
+    def __init__(self, dataframe, columns=FILTER_COLUMNS):
+        self.n_rows = len(dataframe)
+        self.values = {}
+        self.indptr = {}
+        self.rows = {}
+
+        for col in columns:
+            values = pd.Categorical(dataframe[col])
+            codes = values.codes.astype(np.int64)
+            order = np.argsort(codes, kind="stable")
+
+            self.values[col] = pd.Index(values.categories)
+            self.indptr[col] = np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0],
+                                                                          minlength=len(values.categories)))])
+            self.rows[col] = order[codes[order] >= 0]
+
+    def options(self, col):
+        # Valores na ordem de primeira aparição, como o antigo .unique().tolist()
+        first_rows = self.rows[col][self.indptr[col][:-1][np.diff(self.indptr[col]) > 0]]
+        present = self.values[col][np.diff(self.indptr[col]) > 0]
+
+        return present[np.argsort(first_rows, kind="stable")].tolist()
+
+    def rows_for(self, col, value):
+        if value not in self.values[col]:
+            return self.rows[col][:0]
+
+        code = self.values[col].get_loc(value)
+
+        return self.rows[col][self.indptr[col][code]:self.indptr[col][code + 1]]
+
+    def mask(self, **selections):
+        # mask(country=[...], cuisines=[...]) -> bitmap das linhas que atendem a
+        # todos os filtros; um filtro None não restringe a seleção.
+        mask = np.ones(self.n_rows, dtype=bool)
+
+        for col, values in selections.items():
+            if values is None:
+                continue
+
+            selected = np.zeros(self.n_rows, dtype=bool)
+            for value in values:
+                selected[self.rows_for(col, value)] = True
+
+            mask &= selected
+
+        return mask
+
+    def select(self, dataframe, mask=None, **selections):
+        # Linhas do dataset completo na ordem original, mantendo o índice posicional.
+        # `mask` é um bitmap adicional (ex.: da tabela ponte de culinárias).
+        selected = self.mask(**selections)
+
+        if mask is not None:
+            selected &= mask
+
+        return dataframe.take(np.flatnonzero(selected))
+
+## TOP RESTAURANTS PER CUISINE
+
+class CuisineTopIndex:
+    # Melhores restaurantes de cada culinária principal. Como nas métricas da
+    # página, restaurantes com o mesmo nome (redes) viram uma entrada com a nota
+    # e o restaurant_id médios, e empates na nota ficam com o menor id. O índice
+    # é montado com um único agrupamento e uma ordenação; cada culinária guarda
+    # só os `k` primeiros (CSR em `indptr`), então uma consulta custa O(k).
+    def __init__(self, dataframe, k=CUISINE_TOP_K):
+        groups = (dataframe.loc[:, ["cuisines", "restaurant_name", "restaurant_id", "aggregate_rating"]]
+                           .groupby(["cuisines", "restaurant_name"], observed=True, sort=False)
+                           .mean())
+
+        cuisines = pd.Categorical(groups.index.get_level_values("cuisines"))
+        codes = cuisines.codes.astype(np.int64)
+        rating = groups["aggregate_rating"].to_numpy(dtype=np.float64)
+        ids = groups["restaurant_id"].to_numpy(dtype=np.float64)
+
+        # Por culinária: nota decrescente, depois id crescente
+        order = np.lexsort((ids, -rating, codes))
+        counts = np.bincount(codes, minlength=len(cuisines.categories))
+        starts = np.concatenate([[0], np.cumsum(counts)])[:-1]
+        rank = np.arange(len(order)) - starts[codes[order]]
+        order = order[rank < k]
+
+        self.k = k
+        self.cuisines = pd.Index(cuisines.categories)
+        self.indptr = np.concatenate([[0], np.cumsum(np.minimum(counts, k))])
+
+        self.restaurant_name = groups.index.get_level_values("restaurant_name").to_numpy()[order]
+        self.restaurant_id = ids[order]
+        self.aggregate_rating = rating[order]
+
+    def top(self, cuisine, n=1):
+        # Os n (no máximo k) melhores restaurantes da culinária, do melhor ao pior
+        if cuisine not in self.cuisines:
+            start = stop = 0
+        else:
+            code = self.cuisines.get_loc(cuisine)
+            start = self.indptr[code]
+            stop = min(self.indptr[code + 1], start + n)
+
+        return pd.DataFrame({
+            "restaurant_name": self.restaurant_name[start:stop],
+            "restaurant_id": self.restaurant_id[start:stop],
+            "aggregate_rating": self.aggregate_rating[start:stop],
+        })
+
+    def best(self, cuisines):
+        # O melhor restaurante de cada culinária pedida, na ordem pedida;
+        # culinárias sem restaurantes ficam de fora.
+        cuisines = list(cuisines)
+        codes = self.cuisines.get_indexer(cuisines)
+
+        found = codes >= 0
+        found[found] = np.diff(self.indptr)[codes[found]] > 0
+        first = self.indptr[codes[found]]
+
+        return pd.DataFrame({
+            "cuisines": np.asarray(cuisines, dtype=object)[found],
+            "restaurant_name": self.restaurant_name[first],
+            "restaurant_id": self.restaurant_id[first],
+            "aggregate_rating": self.aggregate_rating[first],
+        })
+
+## TOP RESTAURANTS TABLE
+
+def sort_key(series):
+    # Chave numérica com a mesma ordem do sort_values: texto vira o código na
+    # lista ordenada de valores distintos.
+    if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.to_numpy(dtype=np.float64)
+
+    codes, _ = pd.factorize(series.astype(object), sort=True)
+
+    return codes.astype(np.float64)
+
+def rank_of(order):
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    return rank
+
+class TopRestaurantIndex:
+    # Tabela "Top Restaurantes": uma linha por nome de restaurante (a primeira do
+    # dataset, como o drop_duplicates), os N melhores por nota decrescente e id
+    # crescente. Essa ordem é pré-calculada como o posto de cada linha, então os
+    # N melhores de uma seleção saem de uma seleção parcial (argpartition) nos
+    # postos, sem ordenar a seleção inteira. A exibição pode ser ordenada por
+    # qualquer coluna e paginada: só a página pedida é ordenada e montada.
+    def __init__(self, dataframe, columns=TOP_TABLE_COLUMNS):
+        self.n_rows = len(dataframe)
+        self.names = pd.factorize(dataframe["restaurant_name"])[0]
+
+        self.keys = {col: sort_key(dataframe[col]) for col in columns}
+        self.rank = rank_of(np.lexsort((self.keys["restaurant_id"], -self.keys["aggregate_rating"])))
+
+        self._ranks = {}
+        self._lock = threading.Lock()
+
+    def rank_for(self, col, ascending):
+        # Posto de cada linha ordenando por `col`; empates seguem a ordem padrão.
+        # Calculado na primeira vez que a coluna é pedida.
+        with self._lock:
+            if (col, ascending) not in self._ranks:
+                key = self.keys[col] if ascending else -self.keys[col]
+                self._ranks[(col, ascending)] = rank_of(np.lexsort((self.rank, key)))
+
+            return self._ranks[(col, ascending)]
+
+    def candidates(self, mask):
+        rows = np.flatnonzero(mask)
+        first = ~pd.Series(self.names[rows]).duplicated(keep="first").to_numpy()
+
+        return rows[first]
+
+    def top(self, mask, n, sort_by=None, ascending=True, page=0, page_size=None):
+        # Linhas (posições no dataset) da página pedida dos N melhores restaurantes
+        # da seleção `mask`, e quantos restaurantes a tabela tem no total.
+        candidates = self.candidates(mask)
+        n = min(n, len(candidates))
+
+        if n < len(candidates):
+            chosen = candidates[np.argpartition(self.rank[candidates], n - 1)[:n]]
+        else:
+            chosen = candidates
+
+        if n == 0:
+            return chosen, 0
+
+        ranks = (self.rank if sort_by is None else self.rank_for(sort_by, ascending))[chosen]
+
+        page_size = page_size or n
+        page = min(page, (n - 1) // page_size)
+        start, stop = page * page_size, min((page + 1) * page_size, n)
+
+        # Só as linhas da página ficam em ordem; o resto é apenas particionado
+        part = np.argpartition(ranks, [start, stop - 1]) if stop - start < n else np.arange(n)
+        rows = part[start:stop]
+
+        return chosen[rows[np.argsort(ranks[rows])]], n
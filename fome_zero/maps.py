@@ -0,0 +1,398 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+from folium.elements import JSCSSMixin
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+from fome_zero.cache import DiskLRU, KeyLocks
+from fome_zero.clusters import mercator
+from fome_zero.etl import atomic_write
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Coordenadas em inteiros de 1e-5 grau (~1 m) e notas em décimos: o payload
+# vai para o navegador como JSON de inteiros, bem menor que floats completos.
+COORD_SCALE = 100000
+RATING_SCALE = 10
+
+# Colunas de texto enviadas como dicionário (valores distintos + códigos)
+DICTIONARY_COLUMNS = {
+    "name": "restaurant_name",
+    "cuisine": "cuisines",
+    "currency": "currency",
+    "color": "color_name",
+}
+
+# Cache do HTML renderizado do mapa: LRU em memória limitada por MB e cópia em
+# disco dentro do diretório da versão dos dados (removida junto com a versão),
+# também LRU limitada por MB.
+MAP_CACHE_MB = float(os.environ.get("FOME_ZERO_MAP_CACHE_MB", "64"))
+MAP_DISK_CACHE_MB = float(os.environ.get("FOME_ZERO_MAP_DISK_CACHE_MB", "256"))
+MAP_CACHE_DIR = "maps"
+
+# Mesmo tamanho usado antes pelo folium_static(m, width=800, height=600)
+MAP_WIDTH = 800
+MAP_HEIGHT = 600
+
+# Até esse número de restaurantes o mapa vai inteiro para o navegador (e para o
+# cache); acima dele, só os clusters e pontos do viewport saem da pirâmide do ETL.
+MAP_CLIENT_MAX_POINTS = int(os.environ.get("FOME_ZERO_MAP_CLIENT_MAX", "20000"))
+
+# Viewport inicial (o mesmo do folium.Map sem location) e folga da consulta: a
+# área consultada tem metade do viewport a mais de cada lado, e só um
+# deslocamento maior que VIEW_SHIFT do viewport pede uma nova consulta.
+DEFAULT_VIEW = {"bounds": ((-85.0, -180.0), (85.0, 180.0)), "zoom": 1}
+VIEW_PADDING = 0.5
+VIEW_SHIFT = 0.25
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## PAYLOAD
+
+def marker_payload(dataframe):
+    # Uma única passada vetorizada sobre as colunas, sem objetos por restaurante
+    payload = {
+        "lat": np.rint(dataframe["latitude"].to_numpy(dtype=np.float64) * COORD_SCALE).astype(np.int64).tolist(),
+        "lon": np.rint(dataframe["longitude"].to_numpy(dtype=np.float64) * COORD_SCALE).astype(np.int64).tolist(),
+        "cost": dataframe["average_cost_for_two"].to_numpy(dtype=np.int64).tolist(),
+        "rating": np.rint(dataframe["aggregate_rating"].to_numpy(dtype=np.float64) * RATING_SCALE).astype(np.int64).tolist(),
+    }
+
+    for key, col in DICTIONARY_COLUMNS.items():
+        codes, values = pd.factorize(dataframe[col])
+        payload[key] = {"codes": codes.tolist(), "values": [str(v) for v in values]}
+
+    # "</" não pode aparecer dentro do <script> da página
+    return json.dumps(payload, separators=(",", ":")).replace("</", "<\\/")
+
+## MAP LAYER
+
+class MarkerLayer(MacroElement):
+    # Marcadores, ícones e popups são criados no navegador a partir do payload:
+    # um ícone por cor, popup montado só quando o marcador é clicado e todos os
+    # marcadores entregues de uma vez ao MarkerCluster pai (addLayers) ou, no mapa
+    # por viewport, adicionados direto ao mapa.
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            (function() {
+                var data = {{ this.payload }};
+
+                var icons = data.color.values.map(function(color) {
+                    return L.AwesomeMarkers.icon({
+                        extraClasses: "fa-rotate-0", icon: "home", iconColor: "white",
+                        markerColor: color, prefix: "fa"});
+                });
+
+                function escape(text) {
+                    return String(text).replace(/[&<>"']/g, function(c) { return "&#" + c.charCodeAt(0) + ";"; });
+                }
+
+                function value(key, i) {
+                    return escape(data[key].values[data[key].codes[i]]);
+                }
+
+                function popup(layer) {
+                    var i = layer.options.row;
+
+                    return "<p><strong>" + value("name", i) + "</strong></p>"
+                        + "<p>Price: " + data.cost[i] + ",00 (" + value("currency", i) + ") para dois"
+                        + "<br />Type: " + value("cuisine", i)
+                        + "<br />Aggragate Rating: " + (data.rating[i] / {{ this.rating_scale }}).toFixed(1) + "/5.0";
+                }
+
+                var markers = new Array(data.lat.length);
+                for (var i = 0; i < data.lat.length; i++) {
+                    markers[i] = L.marker(
+                        [data.lat[i] / {{ this.coord_scale }}, data.lon[i] / {{ this.coord_scale }}],
+                        {icon: icons[data.color.codes[i]], row: i}
+                    ).bindPopup(popup, {maxWidth: 500});
+                }
+
+                var parent = {{ this._parent.get_name() }};
+                if (parent.addLayers) {
+                    parent.addLayers(markers);
+                } else {
+                    markers.forEach(function(marker) { marker.addTo(parent); });
+                }
+            })();
+        {% endmacro %}
+        """)
+
+    def __init__(self, dataframe):
+        super().__init__()
+        self._name = "MarkerLayer"
+
+        self.payload = marker_payload(dataframe)
+        self.coord_scale = COORD_SCALE
+        self.rating_scale = RATING_SCALE
+
+class ClusterLayer(JSCSSMixin, MacroElement):
+    # Clusters já calculados no servidor, desenhados com o mesmo estilo do
+    # MarkerCluster; o clique aproxima o mapa, o que dispara uma nova consulta.
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+            (function() {
+                var data = {{ this.payload }};
+                var map = {{ this._parent.get_name() }};
+
+                function zoomIn(e) {
+                    map.setView(e.latlng, map.getZoom() + 2);
+                }
+
+                for (var i = 0; i < data.count.length; i++) {
+                    var size = data.count[i] < 10 ? "small" : data.count[i] < 100 ? "medium" : "large";
+
+                    L.marker(
+                        [data.lat[i] / {{ this.coord_scale }}, data.lon[i] / {{ this.coord_scale }}],
+                        {icon: L.divIcon({
+                            html: "<div><span>" + data.count[i] + "</span></div>",
+                            className: "marker-cluster marker-cluster-" + size,
+                            iconSize: L.point(40, 40)})}
+                    ).on("click", zoomIn).addTo(map);
+                }
+            })();
+        {% endmacro %}
+        """)
+
+    default_css = MarkerCluster.default_css
+
+    def __init__(self, clusters):
+        super().__init__()
+        self._name = "ClusterLayer"
+
+        self.payload = json.dumps({
+            "lat": np.rint(clusters["latitude"].to_numpy() * COORD_SCALE).astype(np.int64).tolist(),
+            "lon": np.rint(clusters["longitude"].to_numpy() * COORD_SCALE).astype(np.int64).tolist(),
+            "count": clusters["count"].to_numpy(dtype=np.int64).tolist(),
+        }, separators=(",", ":"))
+        self.coord_scale = COORD_SCALE
+
+def build_map(dataframe):
+    f = folium.Figure(width=1920, height=1080)
+
+    m = folium.Map(max_bounds=True).add_to(f)
+
+    # chunkedLoading evita travar o navegador ao agrupar muitos marcadores
+    marker_cluster = MarkerCluster(chunkedLoading=True).add_to(m)
+
+    MarkerLayer(dataframe).add_to(marker_cluster)
+
+    return m
+
+## VIEWPORT MAP
+
+def view_center(bounds):
+    # Centro em pixels (Web Mercator), como o Leaflet; a média das latitudes
+    # deslocaria o mapa para o norte a cada nova consulta.
+    (south, west), (north, east) = bounds
+    _, y = mercator([south, north], [west, east])
+
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y.mean()))))
+
+    return [float(lat), (west + east) / 2]
+
+def query_bounds(bounds, padding=VIEW_PADDING):
+    (south, west), (north, east) = bounds
+    d_lat, d_lon = (north - south) * padding, (east - west) * padding
+
+    return ((max(south - d_lat, -90.0), max(west - d_lon, -180.0)),
+            (min(north + d_lat, 90.0), min(east + d_lon, 180.0)))
+
+def view_from_state(state):
+    # Viewport devolvido pelo st_folium; None enquanto o mapa não informou o
+    # viewport real (o valor padrão do componente não tem bounds).
+    try:
+        sw, ne = state["bounds"]["_southWest"], state["bounds"]["_northEast"]
+        bounds = ((float(sw["lat"]), float(sw["lng"])), (float(ne["lat"]), float(ne["lng"])))
+
+        return {"bounds": bounds, "zoom": int(state["zoom"])}
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def view_changed(old, new, shift=VIEW_SHIFT):
+    if new is None:
+        return False
+
+    if old["zoom"] != new["zoom"]:
+        return True
+
+    (old_s, old_w), (old_n, old_e) = old["bounds"]
+    (new_s, new_w), (new_n, new_e) = new["bounds"]
+
+    return (abs((new_s + new_n) - (old_s + old_n)) / 2 > shift * (old_n - old_s)
+            or abs((new_w + new_e) - (old_w + old_e)) / 2 > shift * (old_e - old_w))
+
+def build_viewport_map(dataframe, clusters, view):
+    # `clusters` vem de ClusterPyramid.query; clusters de um único restaurante
+    # viram marcadores com popup, os demais um ícone com a contagem.
+    f = folium.Figure(width=1920, height=1080)
+
+    m = folium.Map(location=view_center(view["bounds"]), zoom_start=view["zoom"], max_bounds=True).add_to(f)
+
+    single = clusters["row"].to_numpy() >= 0
+
+    ClusterLayer(clusters.loc[~single, :]).add_to(m)
+    MarkerLayer(dataframe.take(clusters["row"].to_numpy()[single])).add_to(m)
+
+    return m
+
+## NEARBY MAP
+
+def build_nearby_map(dataframe, latitude, longitude):
+    # Resultado da busca por proximidade: o ponto de referência e os
+    # restaurantes encontrados, sem agrupamento, enquadrados no mapa.
+    f = folium.Figure(width=1920, height=1080)
+
+    m = folium.Map(location=[latitude, longitude], zoom_start=13).add_to(f)
+
+    folium.Marker([latitude, longitude], icon=folium.Icon(color="red", icon="user", prefix="fa")).add_to(m)
+
+    MarkerLayer(dataframe).add_to(m)
+
+    if len(dataframe) > 0:
+        lat = dataframe["latitude"].to_numpy(dtype=np.float64)
+        lon = dataframe["longitude"].to_numpy(dtype=np.float64)
+
+        m.fit_bounds([[min(lat.min(), latitude), min(lon.min(), longitude)],
+                      [max(lat.max(), latitude), max(lon.max(), longitude)]])
+
+    return m
+
+## HTML
+
+def map_html(m):
+    # Mesmo HTML que o folium_static gera para um folium.Map
+    return folium.Figure().add_child(m).render()
+
+def render_map_html(dataframe):
+    return map_html(build_map(dataframe))
+
+## MAP CACHE
+
+class MapCache:
+    # HTML do mapa por (versão dos dados, seleção de países ordenada). Em memória,
+    # LRU limitado por `max_bytes`; em disco, um arquivo por chave em `cache_dir`,
+    # que sobrevive a reinícios do servidor, LRU limitado por `disk_max_bytes`.
+    # Cada chave é renderizada uma única vez: sessões que pedem a mesma seleção
+    # ao mesmo tempo esperam a primeira.
+    def __init__(self, fingerprint, cache_dir=None, max_bytes=MAP_CACHE_MB * 2**20,
+                 disk_max_bytes=MAP_DISK_CACHE_MB * 2**20):
+        self.fingerprint = fingerprint
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.disk = None if cache_dir is None else DiskLRU(cache_dir, disk_max_bytes)
+
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._lock = threading.Lock()
+        self._key_locks = KeyLocks()
+
+    def key(self, countries):
+        return (self.fingerprint, tuple(sorted(set(countries))))
+
+    def path(self, key):
+        digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()[:32]
+
+        return self.cache_dir / f"{digest}.html"
+
+    def get(self, countries, render):
+        key = self.key(countries)
+
+        html = self._memory_get(key)
+        if html is not None:
+            return html
+
+        with self._key_locks.hold(key):
+            html = self._memory_get(key)
+            if html is not None:
+                return html
+
+            html = self._disk_get(key)
+            if html is None:
+                html = render()
+                self._disk_put(key, html)
+
+                with self._lock:
+                    self.counters["misses"] += 1
+
+            self._memory_put(key, html)
+
+        return html
+
+    def _memory_get(self, key):
+        with self._lock:
+            html = self.entries.get(key)
+
+            if html is not None:
+                self.entries.move_to_end(key)
+                self.counters["hits"] += 1
+
+            return html
+
+    def _memory_put(self, key, html):
+        size = len(html)
+
+        with self._lock:
+            if key in self.entries or size > self.max_bytes:
+                return
+
+            self.entries[key] = html
+            self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.counters["evictions"] += 1
+
+    def _disk_get(self, key):
+        if self.disk is None:
+            return None
+
+        # O arquivo pode ter saído do LRU do disco (inclusive por outro processo)
+        try:
+            html = self.path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        self.disk.touch(self.path(key))
+
+        with self._lock:
+            self.counters["disk_hits"] += 1
+
+        return html
+
+    def _disk_put(self, key, html):
+        if self.disk is None:
+            return
+
+        def write(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(html)
+
+        self.cache_dir.mkdir(exist_ok=True)
+        atomic_write(self.path(key), write)
+        self.disk.added(self.path(key))
+
+    def stats(self):
+        disk = self.disk.stats() if self.disk is not None else {}
+
+        with self._lock:
+            return dict(self.counters, items=len(self.entries), bytes=self.bytes, **disk)
@@ -0,0 +1,89 @@
+# Tabelas exibidas pelas páginas, a partir dos frames já agregados (roll-ups do
+# cubo e estatísticas por culinária). As páginas e o modo batch
+# (fome_zero.batch) usam as mesmas funções, então os números são os mesmos.
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## OVERVIEW (MAIN PAGE)
+
+def overview(dataframe):
+    return {
+        "restaurants": int(dataframe["restaurant_id"].nunique()),
+        "countries": int(dataframe["country"].nunique()),
+        "cities": int(dataframe["city"].nunique()),
+        "votes": int(dataframe["votes"].sum()),
+        "cuisines": int(dataframe["cuisines"].nunique()),
+    }
+
+## COUNTRIES (country_rollup)
+
+def country_restaurants(df_country):
+    return (df_country
+               .loc[:,["restaurant_id"]]
+               .sort_values("restaurant_id",ascending=False)
+               .reset_index())
+
+def country_cities(df_country):
+    return (df_country
+               .loc[:,["city"]]
+               .sort_values("city",ascending=False)
+               .reset_index())
+
+def country_votes(df_country):
+    return (round(df_country
+                     .loc[:,['votes']]
+                     .sort_values('votes',ascending=False)
+                     .reset_index(),1))
+
+def country_cost_for_two(df_country):
+    # preços na moeda local de cada país
+    return round((df_country
+                     .loc[:,['average_cost_for_two']]
+                     .sort_values('average_cost_for_two', ascending=False)
+                     .reset_index()),2)
+
+## CITIES (city_rollup)
+
+def city_top_restaurants(df_city, n=10):
+    return (df_city
+               .loc[:,['restaurant_id']]
+               .sort_values('restaurant_id',ascending=False)
+               .reset_index()
+               .head(n))
+
+def city_top_rating_gt_4(df_city, n=7):
+    return (df_city.loc[df_city['rating_gt_4']>0,['rating_gt_4']]
+               .rename(columns={'rating_gt_4':'restaurant_id'})
+               .sort_values('restaurant_id',ascending=False)
+               .reset_index()
+               .head(n))
+
+def city_top_rating_lt_2_5(df_city, n=7):
+    return (df_city.loc[df_city['rating_lt_2_5']>0,['rating_lt_2_5']]
+               .rename(columns={'rating_lt_2_5':'restaurant_id'})
+               .sort_values('restaurant_id',ascending=False)
+               .reset_index()
+               .head(n))
+
+def city_top_cuisines(df_city, n=10):
+    return (df_city
+               .loc[:,['cuisines']]
+               .sort_values('cuisines',ascending=False)
+               .reset_index()
+               .head(n))
+
+## CUISINES (CuisineStatsSelection.frame)
+
+def cuisine_best(df_cuisine_ratings, n=10):
+    return (round(df_cuisine_ratings
+                     .sort_values('aggregate_rating',ascending=False)
+                     .reset_index()
+                     .head(n),1))
+
+def cuisine_worst(df_cuisine_ratings, n=10):
+    return (round(df_cuisine_ratings
+                     .sort_values('aggregate_rating',ascending=True)
+                     .reset_index()
+                     .head(n),1))
@@ -0,0 +1,129 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Busca dos k mais próximos com filtros: começa pedindo k * NEAREST_OVERFETCH
+# vizinhos à árvore e multiplica por 4 até achar k que passem nos filtros.
+NEAREST_OVERFETCH = 4
+
+# Filtros muito seletivos: passado esse número de candidatos, é mais barato
+# calcular a distância só das linhas que atendem aos filtros (força bruta).
+NEAREST_MAX_FETCH = 65536
+
+# Teto padrão da busca por raio: um raio grande em uma região densa traria
+# todos os restaurantes. Mesmo padrão do MAP_CLIENT_MAX_POINTS (fome_zero.maps),
+# o máximo de pontos que o mapa manda inteiros para o navegador.
+WITHIN_MAX_RESULTS = int(os.environ.get("FOME_ZERO_MAP_CLIENT_MAX", "20000"))
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## GEOMETRY
+
+def unit_vectors(latitude, longitude):
+    # Pontos na esfera unitária: a distância euclidiana (corda) cresce junto
+    # com a distância sobre a superfície, então a KD-tree 3D responde as
+    # consultas de haversine sem aproximação.
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+def km_to_chord(distance_km):
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+def haversine_km(latitude, longitude, lat, lon):
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(lat), np.radians(lon)
+
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+## QUERY
+
+class NearbyIndex:
+    # KD-tree sobre as coordenadas dos restaurantes, construída uma vez por
+    # versão dos dados. Os filtros (culinária, faixa de preço e nota mínima) são
+    # avaliados só nos candidatos devolvidos pela árvore, nunca no dataset todo.
+    def __init__(self, dataframe):
+        self.tree = cKDTree(unit_vectors(dataframe["latitude"], dataframe["longitude"]))
+        self.n_rows = len(dataframe)
+
+        self.latitude = dataframe["latitude"].to_numpy(dtype=np.float64)
+        self.longitude = dataframe["longitude"].to_numpy(dtype=np.float64)
+
+        self.cuisines = pd.Categorical(dataframe["cuisines"])
+        self.price_type = pd.Categorical(dataframe["price_type"])
+        self.rating = dataframe["aggregate_rating"].to_numpy(dtype=np.float64)
+
+    def accept(self, rows, cuisines=None, price_types=None, min_rating=None):
+        keep = np.ones(len(rows), dtype=bool)
+
+        if cuisines is not None:
+            codes = self.cuisines.categories.get_indexer(list(cuisines))
+            keep &= np.isin(self.cuisines.codes[rows], codes[codes >= 0])
+
+        if price_types is not None:
+            codes = self.price_type.categories.get_indexer(list(price_types))
+            keep &= np.isin(self.price_type.codes[rows], codes[codes >= 0])
+
+        if min_rating is not None:
+            keep &= self.rating[rows] >= min_rating
+
+        return keep
+
+    def nearest(self, latitude, longitude, k=10, **filters):
+        # Os k restaurantes mais próximos do ponto: DataFrame com `row` (posição
+        # no dataset) e `distance_km`, em ordem crescente de distância.
+        filters = {name: value for name, value in filters.items() if value is not None}
+
+        point = unit_vectors([latitude], [longitude])[0]
+        k = min(k, self.n_rows)
+        fetch = k * (NEAREST_OVERFETCH if filters else 1)
+
+        while fetch <= NEAREST_MAX_FETCH:
+            fetch = min(fetch, self.n_rows)
+            chord, rows = self.tree.query(point, k=fetch)
+            chord, rows = np.atleast_1d(chord), np.atleast_1d(rows)
+
+            keep = self.accept(rows, **filters)
+            if keep.sum() >= k or fetch == self.n_rows:
+                return pd.DataFrame({"row": rows[keep][:k], "distance_km": chord_to_km(chord[keep][:k])})
+
+            fetch *= NEAREST_OVERFETCH
+
+        rows = np.flatnonzero(self.accept(np.arange(self.n_rows), **filters))
+        distance = haversine_km(latitude, longitude, self.latitude[rows], self.longitude[rows])
+        order = np.argsort(distance, kind="stable")[:k]
+
+        return pd.DataFrame({"row": rows[order], "distance_km": distance[order]})
+
+    def within(self, latitude, longitude, radius_km, limit=WITHIN_MAX_RESULTS, **filters):
+        # Restaurantes a até `radius_km` do ponto, do mais próximo ao mais
+        # distante; só os `limit` mais próximos (None = todos)
+        point = unit_vectors([latitude], [longitude])[0]
+
+        rows = np.asarray(self.tree.query_ball_point(point, r=km_to_chord(radius_km)), dtype=np.int64)
+        rows = rows[self.accept(rows, **filters)]
+
+        distance = haversine_km(latitude, longitude, self.latitude[rows], self.longitude[rows])
+        order = np.argsort(distance, kind="stable")[:limit]
+
+        return pd.DataFrame({"row": rows[order], "distance_km": distance[order]})
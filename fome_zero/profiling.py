@@ -0,0 +1,270 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import cProfile
+import hashlib
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Perfil de um rerun: ?profile=1 na URL perfila os reruns daquela sessão;
+# FOME_ZERO_PROFILE=1 perfila todos os reruns do processo (uso local).
+# "cpu" captura só cProfile + amostragem, sem o tracemalloc.
+PROFILE_MODE = os.environ.get("FOME_ZERO_PROFILE", "0")
+PROFILE_MODES = {"1": "full", "full": "full", "cpu": "cpu"}
+
+# Qualquer visitante pode mandar ?profile=, então pela URL o perfil é só de
+# CPU: o tracemalloc deixa o processo inteiro mais lento enquanto captura. O
+# modo "full" pela URL fica atrás de FOME_ZERO_PROFILE_MEMORY=1 (operador).
+PROFILE_MEMORY = os.environ.get("FOME_ZERO_PROFILE_MEMORY", "0") == "1"
+
+PROFILE_DIR = Path(os.environ.get("FOME_ZERO_PROFILE_DIR", BASE_DIR / "profiles"))
+
+# Perfis mantidos em PROFILE_DIR (cada um com .folded, .prof e .json); os
+# mais antigos são apagados a cada perfil gravado
+PROFILE_KEEP = int(os.environ.get("FOME_ZERO_PROFILE_KEEP", "50"))
+PROFILE_SUFFIXES = (".folded", ".prof", ".json")
+
+# Intervalo da amostragem de pilhas (ms) e tempo máximo de uma captura: um
+# rerun interrompido (st.stop, rerun) não deixa a amostragem ligada.
+SAMPLE_INTERVAL_MS = float(os.environ.get("FOME_ZERO_PROFILE_INTERVAL_MS", "2"))
+PROFILE_MAX_SECONDS = 120
+
+# Frames guardados por alocação e linhas nos resumos
+TRACE_FRAMES = 25
+TOP_ENTRIES = 25
+
+# O tracemalloc é global ao processo: uma captura de memória por vez
+_memory_lock = threading.Lock()
+
+# Perfil em andamento na thread do script da sessão
+_local = threading.local()
+
+# Sessões gravando e limpando PROFILE_DIR ao mesmo tempo
+_write_lock = threading.Lock()
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## MODE
+
+def profile_mode(query_params):
+    # None (desligado), "full" ou "cpu"
+    if "profile" not in query_params:
+        return PROFILE_MODES.get(PROFILE_MODE)
+
+    mode = PROFILE_MODES.get(query_params["profile"][0])
+
+    return "cpu" if mode == "full" and not PROFILE_MEMORY else mode
+
+def short_path(filename):
+    # Caminho relativo ao projeto; bibliotecas ficam com pacote/arquivo
+    path = Path(filename)
+
+    try:
+        return path.resolve().relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return "/".join(path.parts[-2:])
+
+def frame_label(code):
+    # "função (arquivo:linha)", sem ";" que separa os frames no formato folded
+    return f"{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+## CAPTURE
+
+class RerunProfile:
+    # Perfil de um rerun da página na thread do script: cProfile (só a thread
+    # atual), amostras de pilha dessa thread para o flamegraph e, no modo
+    # "full", as alocações do tracemalloc durante o rerun.
+    def __init__(self, page, mode, script_path, interval_ms=SAMPLE_INTERVAL_MS):
+        self.page = page
+        self.mode = mode
+        self.script_path = script_path
+        self.interval = interval_ms / 1000
+        self.thread_id = threading.get_ident()
+        self.profiler = cProfile.Profile()
+        self.samples = Counter()
+        self.stopped = threading.Event()
+        self.memory = False
+
+    def start(self):
+        if self.mode == "full" and _memory_lock.acquire(blocking=False):
+            tracemalloc.start(TRACE_FRAMES)
+            self.memory = True
+
+        self.sampler = threading.Thread(target=self.sample, name="fome-zero-profile", daemon=True)
+        self.sampler.start()
+
+        self.start_time = time.perf_counter()
+        self.profiler.enable()
+
+        return self
+
+    def sample(self):
+        deadline = time.monotonic() + PROFILE_MAX_SECONDS
+
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+
+            if frame is None or time.monotonic() > deadline:
+                self.release_memory()
+                return
+
+            self.samples[self.folded_stack(frame)] += 1
+
+    def folded_stack(self, frame):
+        # Do script da página até o frame atual; os frames do Streamlit abaixo
+        # do script ficam de fora. O nome da página é a raiz do flamegraph.
+        stack = []
+
+        while frame is not None:
+            stack.append(frame_label(frame.f_code))
+            if frame.f_code.co_filename == self.script_path:
+                break
+            frame = frame.f_back
+
+        stack.append(self.page)
+
+        return ";".join(reversed(stack))
+
+    def release_memory(self):
+        if self.memory:
+            self.memory = False
+            tracemalloc.stop()
+            _memory_lock.release()
+
+    def halt(self):
+        self.profiler.disable()
+        self.wall = time.perf_counter() - self.start_time
+
+        self.stopped.set()
+        self.sampler.join()
+
+    def discard(self):
+        # Rerun interrompido antes do end_profile
+        self.halt()
+        self.release_memory()
+
+    def stop(self):
+        self.halt()
+
+        self.allocations = None
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            current, peak = tracemalloc.get_traced_memory()
+            self.release_memory()
+
+            self.allocations = {
+                "peak_mb": round(peak / 2**20, 3),
+                "retained_mb": round(current / 2**20, 3),
+                "top": [{"where": f"{short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                         "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                        for stat in snapshot.statistics("lineno")[:TOP_ENTRIES]],
+            }
+
+        return self
+
+## OUTPUT
+
+def top_functions(profiler, n=TOP_ENTRIES):
+    stats = pstats.Stats(profiler)
+
+    rows = [{"function": f"{func} ({short_path(path)}:{line})", "calls": calls,
+             "own_s": round(own, 6), "cumulative_s": round(cumulative, 6)}
+            for (path, line, func), (_, calls, own, cumulative, _) in stats.stats.items()]
+
+    return sorted(rows, key=lambda row: -row["cumulative_s"])[:n]
+
+def prune_profiles(out_dir, keep=PROFILE_KEEP):
+    # O nome começa pela data, então a ordem alfabética é a cronológica
+    stems = sorted({path.stem for path in out_dir.iterdir() if path.suffix in PROFILE_SUFFIXES})
+
+    for stem in stems[:max(len(stems) - keep, 0)]:
+        for suffix in PROFILE_SUFFIXES:
+            try:
+                os.remove(out_dir / f"{stem}{suffix}")
+            except FileNotFoundError:
+                pass
+
+def write_profile(profile, selection, fingerprint, out_dir=PROFILE_DIR, keep=PROFILE_KEEP):
+    # <data>_<página>_<hash da seleção>_<versão dos dados>.{folded,prof,json}:
+    # .folded (pilhas amostradas, flamegraph.pl/speedscope), .prof (pstats,
+    # snakeviz) e .json com a seleção, o fingerprint e os resumos. Só os
+    # `keep` perfis mais recentes ficam no diretório.
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    selection_text = json.dumps(selection, sort_keys=True, default=str, ensure_ascii=False)
+    selection_hash = hashlib.sha256(selection_text.encode("utf-8")).hexdigest()[:8]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+    base = out_dir / f"{stamp}_{profile.page}_{selection_hash}_{fingerprint.rsplit('-', 1)[-1][:12]}"
+
+    with open(base.with_suffix(".folded"), "w", encoding="utf-8") as folded_file:
+        for stack, count in profile.samples.most_common():
+            folded_file.write(f"{stack} {count}\n")
+
+    profile.profiler.dump_stats(base.with_suffix(".prof"))
+
+    base.with_suffix(".json").write_text(json.dumps({
+        "page": profile.page,
+        "selection": json.loads(selection_text),
+        "fingerprint": fingerprint,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode": profile.mode,
+        "wall_seconds": round(profile.wall, 6),
+        "samples": sum(profile.samples.values()),
+        "sample_interval_ms": profile.interval * 1000,
+        "top_functions": top_functions(profile.profiler),
+        "allocations": profile.allocations,
+    }, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    with _write_lock:
+        prune_profiles(out_dir, keep)
+
+    return base.with_suffix(".folded")
+
+## RERUNS
+
+def begin_profile(page, query_params):
+    # Chamado no início do script da página; devolve None quando o perfil não
+    # foi pedido nessa sessão (nenhum custo nas demais sessões).
+    # O Streamlit reaproveita a thread do script entre reruns da sessão, então
+    # um perfil deixado por um rerun interrompido é descartado aqui.
+    stale = getattr(_local, "profile", None)
+    if stale is not None:
+        stale.discard()
+
+    mode = profile_mode(query_params)
+
+    if mode is None:
+        _local.profile = None
+        return None
+
+    _local.profile = RerunProfile(page, mode, sys._getframe(1).f_code.co_filename).start()
+
+    return _local.profile
+
+def end_profile(profile, selection):
+    # Chamado no fim do script; devolve o caminho do flamegraph (.folded)
+    from fome_zero.data import get_fingerprint
+
+    _local.profile = None
+    profile.stop()
+
+    return write_profile(profile, selection, get_fingerprint())
@@ -0,0 +1,139 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Linhas em memória na intercalação (somando os buffers de todas as
+# execuções), quando o chamador não define outro valor
+MERGE_BUFFER_ROWS = 1 << 20
+
+# Row groups pequenos nas execuções: o leitor do parquet decodifica um row
+# group inteiro, então esse também é o menor pedaço lido de cada execução
+RUN_GROUP_ROWS = 1024
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## EXTERNAL SORT
+
+class SortedRuns:
+    # Ordenação externa do ETL streaming: cada bloco é ordenado pelas colunas
+    # `order` e gravado como uma execução (parquet) em um diretório temporário
+    # dentro de `parent`. merge() intercala as execuções lendo um pedaço de cada
+    # uma por vez, com `buffer_rows` linhas no total; quando há execuções demais
+    # para esses buffers, grupos delas são antes intercalados em execuções
+    # maiores (várias passadas). A memória depende do tamanho dos buffers e não
+    # do total de linhas. A primeira coluna de `order` é a chave da
+    # intercalação: cada bloco devolvido traz grupos completos dela.
+    def __init__(self, parent, schema, order):
+        self.schema = schema
+        self.order = list(order)
+        self.key = self.order[0]
+        self.run_dir = Path(tempfile.mkdtemp(dir=parent, prefix=".runs-"))
+        self.paths = []
+        self.written = 0
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add(self, dataframe):
+        if len(dataframe) == 0:
+            return
+
+        df = dataframe.sort_values(self.order, kind="mergesort", ignore_index=True)
+        path = self.new_path()
+
+        pq.write_table(self.to_arrow(df), path, row_group_size=RUN_GROUP_ROWS, compression="none")
+        self.paths.append(path)
+
+    def merge(self, buffer_rows=MERGE_BUFFER_ROWS):
+        fan_in = max(2, buffer_rows // RUN_GROUP_ROWS)
+
+        while len(self.paths) > fan_in:
+            paths, self.paths = self.paths, []
+
+            for start in range(0, len(paths), fan_in):
+                group = paths[start:start + fan_in]
+                path = self.new_path()
+
+                with pq.ParquetWriter(path, self.schema, compression="none") as writer:
+                    for block in self.merge_paths(group, buffer_rows):
+                        writer.write_table(self.to_arrow(block), row_group_size=RUN_GROUP_ROWS)
+
+                for old_path in group:
+                    os.remove(old_path)
+                self.paths.append(path)
+
+        yield from self.merge_paths(self.paths, buffer_rows)
+
+    def merge_paths(self, paths, buffer_rows):
+        # Libera as linhas com chave menor que a menor "última chave lida" entre
+        # as execuções não terminadas: nenhuma execução ainda tem chaves menores
+        # a ler, então esses grupos estão completos.
+        block_rows = max(buffer_rows // max(len(paths), 1), RUN_GROUP_ROWS)
+        readers = [pq.ParquetFile(path).iter_batches(batch_size=block_rows) for path in paths]
+        buffers = [self.empty()] * len(readers)
+
+        def refill(i):
+            while readers[i] is not None:
+                batch = next(readers[i], None)
+
+                if batch is None:
+                    readers[i] = None
+                elif batch.num_rows:
+                    buffers[i] = pd.concat([buffers[i], batch.to_pandas()], ignore_index=True)
+                    return
+
+        for i in range(len(readers)):
+            refill(i)
+
+        while True:
+            active = [i for i, reader in enumerate(readers) if reader is not None]
+            bound = min(buffers[i][self.key].iat[-1] for i in active) if active else None
+
+            released = []
+            for i, buffer in enumerate(buffers):
+                cut = len(buffer) if bound is None else np.searchsorted(buffer[self.key].to_numpy(), bound, side="left")
+
+                if cut:
+                    released.append(buffer.iloc[:cut])
+                    buffers[i] = buffer.iloc[cut:].reset_index(drop=True)
+
+            if released:
+                yield pd.concat(released, ignore_index=True).sort_values(self.order, kind="mergesort", ignore_index=True)
+
+            if not active:
+                return
+
+            # As execuções que definiram o limite só têm chaves iguais a ele no buffer
+            for i in active:
+                if buffers[i][self.key].iat[-1] == bound:
+                    refill(i)
+
+    def new_path(self):
+        self.written += 1
+
+        return self.run_dir / f"{self.written:06d}.parquet"
+
+    def to_arrow(self, dataframe):
+        return pa.Table.from_pandas(dataframe, schema=self.schema, preserve_index=False)
+
+    def empty(self):
+        return self.schema.empty_table().to_pandas()
+
+    def close(self):
+        shutil.rmtree(self.run_dir, ignore_errors=True)
@@ -0,0 +1,159 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+CATEGORY_COLUMNS = [
+    "country",
+    "city",
+    "cuisines",
+    "price_type",
+    "currency",
+    "rating_text",
+    "color_name",
+]
+
+BOOL_COLUMNS = [
+    "has_table_booking",
+    "has_online_delivery",
+    "is_delivering_now",
+]
+
+# Modo compacto em memória: além das categorias do schema, dicionariza as
+# demais colunas de texto repetitivo e reduz os inteiros ao menor tipo possível.
+COMPACT_CATEGORY_COLUMNS = CATEGORY_COLUMNS + [
+    "locality",
+    "locality_verbose",
+    "rating_color",
+]
+
+COMPACT_INT_COLUMNS = [
+    "restaurant_id",
+    "average_cost_for_two",
+    "votes",
+]
+
+# Schema declarado do dataset tratado, na mesma ordem do adjust_columns_order
+CATEGORY_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+PROCESSED_SCHEMA = pa.schema([
+    ("restaurant_id", pa.int64()),
+    ("restaurant_name", pa.string()),
+    ("country", CATEGORY_TYPE),
+    ("city", CATEGORY_TYPE),
+    ("address", pa.string()),
+    ("locality", pa.string()),
+    ("locality_verbose", pa.string()),
+    ("longitude", pa.float64()),
+    ("latitude", pa.float64()),
+    ("cuisines", CATEGORY_TYPE),
+    ("price_type", CATEGORY_TYPE),
+    ("average_cost_for_two", pa.int64()),
+    ("currency", CATEGORY_TYPE),
+    ("has_table_booking", pa.bool_()),
+    ("has_online_delivery", pa.bool_()),
+    ("is_delivering_now", pa.bool_()),
+    ("aggregate_rating", pa.float64()),
+    ("rating_color", pa.string()),
+    ("color_name", CATEGORY_TYPE),
+    ("rating_text", CATEGORY_TYPE),
+    ("votes", pa.int64()),
+])
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## PARQUET SCHEMA
+
+def apply_schema(dataframe):
+    df = dataframe.copy()
+
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+
+    for col in BOOL_COLUMNS:
+        df[col] = df[col].astype(bool)
+
+    return df
+
+def to_arrow(dataframe):
+    return pa.Table.from_pandas(apply_schema(dataframe), schema=PROCESSED_SCHEMA, preserve_index=False)
+
+def write_parquet(dataframe, path):
+    pq.write_table(to_arrow(dataframe), path, compression="zstd")
+
+def parquet_writer(path):
+    # Escrita incremental: cada bloco vira um row group do mesmo arquivo
+    return pq.ParquetWriter(path, PROCESSED_SCHEMA, compression="zstd")
+
+def read_parquet(path, columns=None):
+    df = pd.read_parquet(path, columns=columns)
+
+    # O dicionário do parquet volta na ordem de aparição; ordenar as categorias
+    # mantém a mesma ordem de grupos (e de empates) que o groupby tinha com strings.
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+
+    return df
+
+## IN-MEMORY REPRESENTATION
+
+def compact_frame(dataframe):
+    df = apply_schema(dataframe)
+
+    for col in COMPACT_CATEGORY_COLUMNS:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    for col in COMPACT_INT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    return df
+
+def plain_frame(dataframe):
+    # Representação equivalente à do antigo pd.read_csv (object/int64/float64),
+    # usada como referência no relatório de memória.
+    df = dataframe.copy()
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+
+    for col in BOOL_COLUMNS + COMPACT_INT_COLUMNS:
+        df[col] = df[col].astype("int64")
+
+    return df
+
+def memory_report(dataframe):
+    usage = dataframe.memory_usage(deep=True, index=False)
+    rows = max(len(dataframe), 1)
+
+    report = pd.DataFrame({
+        "dtype": dataframe.dtypes.astype(str),
+        "bytes": usage,
+        "bytes_per_row": (usage / rows).round(1),
+    })
+    report.loc["TOTAL"] = ["", usage.sum(), round(usage.sum() / rows, 1)]
+
+    return report
+
+## EXPORT
+
+def export_frame(dataframe):
+    # O CSV continua sendo só formato de exportação: as flags voltam para 0/1
+    # para manter o arquivo baixado compatível com o formato anterior.
+    df = dataframe.copy()
+
+    for col in BOOL_COLUMNS:
+        df[col] = df[col].astype("int64")
+
+    return df
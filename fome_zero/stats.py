@@ -0,0 +1,134 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Somas parciais guardadas por (país, culinária). As notas entram em décimos,
+# então todas as somas são inteiras e somar/subtrair países é exato. A média
+# dos gráficos não sai delas (CuisineStatsSelection.frame).
+STAT_MEASURES = [
+    "count",
+    "rating_sum_tenths",
+    "rating_sq_sum_hundredths",
+    "votes_sum",
+    "votes_rating_sum_tenths",
+]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## PARTIAL SUMS
+
+class CuisineStats:
+    # Estatísticas de nota por culinária: quantidade, média, variância e média
+    # ponderada pelos votos. Uma passada sobre o dataset (por versão dos dados)
+    # gera as somas parciais de cada (país, culinária); a seleção de países da
+    # página só soma as linhas dos países escolhidos (CuisineStatsSelection).
+    # As notas de cada linha também ficam guardadas, na ordem do dataset, para
+    # a média dos gráficos.
+    def __init__(self, countries, cuisines, rating, votes):
+        country = pd.Categorical(countries)
+        cuisine = pd.Categorical(cuisines)
+
+        self.countries = pd.Index(country.categories)
+        self.cuisines = pd.Index(cuisine.categories)
+
+        self.country_codes = country.codes
+        self.cuisine_codes = cuisine.codes
+        self.rating = np.asarray(rating, dtype=np.float64)
+
+        tenths = np.rint(self.rating * 10).astype(np.int64)
+        votes = np.asarray(votes, dtype=np.int64)
+
+        n_cuisines = len(self.cuisines)
+        cell = country.codes.astype(np.int64) * n_cuisines + cuisine.codes
+        size = len(self.countries) * n_cuisines
+
+        weights = [np.ones(len(tenths), dtype=np.int64), tenths, tenths**2, votes, votes * tenths]
+        sums = [np.bincount(cell, weights=w, minlength=size) for w in weights]
+
+        # partials[país, culinária, medida]
+        self.partials = np.rint(np.stack(sums, axis=1)).astype(np.int64).reshape(len(self.countries), n_cuisines, len(weights))
+
+    @classmethod
+    def from_dataset(cls, dataframe):
+        # Culinária principal de cada restaurante
+        return cls(dataframe["country"], dataframe["cuisines"], dataframe["aggregate_rating"], dataframe["votes"])
+
+    @classmethod
+    def from_bridge(cls, dataframe, bridge):
+        # Todas as culinárias servidas por cada restaurante (tabela ponte)
+        df = bridge.explode(dataframe, ["country", "aggregate_rating", "votes"])
+
+        return cls(df["country"], df["cuisines"], df["aggregate_rating"], df["votes"])
+
+    def selection(self):
+        return CuisineStatsSelection(self)
+
+## SELECTION
+
+class CuisineStatsSelection:
+    # Totais por culinária da seleção de países atual. update() só soma os
+    # países que entraram e subtrai os que saíram desde a última chamada, então
+    # os dois rankings (melhores e piores) leem o mesmo resultado.
+    def __init__(self, stats):
+        self.stats = stats
+        self.countries = set()
+        self.totals = np.zeros(stats.partials.shape[1:], dtype=np.int64)
+
+    def update(self, countries):
+        countries = set(countries) & set(self.stats.countries)
+
+        for country in countries - self.countries:
+            self.totals += self.stats.partials[self.stats.countries.get_loc(country)]
+
+        for country in self.countries - countries:
+            self.totals -= self.stats.partials[self.stats.countries.get_loc(country)]
+
+        self.countries = countries
+
+        return self
+
+    def rating_means(self):
+        # A média em float do groupby(...).mean() do pandas depende da ordem das
+        # linhas (a soma compensada não é exata), e os valores x.x5 arredondados
+        # na tela viram para um lado ou outro conforme essa soma. Por isso a
+        # média não sai das somas inteiras: é o mesmo groupby sobre as linhas
+        # dos países selecionados, na ordem do dataset.
+        codes = [self.stats.countries.get_loc(country) for country in self.countries]
+        rows = np.isin(self.stats.country_codes, codes)
+
+        means = pd.Series(self.stats.rating[rows]).groupby(self.stats.cuisine_codes[rows]).mean()
+
+        rating = np.full(len(self.stats.cuisines), np.nan)
+        rating[means.index.to_numpy()] = means.to_numpy()
+
+        return rating
+
+    def frame(self, cuisines=None, min_count=1):
+        # Uma linha por culinária com ao menos `min_count` restaurantes, indexada e
+        # ordenada pelo nome da culinária. `aggregate_rating` é a média simples,
+        # igual à do groupby sobre o dataset filtrado.
+        n, rating_sum, rating_sq_sum, votes_sum, votes_rating_sum = self.totals.T.astype(np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df = pd.DataFrame({
+                "count": self.totals[:, 0],
+                "aggregate_rating": self.rating_means(),
+                # Variância amostral (ddof=1, como o .var() do pandas)
+                "rating_variance": (n * rating_sq_sum - rating_sum**2) / (n * (n - 1)) / 100,
+                "votes_weighted_rating": votes_rating_sum / (10 * votes_sum),
+            }, index=pd.Index(self.stats.cuisines, name="cuisines"))
+
+        keep = df["count"] >= max(min_count, 1)
+        if cuisines is not None:
+            keep &= df.index.isin(list(cuisines))
+
+        return df.loc[keep, :]
@@ -0,0 +1,108 @@
+# Gerador de arquivos brutos sintéticos com o mesmo esquema de 21 colunas do
+# dataset/raw/data.csv, de 10k a 50M linhas. Usado pelos testes e pelos
+# benchmarks; pela linha de comando, ver benchmarks/synthetic_data.py.
+#
+# Cada restaurante sintético parte de uma linha sorteada do arquivo real, então
+# a distribuição de países, cidades, culinárias, preços e notas (e a correlação
+# entre elas) é a mesma do original. Id, votos e coordenadas são novos, e uma
+# fração das linhas sai repetida, como as duplicatas do arquivo real.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.etl import RAW_DATA_PATH
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# Linhas geradas por bloco: o arquivo é escrito em partes, então 50M linhas não
+# precisam caber em memória de uma vez
+CHUNK_ROWS = 1_000_000
+
+SIZE_SUFFIXES = {"k": 10**3, "m": 10**6}
+
+# Dispersão das coordenadas em torno do restaurante de origem (graus, ~1 km)
+COORD_JITTER = 0.01
+
+# Dispersão (log-normal) dos votos em torno dos votos do restaurante de origem
+VOTES_SIGMA = 0.5
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## SIZES
+
+def parse_size(text):
+    # "10k" -> 10_000, "50M" -> 50_000_000, "7527" -> 7527
+    text = str(text).strip().lower().replace("_", "")
+    factor = SIZE_SUFFIXES.get(text[-1:], 1)
+
+    return int(float(text.rstrip("km")) * factor)
+
+def format_size(rows):
+    for suffix, factor in sorted(SIZE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if rows >= factor and rows % factor == 0:
+            return f"{rows // factor}{suffix.upper() if suffix == 'm' else suffix}"
+
+    return str(rows)
+
+## GENERATOR
+
+def raw_duplicate_rate(df_raw):
+    # Fração de linhas repetidas (mesmo conteúdo) do arquivo real, ~7.8%
+    return float(df_raw.duplicated().mean())
+
+def synthetic_chunk(df_unique, rng, rows, first_id, duplicate_rate, conflict_rate):
+    # `rows` linhas, das quais ~duplicate_rate são cópias de outras linhas do
+    # bloco; uma fração `conflict_rate` das cópias tem votos diferentes (mesmo
+    # restaurant_id com conteúdo divergente, tratado pela política de dedup).
+    n_duplicates = int(round(rows * duplicate_rate))
+    n_unique = rows - n_duplicates
+
+    df = df_unique.take(rng.integers(0, len(df_unique), n_unique)).reset_index(drop=True)
+
+    df["Restaurant ID"] = np.arange(first_id, first_id + n_unique, dtype=np.int64)
+    df["Votes"] = np.rint(df["Votes"].to_numpy() * rng.lognormal(0, VOTES_SIGMA, n_unique)).astype(np.int64)
+    df["Latitude"] = (df["Latitude"].to_numpy() + rng.normal(0, COORD_JITTER, n_unique)).clip(-90, 90)
+    df["Longitude"] = (df["Longitude"].to_numpy() + rng.normal(0, COORD_JITTER, n_unique)).clip(-180, 180)
+
+    if n_duplicates:
+        copies = df.take(rng.integers(0, n_unique, n_duplicates)).reset_index(drop=True)
+
+        conflicts = rng.random(n_duplicates) < conflict_rate
+        copies.loc[conflicts, "Votes"] += 1
+
+        df = pd.concat([df, copies], ignore_index=True)
+        df = df.take(rng.permutation(len(df))).reset_index(drop=True)
+
+    return df, first_id + n_unique
+
+def write_synthetic_raw(rows, out_path, seed=0, duplicate_rate=None, conflict_rate=0.0, chunk_rows=CHUNK_ROWS):
+    # Escreve `rows` linhas no esquema do arquivo bruto e devolve quantas linhas
+    # foram escritas. duplicate_rate=None usa a taxa do arquivo real.
+    df_raw = pd.read_csv(RAW_DATA_PATH)
+
+    if duplicate_rate is None:
+        duplicate_rate = raw_duplicate_rate(df_raw)
+
+    df_unique = df_raw.drop_duplicates().reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+
+    next_id = 1
+    written = 0
+
+    with open(out_path, "w", encoding="utf-8", newline="") as out_file:
+        while written < rows:
+            size = min(chunk_rows, rows - written)
+            df, next_id = synthetic_chunk(df_unique, rng, size, next_id, duplicate_rate, conflict_rate)
+
+            df.loc[:, df_raw.columns].to_csv(out_file, header=written == 0, index=False)
+            written += len(df)
+
+    return written
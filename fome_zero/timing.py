@@ -0,0 +1,263 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+# FOME_ZERO_TIMING=1 liga os spans de todas as páginas: cada rerun vira uma
+# linha JSON no log (FOME_ZERO_TIMING_LOG, padrão stderr) e os tempos vão para
+# o endpoint local de métricas. Desligado, span() devolve um contexto vazio.
+TIMING_ENABLED = os.environ.get("FOME_ZERO_TIMING", "0") != "0"
+TIMING_LOG = os.environ.get("FOME_ZERO_TIMING_LOG")
+
+# /metrics (texto do Prometheus) e /metrics.json em 127.0.0.1; 0 desliga
+METRICS_PORT = int(os.environ.get("FOME_ZERO_METRICS_PORT", "9108"))
+
+# Painel de tempos na sidebar: ?debug=1 na URL ou FOME_ZERO_DEBUG_PANEL=1
+DEBUG_PANEL = os.environ.get("FOME_ZERO_DEBUG_PANEL", "0") != "0"
+
+# Limites (segundos) dos buckets dos histogramas
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("fome_zero.timing")
+
+# Cada sessão do Streamlit roda o script na própria thread: o rerun atual e a
+# pilha de spans abertos ficam por thread.
+_local = threading.local()
+_lock = threading.Lock()
+_server = {}
+
+_NULL_SPAN = nullcontext()
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## METRICS
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def cumulative(self):
+        total = 0
+
+        for le, count in zip(BUCKETS + ("+Inf",), self.buckets):
+            total += count
+            yield le, total
+
+class StageMetrics:
+    # Histogramas do tempo próprio de cada etapa e do rerun inteiro, por página
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.reruns = {}
+
+    def observe_stage(self, page, stage, seconds):
+        with self.lock:
+            self.stages.setdefault((page, stage), Histogram()).observe(seconds)
+
+    def observe_rerun(self, page, seconds):
+        with self.lock:
+            self.reruns.setdefault(page, Histogram()).observe(seconds)
+
+    def prometheus(self):
+        lines = []
+
+        with self.lock:
+            for name, help_text, series in [
+                ("fome_zero_stage_seconds", "Tempo próprio de cada etapa por página", self.stages.items()),
+                ("fome_zero_rerun_seconds", "Tempo total de cada rerun por página",
+                 (((page,), hist) for page, hist in self.reruns.items())),
+            ]:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+
+                for key, hist in sorted(series):
+                    labels = f'page="{key[0]}"' + (f',stage="{key[1]}"' if len(key) > 1 else "")
+
+                    for le, count in hist.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+
+                    lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "stages": [{"page": page, "stage": stage, "count": hist.count, "sum_seconds": round(hist.sum, 6)}
+                           for (page, stage), hist in sorted(self.stages.items())],
+                "reruns": [{"page": page, "count": hist.count, "sum_seconds": round(hist.sum, 6)}
+                           for page, hist in sorted(self.reruns.items())],
+            }
+
+METRICS = StageMetrics()
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = METRICS.prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(METRICS.as_dict()), "application/json"
+        else:
+            self.send_error(404)
+            return
+
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port=METRICS_PORT):
+    # Um servidor por processo; outra instância na mesma porta só gera um aviso
+    with _lock:
+        if "server" in _server or not port:
+            return
+
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+        except OSError as error:
+            logger.warning("endpoint de métricas indisponível na porta %s: %s", port, error)
+            _server["server"] = None
+            return
+
+        threading.Thread(target=server.serve_forever, name="fome-zero-metrics", daemon=True).start()
+        _server["server"] = server
+
+def setup_log():
+    with _lock:
+        if logger.handlers:
+            return
+
+        handler = logging.FileHandler(TIMING_LOG, encoding="utf-8") if TIMING_LOG else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+## SPANS
+
+class Span:
+    # Tempo próprio: o tempo dos spans internos é descontado do span externo,
+    # então as etapas de um rerun não se sobrepõem.
+    __slots__ = ("stage", "label", "start", "children")
+
+    def __init__(self, stage, label=None):
+        self.stage = stage
+        self.label = label
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault("stack", [])
+        stack.append(self)
+        self.children = 0.0
+        self.start = time.perf_counter()
+
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        stack = _local.stack
+        stack.pop()
+
+        if stack:
+            stack[-1].children += elapsed
+
+        seconds = elapsed - self.children
+        run = getattr(_local, "run", None)
+
+        if run is not None:
+            run["spans"].append((self.stage, self.label, seconds))
+
+        if TIMING_ENABLED:
+            METRICS.observe_stage(run["page"] if run is not None else "-", self.stage, seconds)
+
+        return False
+
+def span(stage, label=None):
+    # with span("filter"): ...  Com o timing e o painel desligados, não mede nada.
+    if not TIMING_ENABLED and getattr(_local, "run", None) is None:
+        return _NULL_SPAN
+
+    return Span(stage, label)
+
+## RERUNS
+
+def debug_requested(query_params):
+    return DEBUG_PANEL or query_params.get("debug", ["0"])[0] not in ("", "0")
+
+def begin_run(page, debug=False):
+    # Início do script da página. Um rerun interrompido (st.stop, rerun) é
+    # descartado pelo begin_run seguinte na mesma thread.
+    _local.stack = []
+
+    if not (TIMING_ENABLED or debug):
+        _local.run = None
+        return
+
+    if TIMING_ENABLED:
+        setup_log()
+        start_metrics_server()
+
+    _local.run = {"page": page, "start": time.perf_counter(), "spans": []}
+
+def end_run():
+    # Fim do script: registra o rerun e devolve os spans para o painel
+    run = getattr(_local, "run", None)
+    _local.run = None
+
+    if run is None:
+        return None
+
+    run["total"] = time.perf_counter() - run["start"]
+
+    if TIMING_ENABLED:
+        METRICS.observe_rerun(run["page"], run["total"])
+        logger.info(json.dumps({
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "page": run["page"],
+            "total_ms": round(run["total"] * 1000, 3),
+            "spans": [{"stage": stage, "label": label, "ms": round(seconds * 1000, 3)}
+                      for stage, label, seconds in run["spans"]],
+        }, ensure_ascii=False))
+
+    return run
+
+def span_frame(run):
+    # Uma linha por etapa (e rótulo) do rerun, mais o tempo fora dos spans
+    df = pd.DataFrame(run["spans"], columns=["stage", "label", "seconds"]).fillna({"label": ""})
+    df = (df.groupby(["stage", "label"], sort=False, as_index=False)
+            .agg(calls=("seconds", "size"), ms=("seconds", "sum")))
+    df["ms"] = df["ms"] * 1000
+
+    other = run["total"] * 1000 - df["ms"].sum()
+    df.loc[len(df)] = ["other", "", 0, other]
+    df.loc[len(df)] = ["total", "", len(run["spans"]), run["total"] * 1000]
+
+    return df.round({"ms": 2})
@@ -2,163 +2,39 @@
 # LIBRARIES
 # ==================================================================
 
-import pandas as pd
-import inflection
 import streamlit as st
 from PIL import Image
-import folium
-from folium.plugins import MarkerCluster
-from streamlit_folium import folium_static
 import plotly.express as px
-import random
-import string
+
+from fome_zero.data import get_cuisine_bridge, get_cuisine_stats, get_cuisine_top_index, get_dataset, get_export, get_figure, get_filter_index, get_top_restaurant_index
+from fome_zero.export import EXPORT_FORMATS
+from fome_zero.indexes import TOP_TABLE_COLUMNS
+from fome_zero.metrics import cuisine_best, cuisine_worst
+from fome_zero.profiling import begin_profile, end_profile
+from fome_zero.timing import begin_run, debug_requested, end_run, span, span_frame
 
 # WIDE CONFIG PAGE
 st.set_page_config(page_title='Visão Culinária', page_icon='🍽️',layout='wide')
 
-# ==================================================================
-# AUXILIARY VARIABLES
-# ==================================================================
-
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America",
-}
-
-
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
+# TIMING - spans das etapas deste rerun (fome_zero.timing); ?debug=1 na URL mostra o painel de tempos na sidebar
+# PROFILING - ?profile=1 na URL grava o perfil de CPU deste rerun só desta sessão (fome_zero.profiling)
+parametros_url = st.experimental_get_query_params()
+painel_debug = debug_requested(parametros_url)
+begin_run('cuisines', debug=painel_debug)
+perfil = begin_profile('cuisines', parametros_url)
 
 # ==================================================================
 # FUNCTIONS
 # ==================================================================
 
-## COLUMN RENAME AND ADJUSTMENT FUNCTIONS
-
-def rename_columns(dataframe):
-    df = dataframe.copy()
-
-    title = lambda x: inflection.titleize(x)
-
-    snakecase = lambda x: inflection.underscore(x)
-
-    spaces = lambda x: x.replace(" ", "")
-
-    cols_old = list(df.columns)
-
-    cols_old = list(map(title, cols_old))
-
-    cols_old = list(map(spaces, cols_old))
-
-    cols_new = list(map(snakecase, cols_old))
-
-    df.columns = cols_new
-
-    return df
-
-def country_name(country_id):
-    return COUNTRIES[country_id]
-
-def color_name(color_code):
-    return COLORS[color_code]
-
-def create_price_tye(price_range):
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-    
-def adjust_columns_order(dataframe):
-    df = dataframe.copy()
-
-    new_cols_order = [
-        "restaurant_id",
-        "restaurant_name",
-        "country",
-        "city",
-        "address",
-        "locality",
-        "locality_verbose",
-        "longitude",
-        "latitude",
-        "cuisines",
-        "price_type",
-        "average_cost_for_two",
-        "currency",
-        "has_table_booking",
-        "has_online_delivery",
-        "is_delivering_now",
-        "aggregate_rating",
-        "rating_color",
-        "color_name",
-        "rating_text",
-        "votes",
-    ]
-
-    return df.loc[:, new_cols_order]
-
-## DATA PROCESSING AND CLEANING FUNCTION
-
-def process_data(file_path):
-    df = pd.read_csv(file_path)
-
-    df = df.dropna()
-
-    df = rename_columns(df)
-
-    df["price_type"] = df.loc[:, "price_range"].apply(lambda x: create_price_tye(x))
-
-    df["country"] = df.loc[:, "country_code"].apply(lambda x: country_name(x))
-
-    df["color_name"] = df.loc[:, "rating_color"].apply(lambda x: color_name(x))
-
-    df["cuisines"] = df.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
-
-    df = df.drop_duplicates()
-
-    df = adjust_columns_order(df)
-    
-    df = df.reset_index()
-    
-    df = df.drop(columns=['index'])
-
-    df.to_csv("dataset/processed/data.csv", index=False)
-
-    return df
+# Os gráficos recebem as estatísticas por culinária já agregadas (fome_zero.stats) e
+# ordenadas pelo nome da culinária, para que o sort_values mantenha a mesma ordem de
+# empates do groupby sobre o dataset. Os dois rankings leem o mesmo resultado.
 
 # CONSTRÓI E PLOTA O 1º GRÁFICO DE BARRAS: 'Top 10 melhores tipos de culinária'
 
-def bar_graph1(df_filtered):
-    df_aux = (round(df_filtered.loc[:,['cuisines','aggregate_rating']]
-                      .groupby('cuisines')
-                      .mean()
-                      .sort_values('aggregate_rating',ascending=False)
-                      .reset_index()
-                      .head(10),1))
+def bar_graph1(df_cuisine_ratings):
+    df_aux = cuisine_best(df_cuisine_ratings)
 
     fig = px.bar(df_aux,
                   x='cuisines', y='aggregate_rating',
@@ -172,13 +48,8 @@ def bar_graph1(df_filtered):
 
 # CONSTRÓI E PLOTA O 2º GRÁFICO DE BARRAS: 'Top 10 piores tipos de culinária'
 
-def bar_graph2(df_filtered):
-    df_aux = (round(df_filtered.loc[:,['cuisines','aggregate_rating']]
-                      .groupby('cuisines')
-                      .mean()
-                      .sort_values('aggregate_rating',ascending=True)
-                      .reset_index()
-                      .head(10),1))
+def bar_graph2(df_cuisine_ratings):
+    df_aux = cuisine_worst(df_cuisine_ratings)
 
     fig = px.bar(df_aux,
                   x='cuisines', y='aggregate_rating',
@@ -190,19 +61,21 @@ def bar_graph2(df_filtered):
     
     return fig
 
-## LOAD DATA AND COPY
-RAW_DATA_PATH = f"dataset/raw/data.csv"
-df_raw = pd.read_csv(RAW_DATA_PATH)
-df1 = df_raw.copy()
-
-## REMANE COLUMNS
-df1 = rename_columns(df1)
+# NOMES EM PORTUGUÊS DOS CARDS DE DESTAQUE - as demais culinárias aparecem com o nome do dataset
 
-## TREAT NA
-df1 = df1.dropna()
+CUISINE_LABELS = {
+    'Italian': 'Italiana',
+    'American': 'Americana',
+    'Arabian': 'Árabe',
+    'Japanese': 'Japonesa',
+    'Brazilian': 'Brasileira',
+}
 
-## PROCESS DATA
-df2 = process_data(RAW_DATA_PATH)
+## LOAD DATA
+df2 = get_dataset()
+filter_index = get_filter_index()
+cuisine_top_index = get_cuisine_top_index()
+top_restaurant_index = get_top_restaurant_index()
 
 # ============================================================= INÍCIO DA ESTRUTURA LÓGICA CÓDIGO =============================================================
 
@@ -219,50 +92,96 @@ st.sidebar.markdown('''---''')
 
 st.sidebar.markdown('## Filtros')
 
-# df2_copy criado para as métricas iniciais não variarem com a mudança dos filtros
-df2_metrics = df2.copy()
-
-# create a copy of df2 for the cuisines filter
-df2_cuisines = df2.copy()
-
 # COUNTRY FILTER
 countries = st.sidebar.multiselect(
     'Escolha o(s) país(es) que deseja visualizar os restaurantes',
-    df2.loc[:,'country'].unique().tolist(),
+    filter_index.options('country'),
     default=['Brazil', 'England', 'Qatar', 'South Africa', 'Canada', 'Australia'])
 
-linhas_selecionadas = df2['country'].isin(countries)
-df2 = df2.loc[linhas_selecionadas,:]
+# QUANTIDADE DE RESTAURANTES - sem limite: a tabela é paginada no servidor
+restaurantes = st.sidebar.number_input(label='Selecione a quantidade de restaurantes que deseja visualizar',
+                                       value=10,
+                                       min_value=1,
+                                       step=1)
 
-# SLIDER
-restaurantes = st.sidebar.slider(label='Selecione a quantidade de restaurantes que deseja visualizar',
-                                 value=10,
-                                 min_value=1,
-                                 max_value=20)
+# CUISINE MEMBERSHIP - considera todas as culinárias servidas pelo restaurante, não só a principal
+todas_culinarias = st.sidebar.checkbox('Considerar todas as culinárias de cada restaurante', value=False)
+cuisine_bridge = get_cuisine_bridge()
+
+if todas_culinarias:
+    cuisines_options = cuisine_bridge.cuisines.tolist()
+else:
+    cuisines_options = filter_index.options('cuisines')
 
 # # CUISINES FILTER - filtro somente para a visão cuisines
 cuisines_aux = st.sidebar.multiselect(
     'Escolha o(s) tipo(s) culinário(s)',
-    df2_cuisines.loc[:,'cuisines'].unique().tolist(),
+    cuisines_options,
     default=['Home-made', 'BBQ', 'Japanese', 'Brazilian', 'Arabian','American', 'Italian'])
 
-linhas_selecionadas = df2_cuisines['cuisines'].isin(cuisines_aux)
-df2_cuisines = df2_cuisines.loc[linhas_selecionadas,:]
+# CUISINE HIGHLIGHTS - culinárias dos cards de melhores restaurantes (não dependem dos demais filtros)
+destaques = st.sidebar.multiselect(
+    'Escolha as culinárias dos destaques',
+    filter_index.options('cuisines'),
+    default=list(CUISINE_LABELS))
+
+# MINIMUM SAMPLE - culinárias com poucos restaurantes ficam fora dos rankings de melhores e piores
+minimo_restaurantes = st.sidebar.slider(label='Mínimo de restaurantes por culinária nos gráficos',
+                                        value=1,
+                                        min_value=1,
+                                        max_value=50)
+
+# Apply filters - bitmap das linhas selecionadas, usado na tabela top restaurantes para ela conseguir sofrer alteração
+# de todos os filtros. A seleção sai do índice de filtros, sem varrer nem copiar o dataset.
+# Com todas as culinárias, o filtro usa a tabela ponte restaurante -> culinária.
+with span('filter'):
+    if todas_culinarias:
+        filter_mask = filter_index.mask(country=countries) & cuisine_bridge.serving_any(cuisines_aux)
+    else:
+        filter_mask = filter_index.mask(country=countries, cuisines=cuisines_aux)
+
+# CUISINE STATS - quantidade, média, variância e média ponderada pelos votos de cada culinária, usados pelos dois gráficos.
+# A seleção de países fica na sessão: quando um país entra ou sai, só as somas desse país são adicionadas ou subtraídas.
+cuisine_stats = get_cuisine_stats(todas_culinarias)
+chave_stats = 'cuisine_stats_todas' if todas_culinarias else 'cuisine_stats'
+
+selecao_stats = st.session_state.get(chave_stats)
+
+# Nova sessão ou nova versão dos dados: começa uma seleção vazia
+if selecao_stats is None or selecao_stats.stats is not cuisine_stats:
+    selecao_stats = cuisine_stats.selection()
+    st.session_state[chave_stats] = selecao_stats
+
+with span('aggregate', 'cuisine_stats'):
+    df_cuisine_ratings = selecao_stats.update(countries).frame(cuisines_aux, min_count=minimo_restaurantes)
 
-# Apply filters to create new DataFrame - para ser usado no dataframe top restaurantes e nos gráficos de barra para eles conseguires sofrer alteração
-# de todos os filtros.
-df_filtered = df2[df2['country'].isin(countries) & df2['cuisines'].isin(cuisines_aux)].copy()
+# Chave das figuras no cache de gráficos
+selecao_graficos = {'country': countries, 'cuisines': cuisines_aux, 'todas_culinarias': todas_culinarias,
+                    'minimo_restaurantes': minimo_restaurantes}
 
 
-# PROCESSED DATA DOWNLOAD BUTTON
+# PROCESSED DATA DOWNLOAD BUTTON - o arquivo só é gerado e lido no rerun do clique e fica em disco por versão dos dados
 st.sidebar.markdown("### Dados Tratados")
-processed_data = pd.read_csv('dataset/processed/data.csv')
-st.sidebar.download_button(
-    label='Download',
-    data=processed_data.to_csv(index=False, sep=';'),
-    file_name='data.csv',
-    mime='text/csv',
-)
+formato = st.sidebar.selectbox('Formato do arquivo', list(EXPORT_FORMATS))
+suffix, mime = EXPORT_FORMATS[formato]
+
+apenas_filtros = st.sidebar.checkbox('Exportar apenas os dados dos filtros atuais', value=False)
+
+if not apenas_filtros:
+    selection = None
+elif todas_culinarias:
+    selection = {'country': countries, 'serving_any': cuisines_aux}
+else:
+    selection = {'country': countries, 'cuisines': cuisines_aux}
+
+if st.sidebar.button('Preparar arquivo'):
+    with get_export(suffix, selection) as export_file:
+        st.sidebar.download_button(
+            label='Download',
+            data=export_file,
+            file_name=f'data.{suffix}',
+            mime=mime,
+        )
 
 # POWERED BY
 st.sidebar.markdown('''---''')
@@ -277,96 +196,48 @@ st.markdown('# 🍽️ Visão Tipos Culinários')
 with st.container():
     
     st.markdown('### Melhores Restaurantes dos Principais Tipos Culinários')
-    
-with st.container():
-        
-    col1, col2, col3 = st.columns(3, gap='large')
-    
-    with col1:
-        
-        df_aux = (df2_metrics.loc[df2_metrics['cuisines']=='Italian',['restaurant_id','aggregate_rating','restaurant_name']]
-                        .groupby('restaurant_name')
-                        .mean()
-                        .sort_values(['aggregate_rating','restaurant_id'],ascending=[False,True])
-                        .reset_index())       
-
-        nome_rest = df_aux.iloc[0,0]
-        nota_rest = df_aux.iloc[0,2]
-        
-        col1.metric(label=f'Italiana: {nome_rest}', value=f'{nota_rest}/5.0')
-  
-    with col2:
-            
-        df_aux = (df2_metrics.loc[df2_metrics['cuisines'] == 'American',['restaurant_id','restaurant_name','aggregate_rating']]
-                     .groupby('restaurant_name')
-                     .mean()
-                     .sort_values(['aggregate_rating','restaurant_id'],ascending=[False,True])
-                     .reset_index())
-        
-        nome_rest = df_aux.iloc[0,0]
-        nota_rest = df_aux.iloc[0,2]
 
-        col2.metric(label=f'Americana: {nome_rest}', value=f'{nota_rest}/5.0')
-           
-    with col3:
-        
-        df_aux = (df2_metrics.loc[df2_metrics['cuisines'] == 'Arabian',['restaurant_id','restaurant_name','aggregate_rating']]
-                     .groupby('restaurant_name')
-                     .mean()
-                     .sort_values(['aggregate_rating','restaurant_id'],ascending=[False,True])
-                     .reset_index())
-        
-        nome_rest = df_aux.iloc[0,0]
-        nota_rest = df_aux.iloc[0,2]
+# Um card por culinária escolhida, em linhas de três, com o melhor restaurante
+# de cada uma no dataset completo (índice de destaques por culinária)
+with span('aggregate', 'highlights'):
+    df_destaques = cuisine_top_index.best(destaques)
 
-        col3.metric(label=f'Árabe: {nome_rest}', value=f'{nota_rest}/5.0')
-                
-with st.container():
-    
-    col1, col2, col3 = st.columns(3, gap='large')       
-        
-    with col1:
-        
-        df_aux = (df2_metrics.loc[df2_metrics['cuisines'] == 'Japanese',['restaurant_id','restaurant_name','aggregate_rating']]
-                     .groupby('restaurant_name')
-                     .mean()
-                     .sort_values(['aggregate_rating','restaurant_id'],ascending=[False,True])
-                     .reset_index())
-        
-        nome_rest = df_aux.iloc[0,0]
-        nota_rest = df_aux.iloc[0,2]
+for inicio in range(0, len(df_destaques), 3):
 
-        col1.metric(label=f'Japonesa: {nome_rest}', value=f'{nota_rest}/5.0')
-        
-    with col2:
+    with st.container():
+
+        cols = st.columns(3, gap='large')
 
-        df_aux = (df2_metrics.loc[df2_metrics['cuisines'] == 'Brazilian',['restaurant_id','restaurant_name','aggregate_rating']]
-                     .groupby('restaurant_name')
-                     .mean()
-                     .sort_values(['aggregate_rating','restaurant_id'],ascending=[False,True])
-                     .reset_index())
+        for col, destaque in zip(cols, df_destaques.iloc[inicio:inicio + 3].itertuples()):
 
-        nome_rest = df_aux.iloc[0,0]
-        nota_rest = df_aux.iloc[0,2]
+            nome_culinaria = CUISINE_LABELS.get(destaque.cuisines, destaque.cuisines)
 
-        col2.metric(label=f'Brasileira: {nome_rest}', value=f'{nota_rest}/5.0')
+            col.metric(label=f'{nome_culinaria}: {destaque.restaurant_name}', value=f'{destaque.aggregate_rating}/5.0')
 
 with st.container():
      
     st.markdown(f'## Top {restaurantes} Restaurantes')
 
-    df_aux = (df_filtered.loc[:,['restaurant_id',
-                        'restaurant_name',
-                        'country',
-                        'city',
-                        'cuisines',
-                        'average_cost_for_two',
-                        'aggregate_rating','votes']]
-              .drop_duplicates(subset=['restaurant_name'])
-              .sort_values(['aggregate_rating','restaurant_id'], ascending=[False,True])
-              .head(restaurantes))
-    
-    st.dataframe(df_aux, use_container_width=True)
+    col1, col2, col3, col4 = st.columns(4)
+
+    # Ordenação e página da tabela - só as linhas da página são montadas e enviadas ao navegador
+    ordenar_por = col1.selectbox('Ordenar por', TOP_TABLE_COLUMNS, index=TOP_TABLE_COLUMNS.index('aggregate_rating'))
+    ordem = col2.radio('Ordem', ['Decrescente', 'Crescente'], horizontal=True)
+    por_pagina = col3.selectbox('Restaurantes por página', [10, 25, 50, 100])
+    pagina = col4.number_input('Página', value=1, min_value=1, step=1)
+
+    # Os N melhores são sempre por nota; a ordenação escolhida vale para exibir esses N
+    with span('aggregate', 'top_restaurants'):
+        rows, total = top_restaurant_index.top(filter_mask, restaurantes, sort_by=ordenar_por, ascending=(ordem == 'Crescente'),
+                                               page=pagina - 1, page_size=por_pagina)
+
+        df_aux = df2.take(rows).loc[:, TOP_TABLE_COLUMNS]
+
+    with span('render', 'top_restaurants'):
+        st.dataframe(df_aux, use_container_width=True)
+
+    paginas = max(-(-total // por_pagina), 1)
+    st.caption(f'Página {min(pagina, paginas)} de {paginas} - {total} restaurantes')
 
 with st.container():
     
@@ -374,22 +245,31 @@ with st.container():
     
     with col1:
         
-        fig = bar_graph1(df_filtered)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = get_figure('cuisines/best', selecao_graficos, lambda: bar_graph1(df_cuisine_ratings))
+        with span('render', 'cuisines/best'):
+            st.plotly_chart(fig, use_container_width=True)
         
     with col2:
         
-        fig = bar_graph2(df_filtered)
-        st.plotly_chart(fig, use_container_width=True)
-
-        
-   
-
-
-
-
-
-
-
-
-        
\ No newline at end of file
+        fig = get_figure('cuisines/worst', selecao_graficos, lambda: bar_graph2(df_cuisine_ratings))
+        with span('render', 'cuisines/worst'):
+            st.plotly_chart(fig, use_container_width=True)
+
+# PROFILE - flamegraph deste rerun, marcado com a página, a seleção de filtros e a versão dos dados
+if perfil is not None:
+    arquivo_perfil = end_profile(perfil, {**selecao_graficos, 'restaurantes': restaurantes, 'destaques': destaques,
+                                         'ordenar_por': ordenar_por, 'ordem': ordem, 'por_pagina': por_pagina, 'pagina': pagina})
+
+    st.sidebar.markdown('### Perfil deste rerun')
+    st.sidebar.caption(str(arquivo_perfil))
+    st.sidebar.download_button(label='Flamegraph (.folded)',
+                               data=arquivo_perfil.read_bytes(),
+                               file_name=arquivo_perfil.name,
+                               mime='text/plain')
+
+# DEBUG PANEL - tempos de cada etapa deste rerun
+execucao = end_run()
+
+if painel_debug:
+    st.sidebar.markdown('### Tempos deste rerun')
+    st.sidebar.dataframe(span_frame(execucao), use_container_width=True)
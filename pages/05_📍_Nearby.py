@@ -0,0 +1,161 @@
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import streamlit as st
+from PIL import Image
+import streamlit.components.v1 as components
+
+from fome_zero.data import get_dataset, get_export, get_filter_index, get_nearby_index
+from fome_zero.export import EXPORT_FORMATS
+from fome_zero.maps import MAP_CLIENT_MAX_POINTS, MAP_HEIGHT, MAP_WIDTH, build_nearby_map, map_html
+from fome_zero.profiling import begin_profile, end_profile
+from fome_zero.timing import begin_run, debug_requested, end_run, span, span_frame
+
+# WIDE CONFIG PAGE
+st.set_page_config(page_title='Restaurantes Próximos', page_icon='📍',layout='wide')
+
+# TIMING - spans das etapas deste rerun (fome_zero.timing); ?debug=1 na URL mostra o painel de tempos na sidebar
+# PROFILING - ?profile=1 na URL grava o perfil de CPU deste rerun só desta sessão (fome_zero.profiling)
+parametros_url = st.experimental_get_query_params()
+painel_debug = debug_requested(parametros_url)
+begin_run('nearby', debug=painel_debug)
+perfil = begin_profile('nearby', parametros_url)
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+# MONTA A TABELA DOS RESTAURANTES ENCONTRADOS, COM A DISTÂNCIA EM KM
+
+def nearby_restaurants(df2, results):
+    df_aux = df2.take(results['row'].to_numpy())
+    df_aux['distance_km'] = results['distance_km'].round(2).to_numpy()
+
+    return df_aux
+
+## LOAD DATA
+df2 = get_dataset()
+filter_index = get_filter_index()
+nearby_index = get_nearby_index()
+
+# ============================================================= INÍCIO DA ESTRUTURA LÓGICA CÓDIGO =============================================================
+
+# ==================================================================
+# SIDE BAR
+# ==================================================================
+
+image = Image.open('logo.png')
+st.sidebar.image( image, width=120)
+
+st.sidebar.markdown('# Fome Zero!')
+st.sidebar.markdown('## Escolha o Melhor Restaurante para sua Fome!')
+st.sidebar.markdown('''---''')
+
+st.sidebar.markdown('## Localização')
+
+# PONTO DE REFERÊNCIA - padrão: centro de São Paulo
+latitude = st.sidebar.number_input('Latitude', min_value=-90.0, max_value=90.0, value=-23.5505, format='%.4f')
+longitude = st.sidebar.number_input('Longitude', min_value=-180.0, max_value=180.0, value=-46.6333, format='%.4f')
+
+# TIPO DE BUSCA
+modo = st.sidebar.radio('Tipo de busca', ['Mais próximos', 'Dentro de um raio'])
+
+if modo == 'Mais próximos':
+    quantidade = st.sidebar.slider('Quantidade de restaurantes', value=10, min_value=1, max_value=50)
+else:
+    raio = st.sidebar.slider('Raio (km)', value=5.0, min_value=0.5, max_value=50.0, step=0.5)
+
+st.sidebar.markdown('## Filtros')
+
+# CUISINES, PRICE TYPE AND RATING FILTERS - vazio = sem filtro
+cuisines_aux = st.sidebar.multiselect('Escolha o(s) tipo(s) culinário(s)', filter_index.options('cuisines'))
+price_aux = st.sidebar.multiselect('Escolha a(s) faixa(s) de preço', filter_index.options('price_type'))
+nota_minima = st.sidebar.slider('Nota mínima', value=0.0, min_value=0.0, max_value=5.0, step=0.1)
+
+filters = {
+    'cuisines': cuisines_aux or None,
+    'price_types': price_aux or None,
+    'min_rating': nota_minima or None,
+}
+
+# PROCESSED DATA DOWNLOAD BUTTON - o arquivo só é gerado e lido no rerun do clique e fica em disco por versão dos dados
+st.sidebar.markdown("### Dados Tratados")
+formato = st.sidebar.selectbox('Formato do arquivo', list(EXPORT_FORMATS))
+suffix, mime = EXPORT_FORMATS[formato]
+
+apenas_filtros = st.sidebar.checkbox('Exportar apenas os dados dos filtros atuais', value=False)
+selection = {'cuisines': filters['cuisines'], 'price_type': filters['price_types']} if apenas_filtros else None
+
+if st.sidebar.button('Preparar arquivo'):
+    with get_export(suffix, selection) as export_file:
+        st.sidebar.download_button(
+            label='Download',
+            data=export_file,
+            file_name=f'data.{suffix}',
+            mime=mime,
+        )
+
+# POWERED BY
+st.sidebar.markdown('''---''')
+st.sidebar.markdown('###### Powered by Aruã Dias')
+
+# ==================================================================
+# STREAMLIT LAYOUT
+# ==================================================================
+
+st.markdown('# 📍 Restaurantes Próximos')
+
+with span('filter', 'nearby'):
+    if modo == 'Mais próximos':
+        results = nearby_index.nearest(latitude, longitude, k=quantidade, **filters)
+    else:
+        # Limitado ao que o mapa desenha inteiro no navegador
+        results = nearby_index.within(latitude, longitude, raio, limit=MAP_CLIENT_MAX_POINTS, **filters)
+
+    df_nearby = nearby_restaurants(df2, results)
+
+with st.container():
+
+    st.markdown(f'### {len(df_nearby)} restaurantes encontrados')
+
+    if modo == 'Dentro de um raio' and len(df_nearby) >= MAP_CLIENT_MAX_POINTS:
+        st.caption(f'Mostrando só os {MAP_CLIENT_MAX_POINTS} mais próximos; diminua o raio ou use os filtros.')
+
+    with span('render', 'nearby_table'):
+        st.dataframe(df_nearby.loc[:,['restaurant_name',
+                                      'distance_km',
+                                      'country',
+                                      'city',
+                                      'cuisines',
+                                      'price_type',
+                                      'average_cost_for_two',
+                                      'aggregate_rating']],
+                     use_container_width=True)
+
+with st.container():
+
+    with span('figure', 'map'):
+        html = map_html(build_nearby_map(df_nearby, latitude, longitude))
+
+    with span('render', 'map'):
+        components.html(html, height=MAP_HEIGHT + 10, width=MAP_WIDTH)
+
+# PROFILE - flamegraph deste rerun, marcado com a página, a seleção de filtros e a versão dos dados
+if perfil is not None:
+    arquivo_perfil = end_profile(perfil, {'latitude': latitude, 'longitude': longitude, 'modo': modo,
+                                         'limite': quantidade if modo == 'Mais próximos' else raio, **filters})
+
+    st.sidebar.markdown('### Perfil deste rerun')
+    st.sidebar.caption(str(arquivo_perfil))
+    st.sidebar.download_button(label='Flamegraph (.folded)',
+                               data=arquivo_perfil.read_bytes(),
+                               file_name=arquivo_perfil.name,
+                               mime='text/plain')
+
+# DEBUG PANEL - tempos de cada etapa deste rerun
+execucao = end_run()
+
+if painel_debug:
+    st.sidebar.markdown('### Tempos deste rerun')
+    st.sidebar.dataframe(span_frame(execucao), use_container_width=True)
@@ -0,0 +1,40 @@
+# Artefatos do ETL construídos uma vez por sessão de testes a partir do
+# dataset/raw/data.csv real, em um diretório temporário (nada é gravado em
+# dataset/processed).
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import pytest
+
+from fome_zero.cuisines import CuisineBridge
+from fome_zero.etl import CUISINE_BRIDGE_FILE, DATA_FILE, RAW_DATA_PATH, build_artifacts, process_data_legacy
+from fome_zero.schema import compact_frame, read_parquet
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## FIXTURES
+
+@pytest.fixture(scope="session")
+def artifacts_dir(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("artifacts")
+    build_artifacts(RAW_DATA_PATH, out_dir)
+
+    return out_dir
+
+@pytest.fixture(scope="session")
+def dataset(artifacts_dir):
+    # O frame que as páginas usam (fome_zero.data.load_dataset)
+    return compact_frame(read_parquet(artifacts_dir / DATA_FILE))
+
+@pytest.fixture(scope="session")
+def bridge(artifacts_dir, dataset):
+    return CuisineBridge.read(artifacts_dir / CUISINE_BRIDGE_FILE, n_rows=len(dataset))
+
+@pytest.fixture(scope="session")
+def legacy_dataset():
+    # O frame do código original das páginas (strings, float64)
+    return process_data_legacy(RAW_DATA_PATH)
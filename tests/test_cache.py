@@ -0,0 +1,197 @@
+# Camadas de cache compartilhadas entre as sessões: locks por chave, o LRU
+# de arquivos em disco (DiskLRU) e o cache de HTML dos mapas (MapCache).
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import os
+import threading
+import time
+
+from fome_zero.cache import DiskLRU, KeyLocks
+from fome_zero.maps import MapCache
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+FILE_BYTES = 100
+
+THREADS = 8
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## HELPERS
+
+def write_file(cache_dir, name, size=FILE_BYTES, mtime=None):
+    path = cache_dir / name
+    path.write_bytes(b"x" * size)
+
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+    return path
+
+def in_threads(func, n=THREADS):
+    # Todas as threads começam juntas, como sessões pedindo a mesma chave
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        barrier.wait()
+        results[i] = func()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+def slow_render(calls, html="<html></html>"):
+    def render():
+        calls.append(1)
+        time.sleep(0.05)
+        return html
+
+    return render
+
+## KEY LOCKS
+
+def test_key_locks_serialize_a_key_and_are_released():
+    locks = KeyLocks()
+    inside = []
+    overlaps = []
+
+    def work():
+        with locks.hold("key"):
+            overlaps.append(len(inside))
+            inside.append(1)
+            time.sleep(0.01)
+            inside.pop()
+
+    in_threads(work)
+
+    assert overlaps == [0] * THREADS
+    assert len(locks) == 0
+
+def test_key_locks_do_not_block_other_keys():
+    locks = KeyLocks()
+
+    with locks.hold("a"):
+        with locks.hold("b"):
+            assert len(locks) == 2
+
+    assert len(locks) == 0
+
+## DISK LRU
+
+def test_disk_lru_evicts_least_recently_used(tmp_path):
+    lru = DiskLRU(tmp_path, max_bytes=2.5 * FILE_BYTES)
+
+    for name in ["a", "b"]:
+        lru.added(write_file(tmp_path, name))
+
+    lru.touch(tmp_path / "a")
+    lru.added(write_file(tmp_path, "c"))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "c"]
+    assert lru.stats() == {"disk_items": 2, "disk_bytes": 2 * FILE_BYTES, "disk_evictions": 1}
+
+def test_disk_lru_keeps_newest_file_above_budget(tmp_path):
+    lru = DiskLRU(tmp_path, max_bytes=FILE_BYTES)
+
+    lru.added(write_file(tmp_path, "small"))
+    lru.added(write_file(tmp_path, "big", size=3 * FILE_BYTES))
+
+    assert [path.name for path in tmp_path.iterdir()] == ["big"]
+    assert lru.stats()["disk_bytes"] == 3 * FILE_BYTES
+
+def test_disk_lru_forgets_files_removed_elsewhere(tmp_path):
+    # Outro processo apagou o arquivo: touch e forget não falham
+    lru = DiskLRU(tmp_path, max_bytes=10 * FILE_BYTES)
+
+    for name in ["a", "b"]:
+        lru.added(write_file(tmp_path, name))
+
+    (tmp_path / "a").unlink()
+    (tmp_path / "b").unlink()
+    lru.touch(tmp_path / "a")
+    lru.forget(tmp_path / "b")
+    lru.forget(tmp_path / "never-added")
+
+    assert lru.stats() == {"disk_items": 0, "disk_bytes": 0, "disk_evictions": 0}
+
+def test_disk_lru_reloads_order_from_mtime(tmp_path):
+    # Depois de um reinício, a ordem de uso vem do mtime; escritas em andamento ficam de fora
+    now = time.time()
+    write_file(tmp_path, "new", mtime=now - 10)
+    write_file(tmp_path, "old", mtime=now - 100)
+    write_file(tmp_path, ".new.123.tmp")
+
+    lru = DiskLRU(tmp_path, max_bytes=2.5 * FILE_BYTES)
+    assert lru.stats()["disk_items"] == 2
+
+    lru.added(write_file(tmp_path, "newest"))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [".new.123.tmp", "new", "newest"]
+
+## MAP CACHE
+
+def test_map_cache_renders_each_selection_once(tmp_path):
+    cache = MapCache("v1", tmp_path)
+    calls = []
+
+    results = in_threads(lambda: cache.get(["India", "Brazil"], slow_render(calls)))
+
+    assert results == ["<html></html>"] * THREADS
+    assert len(calls) == 1
+    assert cache.get(["Brazil", "India", "Brazil"], slow_render(calls)) == "<html></html>"
+    assert len(calls) == 1
+    assert cache.stats()["misses"] == 1
+    assert len(cache._key_locks) == 0
+
+def test_map_cache_serves_from_disk_after_restart(tmp_path):
+    calls = []
+    MapCache("v1", tmp_path).get(["India"], slow_render(calls))
+
+    cache = MapCache("v1", tmp_path)
+
+    assert cache.get(["India"], slow_render(calls)) == "<html></html>"
+    assert len(calls) == 1
+    assert cache.stats()["disk_hits"] == 1
+
+    # Outra versão dos dados renderiza de novo
+    MapCache("v2", tmp_path).get(["India"], slow_render(calls))
+    assert len(calls) == 2
+
+def test_map_cache_memory_and_disk_budgets(tmp_path):
+    html = "x" * FILE_BYTES
+    cache = MapCache("v1", tmp_path, max_bytes=2.5 * FILE_BYTES, disk_max_bytes=2.5 * FILE_BYTES)
+    calls = []
+
+    for country in ["A", "B", "C"]:
+        cache.get([country], slow_render(calls, html))
+
+    stats = cache.stats()
+    assert stats["items"] == 2 and stats["bytes"] == 2 * FILE_BYTES and stats["evictions"] == 1
+    assert stats["disk_items"] == 2 and stats["disk_evictions"] == 1
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # "A" saiu dos dois níveis e é renderizado de novo
+    cache.get(["A"], slow_render(calls, html))
+    assert len(calls) == 4
+
+def test_map_cache_without_disk():
+    cache = MapCache("v1")
+    calls = []
+
+    cache.get(["India"], slow_render(calls))
+    cache.get(["India"], slow_render(calls))
+
+    assert len(calls) == 1
+    assert "disk_items" not in cache.stats()
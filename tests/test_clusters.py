@@ -0,0 +1,82 @@
+# Pirâmide de clusters do mapa: o artefato do ETL é o build_pyramid do
+# dataset, e as consultas do viewport não perdem nem contam duas vezes nenhum
+# cluster, em qualquer zoom, recorte ou seleção de países.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero.clusters import ClusterPyramid, build_pyramid
+from fome_zero.etl import CLUSTER_PYRAMID_FILE
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+WORLD = ((-90.0, -180.0), (90.0, 180.0))
+
+RANDOM_VIEWPORTS = 200
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## FIXTURES
+
+@pytest.fixture(scope="module")
+def pyramid(artifacts_dir):
+    return ClusterPyramid.read(artifacts_dir / CLUSTER_PYRAMID_FILE)
+
+## BUILD
+
+def test_artifact_matches_build_pyramid(dataset, artifacts_dir):
+    pd.testing.assert_frame_equal(pd.read_parquet(artifacts_dir / CLUSTER_PYRAMID_FILE), build_pyramid(dataset),
+                                  check_dtype=False, check_categorical=False)
+
+## QUERY
+
+def test_world_query_counts_every_restaurant(dataset, pyramid):
+    for zoom in range(pyramid.max_zoom + 1):
+        clusters = pyramid.query(WORLD, zoom)
+
+        assert clusters["count"].sum() == len(dataset), zoom
+        assert ((clusters["row"] >= 0) == (clusters["count"] == 1)).all()
+
+def test_country_selection_counts(dataset, pyramid):
+    countries = ["Brazil", "India", "Atlantis"]
+    expected = int(dataset["country"].isin(countries).sum())
+
+    for zoom in (0, 4, pyramid.max_zoom):
+        assert pyramid.query(WORLD, zoom, countries=countries)["count"].sum() == expected
+
+def test_viewport_query_matches_level_scan(artifacts_dir, pyramid):
+    # A busca por colunas de tiles devolve os mesmos clusters que varrer o
+    # nível inteiro atrás dos centros dentro do recorte
+    levels = pd.read_parquet(artifacts_dir / CLUSTER_PYRAMID_FILE)
+    rng = np.random.default_rng(0)
+
+    for _ in range(RANDOM_VIEWPORTS):
+        zoom = int(rng.integers(0, pyramid.max_zoom + 1))
+        level = levels.loc[levels["zoom"] == zoom, :]
+
+        center = level.iloc[int(rng.integers(0, len(level)))]
+        lat_span, lon_span = rng.uniform(0.01, 40, 2) / 2**(zoom / 4)
+        bounds = ((center["latitude"] - lat_span, center["longitude"] - lon_span),
+                  (center["latitude"] + lat_span, center["longitude"] + lon_span))
+
+        inside = ((level["latitude"] >= bounds[0][0]) & (level["latitude"] <= bounds[1][0])
+                  & (level["longitude"] >= bounds[0][1]) & (level["longitude"] <= bounds[1][1]))
+
+        assert pyramid.query(bounds, zoom)["count"].sum() == level.loc[inside, "count"].sum(), (zoom, bounds)
+
+def test_single_restaurant_clusters_point_to_their_row(dataset, pyramid):
+    clusters = pyramid.query(WORLD, pyramid.max_zoom)
+    single = clusters.loc[clusters["row"] >= 0, :]
+
+    assert len(single) > 0
+    np.testing.assert_allclose(dataset["latitude"].to_numpy()[single["row"]], single["latitude"])
+    np.testing.assert_allclose(dataset["longitude"].to_numpy()[single["row"]], single["longitude"])
@@ -0,0 +1,127 @@
+# Gráficos das páginas Countries e Cities servidos pelo cubo: para seleções
+# de países sorteadas, as tabelas têm que ser as mesmas dos groupby originais
+# das páginas sobre o dataset filtrado (valores, arredondamento e empates).
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero.cube import CUBE_DIMENSIONS, build_cube, city_rollup, country_rollup, merge_cubes, select_cells
+from fome_zero.etl import CUBE_FILE, SeenKeys, new_restaurants
+from fome_zero.metrics import (city_top_cuisines, city_top_rating_gt_4, city_top_rating_lt_2_5, city_top_restaurants,
+                               country_cities, country_cost_for_two, country_restaurants, country_votes)
+from fome_zero.schema import read_parquet
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+RANDOM_SELECTIONS = 200
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## LEGACY CHARTS
+
+# Os df_aux dos bar_graph originais, sem a coluna de cores aleatórias
+
+def legacy_country_charts(df2):
+    return {
+        "restaurants": (df2.loc[:, ["country", "restaurant_id"]].groupby("country").nunique()
+                           .sort_values("restaurant_id", ascending=False).reset_index()),
+        "cities": (df2.loc[:, ["city", "country"]].groupby("country").nunique()
+                      .sort_values("city", ascending=False).reset_index()),
+        "votes": round(df2.loc[:, ['votes', 'country']].groupby('country').mean()
+                          .sort_values('votes', ascending=False).reset_index(), 1),
+        "cost": round(df2.loc[:, ['average_cost_for_two', 'country']].groupby('country').mean()
+                         .sort_values('average_cost_for_two', ascending=False).reset_index(), 2),
+    }
+
+def legacy_city_charts(df2):
+    def top_count(df_aux, n):
+        return (df_aux.loc[:, ['restaurant_id', 'city', 'country']].groupby(['city', 'country']).count()
+                      .sort_values('restaurant_id', ascending=False).reset_index().head(n))
+
+    return {
+        "restaurants": top_count(df2, 10),
+        "rating_gt_4": top_count(df2.loc[df2['aggregate_rating'] > 4, :], 7),
+        "rating_lt_2_5": top_count(df2.loc[df2['aggregate_rating'] < 2.5, :], 7),
+        "cuisines": (df2.loc[:, ['cuisines', 'city', 'country']].groupby(['city', 'country']).nunique()
+                        .sort_values('cuisines', ascending=False).reset_index().head(10)),
+    }
+
+## CUBE CHARTS
+
+def cube_country_charts(cube, countries):
+    df_country = country_rollup(select_cells(cube, countries=countries))
+
+    return {
+        "restaurants": country_restaurants(df_country),
+        "cities": country_cities(df_country),
+        "votes": country_votes(df_country),
+        "cost": country_cost_for_two(df_country),
+    }
+
+def cube_city_charts(cube, countries):
+    df_city = city_rollup(select_cells(cube, countries=countries))
+
+    return {
+        "restaurants": city_top_restaurants(df_city),
+        "rating_gt_4": city_top_rating_gt_4(df_city),
+        "rating_lt_2_5": city_top_rating_lt_2_5(df_city),
+        "cuisines": city_top_cuisines(df_city),
+    }
+
+## HELPERS
+
+def plain(df):
+    df = df.copy()
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+
+    return df
+
+def random_countries(countries, seed, n=RANDOM_SELECTIONS):
+    rng = np.random.default_rng(seed)
+
+    for _ in range(n):
+        yield list(rng.choice(countries, rng.integers(1, len(countries) + 1), replace=False))
+
+@pytest.fixture(scope="module")
+def cube(artifacts_dir):
+    return read_parquet(artifacts_dir / CUBE_FILE)
+
+## PARITY
+
+@pytest.mark.parametrize("charts", [(legacy_country_charts, cube_country_charts),
+                                    (legacy_city_charts, cube_city_charts)], ids=["countries", "cities"])
+def test_charts_match_legacy_groupby(cube, legacy_dataset, charts):
+    legacy_charts, cube_charts = charts
+    countries = sorted(legacy_dataset["country"].unique())
+
+    for selected in random_countries(countries, seed=0):
+        expected = legacy_charts(legacy_dataset[legacy_dataset["country"].isin(selected)])
+        actual = cube_charts(cube, selected)
+
+        for name in expected:
+            pd.testing.assert_frame_equal(plain(actual[name]), expected[name], check_dtype=False, obj=name)
+
+def test_merged_cubes_match_single_cube(dataset):
+    # O ETL streaming soma os cubos dos blocos, descontando os restaurantes já
+    # vistos; o resultado é o cubo do dataset inteiro
+    seen = SeenKeys()
+    half = len(dataset) // 2
+    chunks = [dataset.iloc[:half], dataset.iloc[half:]]
+
+    merged = merge_cubes([build_cube(chunk, new_restaurants(chunk, seen)) for chunk in chunks])
+    single = build_cube(dataset)
+
+    pd.testing.assert_frame_equal(plain(merged).sort_values(CUBE_DIMENSIONS, ignore_index=True),
+                                  plain(single).sort_values(CUBE_DIMENSIONS, ignore_index=True))
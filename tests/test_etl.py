@@ -0,0 +1,130 @@
+# Paridade do ETL em um arquivo bruto sintético pequeno:
+#
+#   python -m pytest -q tests
+#
+# process_data (vetorizado) contra process_data_legacy (linha a linha) e o
+# build_artifacts em streaming (vários blocos) contra o build em memória.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import pandas as pd
+import pytest
+
+from fome_zero import etl
+from fome_zero.etl import (CLUSTER_PYRAMID_FILE, CUBE_FILE, CUISINE_BRIDGE_FILE, DATA_FILE, RESTAURANT_INDEX_FILE,
+                           build_artifacts, clean_data, process_data, process_data_legacy)
+from fome_zero.synthetic import write_synthetic_raw
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+SYNTHETIC_ROWS = 6000
+
+# Orçamento pequeno o bastante para o arquivo sintético virar vários blocos
+STREAMING_MEMORY_MB = 1
+
+ARTIFACT_FILES = [DATA_FILE, RESTAURANT_INDEX_FILE, CUISINE_BRIDGE_FILE, CUBE_FILE, CLUSTER_PYRAMID_FILE]
+
+CUBE_KEYS = ["country", "city", "cuisines", "price_type"]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## FIXTURES
+
+@pytest.fixture(scope="module")
+def raw_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("raw") / "data.csv"
+    write_synthetic_raw(SYNTHETIC_ROWS, path, seed=1)
+
+    return path
+
+@pytest.fixture(scope="module")
+def conflict_raw_path(tmp_path_factory):
+    # Cópias com votos diferentes: o mesmo restaurant_id com conteúdo divergente
+    path = tmp_path_factory.mktemp("raw") / "data.csv"
+    write_synthetic_raw(SYNTHETIC_ROWS, path, seed=2, duplicate_rate=0.2, conflict_rate=0.3)
+
+    return path
+
+## HELPERS
+
+def read_artifact(out_dir, name):
+    df = pd.read_parquet(out_dir / name)
+
+    # Os dicionários das categorias dependem da ordem em que os blocos chegam
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+
+    # O cubo em streaming é a soma dos cubos dos blocos, em outra ordem de linhas
+    if name == CUBE_FILE:
+        df = df.sort_values(CUBE_KEYS, ignore_index=True)
+
+    return df
+
+def build_both(raw_path, tmp_path):
+    memory_dir = tmp_path / "memory"
+    streaming_dir = tmp_path / "streaming"
+    memory_dir.mkdir()
+    streaming_dir.mkdir()
+
+    memory_stats = build_artifacts(raw_path, memory_dir)
+    streaming_stats = build_artifacts(raw_path, streaming_dir, memory_mb=STREAMING_MEMORY_MB)
+
+    return memory_dir, memory_stats, streaming_dir, streaming_stats
+
+## LEGACY VS VECTORIZED
+
+def test_process_data_matches_legacy(raw_path):
+    pd.testing.assert_frame_equal(process_data_legacy(raw_path), process_data(raw_path))
+
+def test_distinct_policy_matches_legacy_with_conflicts(conflict_raw_path):
+    # O legado remove só as linhas repetidas inteiras, que é a política "distinct"
+    df = clean_data(pd.read_csv(conflict_raw_path), dedup_policy="distinct")
+
+    assert df.attrs["dedup_conflicts"] > 0
+    pd.testing.assert_frame_equal(process_data_legacy(conflict_raw_path), df)
+
+## STREAMING VS IN-MEMORY
+
+def test_streaming_uses_several_chunks(raw_path):
+    assert etl.chunk_rows_for_budget(raw_path, STREAMING_MEMORY_MB) < SYNTHETIC_ROWS // 2
+
+@pytest.mark.parametrize("policy", ["first", "distinct"])
+def test_streaming_artifacts_match_in_memory(conflict_raw_path, tmp_path, monkeypatch, policy):
+    monkeypatch.setattr(etl, "DEDUP_POLICY", policy)
+
+    memory_dir, memory_stats, streaming_dir, streaming_stats = build_both(conflict_raw_path, tmp_path)
+
+    assert streaming_stats == memory_stats
+
+    for name in ARTIFACT_FILES:
+        pd.testing.assert_frame_equal(read_artifact(memory_dir, name), read_artifact(streaming_dir, name),
+                                      obj=name)
+
+def test_streaming_distinct_counts_each_restaurant_once(conflict_raw_path, tmp_path, monkeypatch):
+    # Linhas do mesmo restaurante com conteúdos diferentes ficam no dataset,
+    # mas o cubo conta o restaurante uma vez por país
+    monkeypatch.setattr(etl, "DEDUP_POLICY", "distinct")
+
+    _, _, streaming_dir, _ = build_both(conflict_raw_path, tmp_path)
+
+    data = pd.read_parquet(streaming_dir / DATA_FILE)
+    cube = pd.read_parquet(streaming_dir / CUBE_FILE)
+
+    assert data["restaurant_id"].duplicated().any()
+    assert cube["restaurants"].sum() == data.groupby("country")["restaurant_id"].nunique().sum()
+
+def test_streaming_last_policy_falls_back_to_in_memory(raw_path, tmp_path, monkeypatch):
+    # "last" não tem modo em blocos: o build não pode falhar em cada página
+    monkeypatch.setattr(etl, "DEDUP_POLICY", "last")
+
+    memory_dir, memory_stats, streaming_dir, streaming_stats = build_both(raw_path, tmp_path)
+
+    assert streaming_stats == memory_stats
+    pd.testing.assert_frame_equal(pd.read_parquet(memory_dir / DATA_FILE), pd.read_parquet(streaming_dir / DATA_FILE))
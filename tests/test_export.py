@@ -0,0 +1,114 @@
+# Botão "Dados Tratados": os arquivos do ExportCache têm que ter os mesmos
+# bytes do CSV que as páginas geravam a cada rerun, isto é,
+# process_data_legacy(...).to_csv(index=False, sep=";"), e não os de um
+# export_frame sobre o frame novo.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from fome_zero.etl import DATA_FILE
+from fome_zero.export import EXPORT_FORMATS, ExportCache
+from fome_zero.indexes import FilterIndex
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+CSV_SUFFIXES = [suffix for suffix, _ in EXPORT_FORMATS.values() if suffix != "parquet"]
+
+COUNTRIES = ["Brazil", "India", "United States of America"]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## HELPERS
+
+def read_csv_bytes(path):
+    # Descomprime pela extensão (.gz, .zst) ou lê o CSV puro
+    with pa.input_stream(str(path), compression="detect") as source:
+        return source.read()
+
+def legacy_csv(legacy_df):
+    return legacy_df.to_csv(index=False, sep=";").encode("utf-8")
+
+## PARITY
+
+@pytest.mark.parametrize("suffix", CSV_SUFFIXES)
+def test_csv_export_matches_legacy_bytes(dataset, legacy_dataset, tmp_path, suffix):
+    cache = ExportCache("test", tmp_path)
+
+    with cache.open(suffix, None, lambda: dataset) as export_file:
+        data = export_file.read()
+
+    assert read_csv_bytes(cache.path(suffix)) == legacy_csv(legacy_dataset)
+
+    if suffix == "csv":
+        assert data == legacy_csv(legacy_dataset)
+
+def test_csv_export_of_selection_matches_legacy_bytes(dataset, legacy_dataset, tmp_path):
+    # O que a página faz com "Apenas filtros" marcado
+    cache = ExportCache("test", tmp_path)
+    index = FilterIndex(dataset)
+    selection = {"country": COUNTRIES}
+
+    path = cache.get("csv", selection, lambda: index.select(dataset, **selection))
+    legacy_df = legacy_dataset.loc[legacy_dataset["country"].isin(COUNTRIES), :]
+
+    assert read_csv_bytes(path) == legacy_csv(legacy_df)
+
+def test_parquet_export_matches_dataset(dataset, artifacts_dir, tmp_path):
+    cache = ExportCache("test", tmp_path)
+
+    path = cache.get("parquet", None, lambda: dataset)
+
+    pd.testing.assert_frame_equal(pd.read_parquet(path), pd.read_parquet(artifacts_dir / DATA_FILE),
+                                  check_categorical=False)
+
+## CACHE
+
+def test_export_is_built_once_per_selection(dataset, tmp_path):
+    cache = ExportCache("test", tmp_path)
+    calls = []
+
+    def frame():
+        calls.append(1)
+        return dataset
+
+    first = cache.get("csv", {"country": ["India", "Brazil"]}, frame)
+    second = cache.get("csv", {"country": ["Brazil", "India"]}, frame)
+
+    assert first == second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert len(cache._key_locks) == 0
+
+    # Outra versão dos dados não reaproveita o arquivo
+    assert ExportCache("other", tmp_path).path("csv", {"country": ["India", "Brazil"]}) != first
+
+def test_export_cache_stays_within_budget(dataset, tmp_path):
+    size = ExportCache("probe", tmp_path / "probe").get("csv", None, lambda: dataset).stat().st_size
+    cache = ExportCache("test", tmp_path / "exports", max_bytes=2.5 * size)
+
+    paths = [cache.get("csv", {"country": [str(i)]}, lambda: dataset) for i in range(4)]
+
+    assert [path.exists() for path in paths] == [False, False, True, True]
+    assert cache.stats()["disk_items"] == 2
+    assert cache.stats()["disk_evictions"] == 2
+    assert cache.stats()["disk_bytes"] <= cache.disk.max_bytes
+
+def test_open_rebuilds_evicted_file(dataset, legacy_dataset, tmp_path):
+    cache = ExportCache("test", tmp_path)
+
+    path = cache.get("csv", None, lambda: dataset)
+    path.unlink()
+
+    with cache.open("csv", None, lambda: dataset) as export_file:
+        assert export_file.read() == legacy_csv(legacy_dataset)
+
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,178 @@
+# Índices das páginas contra o pandas que eles substituíram, no dataset real:
+# filtros (isin), busca por restaurant_id, destaques por culinária (groupby +
+# sort) e a tabela "Top Restaurantes" (drop_duplicates + sort), para seleções
+# sorteadas.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero.etl import RESTAURANT_INDEX_FILE
+from fome_zero.indexes import (FILTER_COLUMNS, TOP_TABLE_COLUMNS, CuisineTopIndex, FilterIndex, RestaurantIndex,
+                               TopRestaurantIndex)
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+RANDOM_SELECTIONS = 100
+
+PAGE_SIZE = 25
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## FIXTURES
+
+@pytest.fixture(scope="module")
+def filter_index(dataset):
+    return FilterIndex(dataset)
+
+@pytest.fixture(scope="module")
+def top_index(dataset):
+    return TopRestaurantIndex(dataset)
+
+## HELPERS
+
+def random_selections(dataset, seed):
+    # Países e culinárias sorteados, às vezes sem filtro ou com um valor que não existe
+    rng = np.random.default_rng(seed)
+    countries = dataset["country"].unique().tolist()
+    cuisines = dataset["cuisines"].unique().tolist()
+
+    for _ in range(RANDOM_SELECTIONS):
+        selection = {
+            "country": list(rng.choice(countries, rng.integers(1, 6), replace=False)),
+            "cuisines": list(rng.choice(cuisines, rng.integers(1, 30), replace=False)),
+        }
+
+        draw = rng.random()
+        if draw < 0.1:
+            selection["cuisines"] = None
+        elif draw < 0.2:
+            selection["country"].append("Atlantis")
+
+        yield selection
+
+def legacy_mask(dataframe, selection):
+    mask = np.ones(len(dataframe), dtype=bool)
+
+    for col, values in selection.items():
+        if values is not None:
+            mask &= dataframe[col].isin(values).to_numpy()
+
+    return mask
+
+def legacy_top_table(dataframe, mask, n):
+    return (dataframe.loc[mask, TOP_TABLE_COLUMNS]
+                     .drop_duplicates(subset=['restaurant_name'])
+                     .sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True])
+                     .head(n))
+
+def legacy_best(dataframe, cuisine):
+    # Bloco de métrica da página de culinárias
+    return (dataframe.loc[dataframe['cuisines'] == cuisine, ['restaurant_id', 'restaurant_name', 'aggregate_rating']]
+                     .groupby('restaurant_name')
+                     .mean()
+                     .sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True])
+                     .reset_index())
+
+## RESTAURANT ID INDEX
+
+def test_restaurant_index_finds_every_row(dataset, artifacts_dir):
+    index = RestaurantIndex.read(artifacts_dir / RESTAURANT_INDEX_FILE)
+    ids = dataset["restaurant_id"].to_numpy()
+
+    assert len(index) == len(dataset)
+    np.testing.assert_array_equal(ids[index.lookup(ids)], ids)
+    np.testing.assert_array_equal(index.lookup([-1, ids.max() + 1]), [-1, -1])
+    assert index.contains([ids[0]]).all()
+    assert index.rows_for(-1).size == 0
+
+## FILTER INDEX
+
+@pytest.mark.parametrize("col", FILTER_COLUMNS)
+def test_filter_options_match_unique(dataset, filter_index, col):
+    assert filter_index.options(col) == dataset[col].unique().tolist()
+
+def test_filter_select_matches_isin(dataset, filter_index):
+    for selection in random_selections(dataset, seed=0):
+        expected = dataset.loc[legacy_mask(dataset, selection), :]
+
+        np.testing.assert_array_equal(filter_index.mask(**selection), legacy_mask(dataset, selection))
+        pd.testing.assert_frame_equal(filter_index.select(dataset, **selection), expected)
+
+def test_filter_select_combines_extra_mask(dataset, filter_index):
+    extra = dataset["aggregate_rating"].to_numpy() >= 4
+    selection = {"country": ["Brazil", "India"]}
+
+    expected = dataset.loc[legacy_mask(dataset, selection) & extra, :]
+
+    pd.testing.assert_frame_equal(filter_index.select(dataset, mask=extra, **selection), expected)
+
+## TOP RESTAURANTS PER CUISINE
+
+def test_cuisine_top_matches_legacy_metrics(dataset, legacy_dataset):
+    index = CuisineTopIndex(dataset, k=5)
+    cuisines = legacy_dataset["cuisines"].unique().tolist()
+
+    best = index.best(cuisines + ["Atlantean"])
+    assert best["cuisines"].tolist() == cuisines
+
+    for cuisine, (name, rating) in zip(cuisines, zip(best["restaurant_name"], best["aggregate_rating"])):
+        expected = legacy_best(legacy_dataset, cuisine)
+        top = index.top(cuisine, n=10)
+
+        assert (name, rating) == (expected.iloc[0, 0], expected.iloc[0, 2])
+        assert top["restaurant_name"].tolist() == expected["restaurant_name"].head(5).tolist()
+        np.testing.assert_array_equal(top["aggregate_rating"], expected["aggregate_rating"].head(5))
+
+    assert index.top("Atlantean").empty
+
+## TOP RESTAURANTS TABLE
+
+@pytest.mark.parametrize("n", [10, 1000])
+def test_top_table_matches_legacy(dataset, filter_index, top_index, n):
+    for selection in random_selections(dataset, seed=n):
+        mask = filter_index.mask(**selection)
+        expected = legacy_top_table(dataset, mask, n)
+
+        rows, total = top_index.top(mask, n)
+
+        assert total == len(expected)
+        assert rows.tolist() == expected.index.tolist()
+
+@pytest.mark.parametrize("sort_by, ascending", [("average_cost_for_two", True), ("votes", False),
+                                                ("restaurant_name", True), ("city", False)])
+def test_top_table_pages_match_sorted_legacy(dataset, filter_index, top_index, sort_by, ascending):
+    # A tabela ordenada por outra coluna é a dos N melhores reordenada; empates
+    # ficam na ordem padrão (sort estável)
+    selection = {"country": ["Brazil", "India", "United States of America"]}
+    mask = filter_index.mask(**selection)
+    n = 100
+
+    key = legacy_top_table(dataset, mask, n)[sort_by]
+    if isinstance(key.dtype, pd.CategoricalDtype):
+        # Texto ordenado pelo valor, não pela ordem das categorias
+        key = key.astype(object)
+    expected = key.sort_values(ascending=ascending, kind="stable")
+
+    for page in range(n // PAGE_SIZE):
+        rows, total = top_index.top(mask, n, sort_by=sort_by, ascending=ascending, page=page, page_size=PAGE_SIZE)
+
+        assert total == n
+        assert rows.tolist() == expected.index[page * PAGE_SIZE:(page + 1) * PAGE_SIZE].tolist()
+
+    # Uma página além da última volta a última
+    rows, _ = top_index.top(mask, n, sort_by=sort_by, ascending=ascending, page=99, page_size=PAGE_SIZE)
+    assert rows.tolist() == expected.index[-PAGE_SIZE:].tolist()
+
+def test_top_table_of_empty_selection(dataset, filter_index, top_index):
+    rows, total = top_index.top(filter_index.mask(country=["Atlantis"]), 10)
+
+    assert total == 0 and rows.size == 0
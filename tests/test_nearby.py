@@ -0,0 +1,102 @@
+# Busca de restaurantes próximos (KD-tree) contra a força bruta: haversine
+# para todas as linhas do dataset, filtros e ordenação por distância.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pytest
+
+from fome_zero.nearby import NearbyIndex, haversine_km
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+RANDOM_POINTS = 100
+
+FILTERS = {"cuisines": ["Italian", "Japanese", "Pizza"], "price_types": ["expensive", "gourmet"], "min_rating": 3.5}
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## FIXTURES
+
+@pytest.fixture(scope="module")
+def index(dataset):
+    return NearbyIndex(dataset)
+
+## HELPERS
+
+def random_points(dataset, seed):
+    # Perto de restaurantes (regiões densas) e em qualquer lugar do mundo
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(dataset), RANDOM_POINTS)
+
+    latitude = dataset["latitude"].to_numpy()[rows] + rng.normal(0, 0.05, RANDOM_POINTS)
+    longitude = dataset["longitude"].to_numpy()[rows] + rng.normal(0, 0.05, RANDOM_POINTS)
+
+    latitude[::4] = rng.uniform(-80, 80, len(latitude[::4]))
+    longitude[::4] = rng.uniform(-180, 180, len(longitude[::4]))
+
+    return zip(latitude, longitude)
+
+def brute_distances(dataset, latitude, longitude, cuisines=None, price_types=None, min_rating=None):
+    # Distância de cada linha, inf nas que não passam nos filtros
+    distance = haversine_km(latitude, longitude, dataset["latitude"].to_numpy(), dataset["longitude"].to_numpy())
+
+    keep = np.ones(len(dataset), dtype=bool)
+    if cuisines is not None:
+        keep &= dataset["cuisines"].isin(cuisines).to_numpy()
+    if price_types is not None:
+        keep &= dataset["price_type"].isin(price_types).to_numpy()
+    if min_rating is not None:
+        keep &= dataset["aggregate_rating"].to_numpy() >= min_rating
+
+    return np.where(keep, distance, np.inf)
+
+def check_result(result, distance, expected):
+    # Distâncias na ordem certa e cada linha devolvida a essa distância
+    np.testing.assert_allclose(result["distance_km"], expected, atol=1e-6)
+    np.testing.assert_allclose(distance[result["row"]], result["distance_km"], atol=1e-6)
+
+## NEAREST
+
+@pytest.mark.parametrize("filters", [{}, FILTERS])
+def test_nearest_matches_brute_force(dataset, index, filters):
+    for latitude, longitude in random_points(dataset, seed=0):
+        distance = brute_distances(dataset, latitude, longitude, **filters)
+        expected = np.sort(distance)[:10]
+        expected = expected[np.isfinite(expected)]
+
+        check_result(index.nearest(latitude, longitude, k=10, **filters), distance, expected)
+
+def test_nearest_with_rare_filter_widens_the_search(dataset, index):
+    # Filtro que quase nada atende: a busca pede cada vez mais vizinhos à árvore
+    filters = {"cuisines": dataset["cuisines"].value_counts().index[-3:].tolist()}
+    distance = brute_distances(dataset, 0.0, 0.0, **filters)
+    expected = np.sort(distance[np.isfinite(distance)])
+
+    assert len(expected) < 10
+    check_result(index.nearest(0.0, 0.0, k=10, **filters), distance, expected)
+
+## WITHIN
+
+@pytest.mark.parametrize("filters", [{}, FILTERS])
+def test_within_matches_brute_force(dataset, index, filters):
+    for latitude, longitude in random_points(dataset, seed=1):
+        distance = brute_distances(dataset, latitude, longitude, **filters)
+        expected = np.sort(distance[distance <= 25])
+
+        check_result(index.within(latitude, longitude, 25, None, **filters), distance, expected)
+
+def test_within_keeps_the_closest_up_to_limit(dataset, index):
+    latitude, longitude = dataset["latitude"].iloc[0], dataset["longitude"].iloc[0]
+    distance = brute_distances(dataset, latitude, longitude)
+
+    everything = index.within(latitude, longitude, 20000, None)
+    assert len(everything) == len(dataset)
+
+    check_result(index.within(latitude, longitude, 20000, 50), distance, np.sort(distance)[:50])
@@ -0,0 +1,125 @@
+# Médias por culinária dos gráficos da página Cuisines: o groupby original
+# sobre o dataset filtrado, as estatísticas de uma seleção nova e as de uma
+# seleção atualizada incrementalmente (países entrando e saindo) têm que
+# produzir as mesmas tabelas, arredondamento e empates incluídos.
+
+# ==================================================================
+# LIBRARIES
+# ==================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero.indexes import FilterIndex
+from fome_zero.metrics import cuisine_best, cuisine_worst
+from fome_zero.stats import CuisineStats
+
+# ==================================================================
+# AUXILIARY VARIABLES
+# ==================================================================
+
+RANDOM_SELECTIONS = 200
+
+CHARTS = [(cuisine_best, False), (cuisine_worst, True)]
+
+# ==================================================================
+# FUNCTIONS
+# ==================================================================
+
+## HELPERS
+
+def random_selections(countries, cuisines, seed, n=RANDOM_SELECTIONS):
+    rng = np.random.default_rng(seed)
+
+    for _ in range(n):
+        yield (list(rng.choice(countries, rng.integers(1, len(countries) + 1), replace=False)),
+               list(rng.choice(cuisines, rng.integers(1, len(cuisines) + 1), replace=False)))
+
+def legacy_chart(df_filtered, ascending):
+    # bar_graph1/bar_graph2 da página original
+    return (round(df_filtered.loc[:, ['cuisines', 'aggregate_rating']]
+                    .groupby('cuisines')
+                    .mean()
+                    .sort_values('aggregate_rating', ascending=ascending)
+                    .reset_index()
+                    .head(10), 1))
+
+def stats_chart(chart, df_cuisine_ratings):
+    df = chart(df_cuisine_ratings).loc[:, ['cuisines', 'aggregate_rating']]
+
+    return df.astype({'cuisines': str})
+
+def assert_same_charts(legacy_filtered, fresh, incremental):
+    for chart, ascending in CHARTS:
+        expected = legacy_chart(legacy_filtered, ascending)
+
+        pd.testing.assert_frame_equal(stats_chart(chart, fresh), expected)
+        pd.testing.assert_frame_equal(stats_chart(chart, incremental), expected)
+
+## PRIMARY CUISINE
+
+def test_cuisine_charts_match_legacy_groupby(dataset, legacy_dataset):
+    stats = CuisineStats.from_dataset(dataset)
+    incremental = stats.selection()
+
+    countries = sorted(legacy_dataset['country'].unique())
+    cuisines = sorted(legacy_dataset['cuisines'].unique())
+
+    for selected_countries, selected_cuisines in random_selections(countries, cuisines, seed=0):
+        legacy_filtered = legacy_dataset[legacy_dataset['country'].isin(selected_countries)
+                                         & legacy_dataset['cuisines'].isin(selected_cuisines)]
+
+        fresh = stats.selection().update(selected_countries).frame(selected_cuisines)
+
+        assert_same_charts(legacy_filtered, fresh, incremental.update(selected_countries).frame(selected_cuisines))
+
+def test_cuisine_rounding_follows_float_mean(dataset, legacy_dataset):
+    # Steak na África do Sul: média exata 4.15, que o groupby soma como
+    # 4.1499999999999995 e mostra 4.1 (pelos décimos inteiros seria 4.2)
+    countries = ['South Africa']
+    legacy_filtered = legacy_dataset[legacy_dataset['country'].isin(countries)]
+
+    expected = legacy_filtered.groupby('cuisines')['aggregate_rating'].mean()
+    frame = CuisineStats.from_dataset(dataset).selection().update(countries).frame()
+
+    np.testing.assert_array_equal(frame['aggregate_rating'].to_numpy(), expected.to_numpy())
+    assert round(frame.loc['Steak', 'aggregate_rating'], 1) == 4.1
+
+## ALL CUISINES (BRIDGE)
+
+def test_all_cuisines_charts_match_legacy_groupby(dataset, bridge):
+    stats = CuisineStats.from_bridge(dataset, bridge)
+    incremental = stats.selection()
+    filter_index = FilterIndex(dataset)
+
+    countries = list(dataset['country'].cat.categories)
+    cuisines = list(bridge.cuisines)
+
+    for selected_countries, selected_cuisines in random_selections(countries, cuisines, seed=1):
+        mask = filter_index.mask(country=selected_countries) & bridge.serving_any(selected_cuisines)
+        exploded = bridge.explode(filter_index.select(dataset, mask=mask), ['aggregate_rating'],
+                                  cuisines=selected_cuisines)
+        legacy_filtered = exploded.astype({'cuisines': str})
+
+        fresh = stats.selection().update(selected_countries).frame(selected_cuisines)
+
+        assert_same_charts(legacy_filtered, fresh, incremental.update(selected_countries).frame(selected_cuisines))
+
+## OTHER MEASURES
+
+def test_cuisine_count_and_variance(dataset, legacy_dataset):
+    countries = ['India', 'Brazil', 'United States of America']
+    grouped = legacy_dataset[legacy_dataset['country'].isin(countries)].groupby('cuisines')['aggregate_rating']
+
+    frame = CuisineStats.from_dataset(dataset).selection().update(countries).frame()
+
+    np.testing.assert_array_equal(frame['count'].to_numpy(), grouped.count().to_numpy())
+    np.testing.assert_allclose(frame['rating_variance'].to_numpy(), grouped.var().to_numpy(), equal_nan=True)
+
+@pytest.mark.parametrize("min_count", [1, 5, 50])
+def test_cuisine_min_count(dataset, min_count):
+    frame = CuisineStats.from_dataset(dataset).selection().update(['India']).frame(min_count=min_count)
+
+    assert (frame['count'] >= min_count).all()
+    assert frame.index.is_monotonic_increasing